@@ -282,6 +282,7 @@ if __name__ == "__main__":
         
         logger.info("📦 Importing OpenHands app...")
         from openhands.server.app import app
+        from openhands.server.monitoring import FIZZO_BROWSERS
         
         # Add Fizzo automation endpoint if available
         if fizzo_available:
@@ -324,14 +325,15 @@ if __name__ == "__main__":
                                 '--disable-gpu'
                             ]
                         )
-                        page = await browser.new_page()
+                        try:
+                            FIZZO_BROWSERS.inc()
+                            page = await browser.new_page()
                         
-                        # Set mobile user agent
-                        await page.set_extra_http_headers({
-                            'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15'
-                        })
+                            # Set mobile user agent
+                            await page.set_extra_http_headers({
+                                'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15'
+                            })
                         
-                        try:
                             # Implementasi login yang lebih robust dengan pendekatan langsung
                             max_retries = 3
                             login_success = False
@@ -692,8 +694,12 @@ if __name__ == "__main__":
                             }
                             
                         finally:
-                            await browser.close()
-                            await playwright.stop()
+                            try:
+                                await browser.close()
+                            finally:
+                                # Counted even if closing the browser fails
+                                FIZZO_BROWSERS.dec()
+                                await playwright.stop()
                             
                     except Exception as e:
                         logger.error(f"❌ Fizzo automation failed: {e}")
@@ -748,16 +754,17 @@ if __name__ == "__main__":
                                     '--disable-gpu'
                                 ]
                             )
-                            page = await browser.new_page()
+                            try:
+                                FIZZO_BROWSERS.inc()
+                                page = await browser.new_page()
                             
-                            # Set mobile user agent
-                            await page.set_extra_http_headers({
-                                'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15'
-                            })
+                                # Set mobile user agent
+                                await page.set_extra_http_headers({
+                                    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15'
+                                })
                             
-                            novels = []
+                                novels = []
                             
-                            try:
                                 # Step 1: Navigate to fizzo.org
                                 logger.info("🌐 Navigating to fizzo.org...")
                                 await page.goto("https://fizzo.org", wait_until='networkidle', timeout=30000)
@@ -936,8 +943,12 @@ if __name__ == "__main__":
                                 logger.error(f"❌ Error saat scraping novel: {e}")
                                 return {"success": False, "error": str(e)}
                             finally:
-                                await browser.close()
-                                await playwright.stop()
+                                try:
+                                    await browser.close()
+                                finally:
+                                    # Counted even if closing the browser fails
+                                    FIZZO_BROWSERS.dec()
+                                    await playwright.stop()
                                 
                         except ImportError:
                             logger.error("❌ Playwright not available for Fizzo novel list retrieval")
@@ -36,6 +36,7 @@ from openhands.runtime.plugins import (
     JupyterRequirement,
     PluginRequirement,
 )
+from openhands.utils.profiler import profile_span
 from openhands.utils.prompt import PromptManager
 
 
@@ -169,7 +170,9 @@ class CodeActAgent(Agent):
         # event we'll just return that instead of an action. The controller will
         # immediately ask the agent to step again with the new view.
         condensed_history: list[Event] = []
-        match self.condenser.condensed_history(state):
+        with profile_span('condense'):
+            condensed = self.condenser.condensed_history(state)
+        match condensed:
             case View(events=events):
                 condensed_history = events
 
@@ -182,14 +185,17 @@ class CodeActAgent(Agent):
 
         initial_user_message = self._get_initial_user_message(state.history)
         messages = self._get_messages(condensed_history, initial_user_message)
-        params: dict = {
-            'messages': self.llm.format_messages_for_llm(messages),
-        }
+        with profile_span('format_messages', messages=len(messages)):
+            params: dict = {
+                'messages': self.llm.format_messages_for_llm(messages),
+            }
         params['tools'] = check_tools(self.tools, self.llm.config)
         params['extra_body'] = {'metadata': state.to_llm_metadata(agent_name=self.name)}
-        response = self.llm.completion(**params)
+        with profile_span('llm_completion', model=self.llm.config.model):
+            response = self.llm.completion(**params)
         logger.debug(f'Response from LLM: {response}')
-        actions = self.response_to_actions(response)
+        with profile_span('parse_response'):
+            actions = self.response_to_actions(response)
         logger.debug(f'Actions after response_to_actions: {actions}')
         for action in actions:
             self.pending_actions.append(action)
@@ -252,12 +258,13 @@ class CodeActAgent(Agent):
             raise Exception('Prompt Manager not instantiated.')
 
         # Use ConversationMemory to process events (including SystemMessageAction)
-        messages = self.conversation_memory.process_events(
-            condensed_history=events,
-            initial_user_action=initial_user_message,
-            max_message_chars=self.llm.config.max_message_chars,
-            vision_is_active=self.llm.vision_is_active(),
-        )
+        with profile_span('process_events', events=len(events)):
+            messages = self.conversation_memory.process_events(
+                condensed_history=events,
+                initial_user_action=initial_user_message,
+                max_message_chars=self.llm.config.max_message_chars,
+                vision_is_active=self.llm.vision_is_active(),
+            )
 
         if self.llm.is_caching_prompt_active():
             self.conversation_memory.apply_prompt_caching(messages)
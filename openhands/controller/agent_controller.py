@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import copy
+import json
 import os
 import time
 import traceback
@@ -39,6 +40,7 @@ from openhands.core.exceptions import (
 )
 from openhands.core.logger import LOG_ALL_EVENTS
 from openhands.core.logger import openhands_logger as logger
+from openhands.core.novel_chapter_pipeline import is_chapter_request
 from openhands.core.schema import AgentState
 from openhands.events import (
     EventSource,
@@ -69,10 +71,20 @@ from openhands.events.observation import (
     NullObservation,
     Observation,
 )
-from openhands.events.serialization.event import event_to_trajectory, truncate_content
+from openhands.events.serialization.event import (
+    event_to_dict,
+    event_to_trajectory,
+    truncate_content,
+)
 from openhands.llm.llm import LLM
 from openhands.llm.metrics import Metrics, TokenUsage
 from openhands.memory.view import View
+from openhands.utils.profiler import profile_span, profile_step
+from openhands.utils.prometheus import Histogram
+
+STEP_LATENCY = Histogram(
+    'openhands_agent_step_seconds', 'Time taken by agent steps', ['agent']
+)
 
 # note: RESUME is only available on web GUI
 TRAFFIC_CONTROL_REMINDER = (
@@ -136,6 +148,9 @@ class AgentController:
         self.agent = agent
         self.headless_mode = headless_mode
         self.is_delegate = is_delegate
+        self._agent_state_waiters: list[
+            tuple[asyncio.AbstractEventLoop, asyncio.Event]
+        ] = []
 
         # the event stream must be set before maybe subscribing to it
         self.event_stream = event_stream
@@ -416,6 +431,11 @@ class AgentController:
         if self.agent_history_filter.include(event):
             self.state.history.append(event)
 
+        # Chapter requests are answered by the chapter pipeline of the session: they
+        # are only kept in the history, as context for the next messages
+        if is_chapter_request(event) and event.source == EventSource.USER:
+            return
+
         if isinstance(event, Action):
             await self._handle_action(event)
         elif isinstance(event, Observation):
@@ -658,6 +678,45 @@ class AgentController:
             AgentStateChangedObservation('', self.state.agent_state, reason),
             EventSource.ENVIRONMENT,
         )
+        self._notify_agent_state_waiters()
+
+    def _notify_agent_state_waiters(self) -> None:
+        # Waiters may be on a different loop (and thread) to the one changing the state
+        for loop, changed in list(self._agent_state_waiters):
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:
+                # The loop of the waiter was closed
+                pass
+
+    async def wait_for_agent_state(
+        self, states: list[AgentState], poll_interval: float = 1.0
+    ) -> AgentState:
+        """Waits until the agent reaches one of the given states, waking as soon as it changes.
+
+        Args:
+            states: The states to wait for.
+            poll_interval: As a fallback for state changes made without set_agent_state_to,
+                the state is also checked at this interval.
+
+        Returns:
+            AgentState: The state the agent reached.
+        """
+        changed = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), changed)
+        self._agent_state_waiters.append(waiter)
+        try:
+            while True:
+                # Clear before checking, so a change between the check and the wait is not missed
+                changed.clear()
+                if self.state.agent_state in states:
+                    return self.state.agent_state
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._agent_state_waiters.remove(waiter)
 
     def get_agent_state(self) -> AgentState:
         """Returns the current state of the agent.
@@ -796,6 +855,19 @@ class AgentController:
             )
             return
 
+        started_at = time.perf_counter()
+        try:
+            with profile_step(
+                self.event_stream, controller=self.id, iteration=self.state.iteration
+            ):
+                await self._step_agent()
+        finally:
+            STEP_LATENCY.labels(self.agent.name).observe(
+                time.perf_counter() - started_at
+            )
+
+    async def _step_agent(self) -> None:
+        """Runs a step of the agent, unless it reached a limit or is stuck."""
         self.log(
             'debug',
             f'LEVEL {self.state.delegate_level} LOCAL STEP {self.state.local_iteration} GLOBAL STEP {self.state.iteration}',
@@ -823,6 +895,15 @@ class AgentController:
             )
             return
 
+        if (
+            self.agent.config.enable_budgeted_history_truncation
+            and self.agent.config.enable_history_truncation
+            and not self._replay_manager.should_replay()
+            and self._trim_history_to_token_budget()
+        ):
+            # The condensation triggers another step, with the trimmed history
+            return
+
         self.update_state_before_step()
         action: Action = NullAction()
 
@@ -832,7 +913,8 @@ class AgentController:
             action = self._replay_manager.step()
         else:
             try:
-                action = self.agent.step(self.state)
+                with profile_span('agent.step', agent=self.agent.name):
+                    action = self.agent.step(self.state)
                 if action is None:
                     raise LLMNoActionError('No action was returned')
                 action._source = EventSource.AGENT  # type: ignore [attr-defined]
@@ -1164,11 +1246,35 @@ class AgentController:
         # When context window is exceeded, keep roughly half of agent interactions
         current_view = View.from_events(self.state.history)
         kept_events = self._apply_conversation_window(current_view.events)
+        self._forget_events_not_in(kept_events, 'Context window exceeded.')
+
+    def _trim_history_to_token_budget(self) -> bool:
+        """Trims the history before a step if it doesn't fit the LLM's input token limit.
+
+        Returns:
+            bool: True if events were forgotten, and the step should be skipped.
+        """
+        max_input_tokens = self.agent.llm.config.max_input_tokens
+        if not max_input_tokens:
+            return False
+        budget = max_input_tokens - self.agent.config.history_truncation_reserve_tokens
+        current_view = View.from_events(self.state.history)
+        kept_events = self._apply_token_budget_window(current_view.events, budget)
+        kept_event_ids = {e.id for e in kept_events}
+        if all(e.id in kept_event_ids for e in current_view.events):
+            return False
+        self._forget_events_not_in(
+            kept_events, f'History exceeds the token budget ({budget}).'
+        )
+        return True
+
+    def _forget_events_not_in(self, kept_events: list[Event], reason: str) -> None:
+        """Adds a condensation forgetting the events of the history not in kept_events."""
         kept_event_ids = {e.id for e in kept_events}
 
         self.log(
             'info',
-            f'Context window exceeded. Keeping events with IDs: {kept_event_ids}',
+            f'{reason} Keeping events with IDs: {kept_event_ids}',
         )
 
         # The events to forget are those that are not in the kept set
@@ -1223,6 +1329,107 @@ class AgentController:
         if not history:
             return []
         # 1. Identify essential initial events
+        essential_events = self._get_essential_events(history)
+
+        # 2. Determine the slice of recent events to potentially keep
+        num_non_essential_events = len(history) - len(essential_events)
+        # Keep roughly half of the non-essential events, minimum 1
+        num_recent_to_keep = max(1, num_non_essential_events // 2)
+
+        # Calculate the starting index for the recent slice
+        slice_start_index = len(history) - num_recent_to_keep
+        slice_start_index = max(0, slice_start_index)  # Ensure index is not negative
+        recent_events_slice = history[slice_start_index:]
+
+        # 3. Validate the start of the recent slice for dangling observations
+        validated_recent_events = self._drop_dangling_observations(recent_events_slice)
+
+        # 4. Combine essential events and validated recent events
+        events_to_keep: list[Event] = essential_events + validated_recent_events
+        self.log('debug', f'History truncated. Kept {len(events_to_keep)} events.')
+
+        return events_to_keep
+
+    def _apply_token_budget_window(
+        self, history: list[Event], budget: int
+    ) -> list[Event]:
+        """Keeps the newest events that fit in a token budget, and the essential initial events.
+
+        Like `_apply_conversation_window`, it always keeps the system message, the first
+        user message and its recall observation, and doesn't start the recent events with
+        observations whose action was cut. But instead of halving the history, it keeps the
+        longest suffix whose estimated token count fits in what the essential events leave
+        of the budget.
+
+        Args:
+            history: List of events to filter
+            budget: The number of tokens the kept events should fit in
+
+        Returns:
+            The history if it fits in the budget, else the essential events and the newest events fitting.
+        """
+        if not history:
+            return []
+        essential_events = self._get_essential_events(history)
+        essential_event_ids = {e.id for e in essential_events}
+        history_event_ids = {e.id for e in history}
+        events_to_count = history + [
+            e for e in essential_events if e.id not in history_event_ids
+        ]
+        token_counts = dict(
+            zip(
+                (e.id for e in events_to_count),
+                self._estimate_event_tokens(events_to_count),
+            )
+        )
+
+        remaining = budget - sum(token_counts[e.id] for e in essential_events)
+        slice_start_index = len(history)
+        for i in range(len(history) - 1, -1, -1):
+            if history[i].id in essential_event_ids:
+                continue
+            remaining -= token_counts[history[i].id]
+            if remaining < 0:
+                break
+            slice_start_index = i
+        else:
+            # The whole history fits
+            return history
+
+        if slice_start_index == len(history):
+            # Keep at least the newest event, even if it doesn't fit
+            slice_start_index -= 1
+        recent_events = [
+            e for e in history[slice_start_index:] if e.id not in essential_event_ids
+        ]
+        events_to_keep = essential_events + self._drop_dangling_observations(
+            recent_events
+        )
+        self.log(
+            'debug',
+            f'History truncated to {budget} tokens. Kept {len(events_to_keep)} events.',
+        )
+        return events_to_keep
+
+    def _estimate_event_tokens(self, events: list[Event]) -> list[int]:
+        """Estimates the number of tokens each event takes in the prompt.
+
+        Each event is counted as a message of its content: the content of observations,
+        and the arguments of actions. The counts are cached by the LLM, so only events
+        new since the last step are tokenized.
+        """
+        messages = []
+        for event in events:
+            if isinstance(event, Observation):
+                content = event.content
+            else:
+                content = json.dumps(event_to_dict(event).get('args', {}), default=str)
+            role = 'user' if event.source == EventSource.USER else 'assistant'
+            messages.append({'role': role, 'content': content})
+        return self.agent.llm.get_token_counts(messages)
+
+    def _get_essential_events(self, history: list[Event]) -> list[Event]:
+        """The system message, first user message and its recall action and observation."""
         system_message: SystemMessageAction | None = None
         first_user_msg: MessageAction | None = None
         recall_action: RecallAction | None = None
@@ -1291,35 +1498,27 @@ class AgentController:
             # Include recall action without observation for backward compatibility
             elif recall_action:
                 essential_events.append(recall_action)
+        return essential_events
 
-        # 2. Determine the slice of recent events to potentially keep
-        num_non_essential_events = len(history) - len(essential_events)
-        # Keep roughly half of the non-essential events, minimum 1
-        num_recent_to_keep = max(1, num_non_essential_events // 2)
-
-        # Calculate the starting index for the recent slice
-        slice_start_index = len(history) - num_recent_to_keep
-        slice_start_index = max(0, slice_start_index)  # Ensure index is not negative
-        recent_events_slice = history[slice_start_index:]
-
-        # 3. Validate the start of the recent slice for dangling observations
+    def _drop_dangling_observations(self, events: list[Event]) -> list[Event]:
+        """Removes the observations at the start of events, whose action was cut."""
         # IMPORTANT: Most observations in history are tool call results, which cannot be without their action, or we get an LLM API error
         first_valid_event_index = 0
-        for i, event in enumerate(recent_events_slice):
+        for i, event in enumerate(events):
             if isinstance(event, Observation):
                 first_valid_event_index += 1
             else:
                 break
         # If all events in the slice are dangling observations, we need to keep at least one
-        if first_valid_event_index == len(recent_events_slice):
+        if first_valid_event_index == len(events):
             self.log(
                 'warning',
                 'All recent events are dangling observations, which we truncate. This means the agent has only the essential first events. This should not happen.',
             )
 
-        # Adjust the recent_events_slice if dangling observations were found at the start
-        if first_valid_event_index < len(recent_events_slice):
-            validated_recent_events = recent_events_slice[first_valid_event_index:]
+        # Adjust the events if dangling observations were found at the start
+        if first_valid_event_index < len(events):
+            validated_recent_events = events[first_valid_event_index:]
             if first_valid_event_index > 0:
                 self.log(
                     'debug',
@@ -1327,12 +1526,7 @@ class AgentController:
                 )
         else:
             validated_recent_events = []
-
-        # 4. Combine essential events and validated recent events
-        events_to_keep: list[Event] = essential_events + validated_recent_events
-        self.log('debug', f'History truncated. Kept {len(events_to_keep)} events.')
-
-        return events_to_keep
+        return validated_recent_events
 
     def _is_stuck(self) -> bool:
         """Checks if the agent or its delegate is stuck in a loop.
@@ -36,6 +36,10 @@ class AgentConfig(BaseModel):
     """A list of microagents to disable (by name, without .py extension, e.g. ["github", "lint"]). Default is None."""
     enable_history_truncation: bool = Field(default=True)
     """Whether history should be truncated to continue the session when hitting LLM context length limit."""
+    enable_budgeted_history_truncation: bool = Field(default=False)
+    """Whether history should be truncated before each step to fit the LLM's max_input_tokens, keeping as many recent events as fit, instead of being halved after hitting the limit. Requires enable_history_truncation."""
+    history_truncation_reserve_tokens: int = Field(default=8192)
+    """The tokens of max_input_tokens left out of the budget of the history when truncating it to a token budget, for the tool definitions, prompt extensions and formatting which the estimates of the events don't count."""
     enable_som_visual_browsing: bool = Field(default=True)
     """Whether to enable SoM (Set of Marks) visual browsing."""
     condenser: CondenserConfig = Field(
@@ -155,6 +155,33 @@ class StructuredSummaryCondenserConfig(BaseModel):
     model_config = {'extra': 'forbid'}
 
 
+class StoryBibleCondenserConfig(BaseModel):
+    """Configuration for StoryBibleCondenser instances."""
+
+    type: Literal['story_bible'] = Field('story_bible')
+    llm_config: LLMConfig = Field(
+        ...,
+        description='Configuration for the LLM to use for updating the story bible.',
+    )
+
+    keep_first: int = Field(
+        default=1,
+        description='Number of initial events to always keep in history.',
+        ge=0,
+    )
+    max_size: int = Field(
+        default=20,
+        description='Maximum size of the condensed history before triggering forgetting.',
+        ge=2,
+    )
+    max_event_length: int = Field(
+        default=10_000,
+        description='Maximum length of the event representations to be passed to the LLM.',
+    )
+
+    model_config = {'extra': 'forbid'}
+
+
 class CondenserPipelineConfig(BaseModel):
     """Configuration for the CondenserPipeline.
 
@@ -180,6 +207,7 @@ CondenserConfig = (
     | AmortizedForgettingCondenserConfig
     | LLMAttentionCondenserConfig
     | StructuredSummaryCondenserConfig
+    | StoryBibleCondenserConfig
     | CondenserPipelineConfig
 )
 
@@ -221,7 +249,7 @@ def condenser_config_from_toml_section(
 
         # Handle LLM config reference if needed
         if (
-            condenser_type in ('llm', 'llm_attention')
+            condenser_type in ('llm', 'llm_attention', 'story_bible')
             and 'llm_config' in data
             and isinstance(data['llm_config'], str)
         ):
@@ -284,6 +312,7 @@ def create_condenser_config(condenser_type: str, data: dict) -> CondenserConfig:
         'amortized': AmortizedForgettingCondenserConfig,
         'llm_attention': LLMAttentionCondenserConfig,
         'structured': StructuredSummaryCondenserConfig,
+        'story_bible': StoryBibleCondenserConfig,
     }
 
     if condenser_type not in condenser_classes:
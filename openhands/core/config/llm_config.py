@@ -45,6 +45,8 @@ class LLMConfig(BaseModel):
         native_tool_calling: Whether to use native tool calling if supported by the model. Can be True, False, or not set.
         reasoning_effort: The effort to put into reasoning. This is a string that can be one of 'low', 'medium', 'high', or 'none'. Exclusive for o1 models.
         seed: The seed to use for the LLM.
+        cache_responses: Whether to answer repeated deterministic completions (temperature 0, or marked cacheable) from a cache.
+        response_cache_dir: The folder where cached responses are also kept on disk. If not set, they are only kept in memory.
     """
 
     model: str = Field(default='claude-sonnet-4-20250514')
@@ -86,6 +88,8 @@ class LLMConfig(BaseModel):
     native_tool_calling: bool | None = Field(default=None)
     reasoning_effort: str | None = Field(default='high')
     seed: int | None = Field(default=None)
+    cache_responses: bool = Field(default=False)
+    response_cache_dir: str | None = Field(default=None)
 
     model_config = {'extra': 'forbid'}
 
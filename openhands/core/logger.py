@@ -5,6 +5,7 @@ import re
 import sys
 import traceback
 from datetime import datetime
+from functools import lru_cache
 from types import TracebackType
 from typing import Any, Literal, Mapping, MutableMapping, TextIO
 
@@ -12,6 +13,8 @@ import litellm
 from pythonjsonlogger.json import JsonFormatter
 from termcolor import colored
 
+from openhands.utils.secret_redactor import SecretRedactor
+
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
 DEBUG = os.getenv('DEBUG', 'False').lower() in ['true', '1', 'yes']
 DEBUG_LLM = os.getenv('DEBUG_LLM', 'False').lower() in ['true', '1', 'yes']
@@ -231,6 +234,32 @@ class RollingLogger:
         sys.stdout.flush()
 
 
+# Obvious sensitive values which may appear in the log message itself...
+_SENSITIVE_PATTERNS = [
+    'api_key',
+    'aws_access_key_id',
+    'aws_secret_access_key',
+    'e2b_api_key',
+    'github_token',
+    'jwt_secret',
+    'modal_api_token_id',
+    'modal_api_token_secret',
+    'llm_api_key',
+    'sandbox_env_github_token',
+    'daytona_api_key',
+]
+# ...including their env var names
+_SENSITIVE_PATTERNS.extend([attr.upper() for attr in _SENSITIVE_PATTERNS])
+_SENSITIVE_ASSIGNMENT_RE = re.compile(
+    rf"({'|'.join(_SENSITIVE_PATTERNS)})='?([\w-]+)'?"
+)
+
+
+@lru_cache(maxsize=8)
+def _get_sensitive_value_redactor(sensitive_values: tuple[str, ...]) -> SecretRedactor:
+    return SecretRedactor(sensitive_values, replacement='******')
+
+
 class SensitiveDataFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
         # Gather sensitive values which should not ever appear in the logs.
@@ -244,33 +273,12 @@ class SensitiveDataFilter(logging.Filter):
             ):
                 sensitive_values.append(value)
 
-        # Replace sensitive values from env!
+        # Replace sensitive values from env! The matcher is only rebuilt when the env changes.
         msg = record.getMessage()
-        for sensitive_value in sensitive_values:
-            msg = msg.replace(sensitive_value, '******')
+        msg = _get_sensitive_value_redactor(tuple(sensitive_values)).redact(msg)
 
         # Replace obvious sensitive values from log itself...
-        sensitive_patterns = [
-            'api_key',
-            'aws_access_key_id',
-            'aws_secret_access_key',
-            'e2b_api_key',
-            'github_token',
-            'jwt_secret',
-            'modal_api_token_id',
-            'modal_api_token_secret',
-            'llm_api_key',
-            'sandbox_env_github_token',
-            'daytona_api_key',
-        ]
-
-        # add env var names
-        env_vars = [attr.upper() for attr in sensitive_patterns]
-        sensitive_patterns.extend(env_vars)
-
-        for attr in sensitive_patterns:
-            pattern = rf"{attr}='?([\w-]+)'?"
-            msg = re.sub(pattern, f"{attr}='******'", msg)
+        msg = _SENSITIVE_ASSIGNMENT_RE.sub(r"\1='******'", msg)
 
         # Update the record
         record.msg = msg
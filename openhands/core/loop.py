@@ -41,5 +41,5 @@ async def run_agent_until_done(
     controller.status_callback = status_callback
     memory.status_callback = status_callback
 
-    while controller.state.agent_state not in end_states:
-        await asyncio.sleep(1)
+    # Wakes as soon as the controller changes state, rather than polling
+    await controller.wait_for_agent_state(end_states)
@@ -0,0 +1,274 @@
+"""Long-form chapter generation for Novel Writing Mode.
+
+A chapter is written in three stages instead of one completion capped by the output
+token limit: an outline splitting it into scenes, a draft of each scene, and a merge of
+the scenes into the chapter. Scenes are drafted concurrently (each one only needs the
+outline), and the text of every stage is streamed as it is generated.
+
+The result of each stage is saved in a checkpoint, so that a chapter which failed (or
+was interrupted) is resumed where it stopped: the outline and the scenes already drafted
+are not generated again.
+"""
+
+import asyncio
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.core.novel_writing_config import NovelWritingConfig
+from openhands.core.novel_writing_prompts import (
+    CHAPTER_OUTLINE_PROMPT,
+    CHAPTER_SCENE_PROMPT,
+)
+
+# Streams the text of a completion of messages, generating at most `max_tokens` tokens
+CompletionStream = Callable[[list[dict[str, str]], int], AsyncIterator[str]]
+SaveCheckpoint = Callable[[dict[str, Any]], Awaitable[None]]
+
+# The Novel Writing Mode template which writes a whole chapter
+CHAPTER_TEMPLATE = 'chapter'
+
+_SCENE_SEPARATOR = '\n\n* * *\n\n'
+_DONE = object()
+
+
+def is_chapter_request(event: Any) -> bool:
+    """Whether an event is a user message asking Novel Writing Mode for a chapter."""
+    return bool(
+        getattr(event, 'novel_mode', False)
+        and getattr(event, 'template_used', None) == CHAPTER_TEMPLATE
+    )
+
+
+def new_chapter_checkpoint(request: str) -> dict[str, Any]:
+    return {'request': request, 'outline': None, 'scenes': {}, 'content': None}
+
+
+def parse_chapter_outline(text: str, max_scenes: int) -> dict[str, Any]:
+    """Parse the outline written by the LLM.
+
+    The outline should be JSON, but models sometimes wrap it in prose or a code block,
+    or ignore the format: each non-empty line is then taken as the summary of a scene.
+    """
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if match:
+        try:
+            outline = json.loads(match.group(0))
+            scenes = [
+                {
+                    'title': str(scene.get('title') or f'Adegan {i}'),
+                    'summary': str(scene.get('summary') or ''),
+                }
+                for i, scene in enumerate(outline.get('scenes') or [], 1)
+                if isinstance(scene, dict)
+            ]
+            if scenes:
+                return {
+                    'title': str(outline.get('title') or ''),
+                    'scenes': scenes[:max_scenes],
+                }
+        except (json.JSONDecodeError, AttributeError):
+            pass
+    # Without the list markers (numbers, bullets, headings)
+    lines = [re.sub(r'^[\s\-*#\d.)]+', '', line).strip() for line in text.splitlines()]
+    scenes = [
+        {'title': f'Adegan {i}', 'summary': line}
+        for i, line in enumerate(filter(None, lines), 1)
+    ]
+    if not scenes:
+        raise ValueError('The chapter outline has no scenes')
+    return {'title': '', 'scenes': scenes[:max_scenes]}
+
+
+class ChapterPipeline:
+    """Write a chapter as an outline, concurrently drafted scenes, and their merge.
+
+    `run` yields the progress of the chapter as events (JSON serializable dicts):
+    - `{'type': 'stage', 'stage': ..., 'resumed': ...}` when a stage starts, where
+      `resumed` is true if it was completed before and is read from the checkpoint
+    - `{'type': 'delta', 'stage': 'outline', 'text': ...}` as the outline is written
+    - `{'type': 'outline', 'outline': ...}` when the outline is complete
+    - `{'type': 'delta', 'stage': 'scene', 'scene': i, 'text': ...}` as scenes are
+      written - the deltas of scenes being drafted concurrently are interleaved, and a
+      scene read from the checkpoint is sent as a single delta
+    - `{'type': 'scene', 'scene': i, 'title': ...}` when a scene is complete
+    - `{'type': 'chapter', 'title': ..., 'content': ...}` with the merged chapter
+    """
+
+    def __init__(
+        self,
+        complete: CompletionStream,
+        save_checkpoint: SaveCheckpoint,
+        config: NovelWritingConfig | None = None,
+    ) -> None:
+        self.complete = complete
+        self.save_checkpoint = save_checkpoint
+        self.config = config or NovelWritingConfig()
+
+    async def run(
+        self, request: str, checkpoint: dict[str, Any] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Write the chapter asked for by `request`, resuming from `checkpoint`.
+
+        The checkpoint is updated (and saved) in place as stages complete. A checkpoint
+        for another request is started over.
+        """
+        if checkpoint is None or checkpoint.get('request') != request:
+            checkpoint = new_chapter_checkpoint(request)
+        else:
+            checkpoint.setdefault('scenes', {})
+
+        yield {
+            'type': 'stage',
+            'stage': 'outline',
+            'resumed': checkpoint.get('outline') is not None,
+        }
+        if checkpoint.get('outline') is None:
+            parts = []
+            async for text in self.complete(
+                self._outline_messages(request),
+                self.config.chapter_outline_max_output_tokens,
+            ):
+                parts.append(text)
+                yield {'type': 'delta', 'stage': 'outline', 'text': text}
+            checkpoint['outline'] = parse_chapter_outline(
+                ''.join(parts), self.config.chapter_max_scenes
+            )
+            await self.save_checkpoint(checkpoint)
+        outline = checkpoint['outline']
+        yield {'type': 'outline', 'outline': outline}
+
+        scenes = checkpoint['scenes']
+        yield {
+            'type': 'stage',
+            'stage': 'scenes',
+            'resumed': len(scenes) == len(outline['scenes']),
+        }
+        for i, scene in enumerate(outline['scenes']):
+            if str(i) in scenes:
+                yield {
+                    'type': 'delta',
+                    'stage': 'scene',
+                    'scene': i,
+                    'text': scenes[str(i)],
+                }
+                yield {'type': 'scene', 'scene': i, 'title': scene['title']}
+        async for event in self._draft_scenes(request, checkpoint):
+            yield event
+
+        yield {
+            'type': 'stage',
+            'stage': 'merge',
+            'resumed': checkpoint.get('content') is not None,
+        }
+        if checkpoint.get('content') is None:
+            checkpoint['content'] = _SCENE_SEPARATOR.join(
+                scenes[str(i)] for i in range(len(outline['scenes']))
+            )
+            await self.save_checkpoint(checkpoint)
+        yield {
+            'type': 'chapter',
+            'title': outline['title'],
+            'content': checkpoint['content'],
+        }
+
+    async def _draft_scenes(
+        self, request: str, checkpoint: dict[str, Any]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Draft the scenes missing from the checkpoint concurrently.
+
+        If a scene fails, the others are still completed (and saved) before the error
+        is raised, so that they don't have to be drafted again when resuming.
+        """
+        outline = checkpoint['outline']
+        scenes = checkpoint['scenes']
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max(1, self.config.chapter_scene_concurrency))
+
+        async def draft(i: int) -> None:
+            try:
+                async with semaphore:
+                    parts = []
+                    async for text in self.complete(
+                        self._scene_messages(request, outline, i),
+                        self.config.chapter_scene_max_output_tokens,
+                    ):
+                        parts.append(text)
+                        queue.put_nowait(
+                            {
+                                'type': 'delta',
+                                'stage': 'scene',
+                                'scene': i,
+                                'text': text,
+                            }
+                        )
+                    scenes[str(i)] = ''.join(parts).strip()
+                    await self.save_checkpoint(checkpoint)
+                    queue.put_nowait(
+                        {
+                            'type': 'scene',
+                            'scene': i,
+                            'title': outline['scenes'][i]['title'],
+                        }
+                    )
+            except Exception as e:
+                logger.warning(f'Error drafting scene {i} of a chapter: {e}')
+                raise
+            finally:
+                queue.put_nowait(_DONE)
+
+        tasks = [
+            asyncio.create_task(draft(i))
+            for i in range(len(outline['scenes']))
+            if str(i) not in scenes
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await queue.get()
+                if event is _DONE:
+                    remaining -= 1
+                else:
+                    yield event
+            for task in tasks:
+                if task.exception() is not None:
+                    raise task.exception()  # type: ignore[misc]
+        finally:
+            # The consumer went away (e.g. the client disconnected): stop drafting
+            for task in tasks:
+                task.cancel()
+
+    def _outline_messages(self, request: str) -> list[dict[str, str]]:
+        return [
+            {
+                'role': 'system',
+                'content': CHAPTER_OUTLINE_PROMPT.format(
+                    max_scenes=self.config.chapter_max_scenes
+                ),
+            },
+            {'role': 'user', 'content': request},
+        ]
+
+    def _scene_messages(
+        self, request: str, outline: dict[str, Any], i: int
+    ) -> list[dict[str, str]]:
+        scene = outline['scenes'][i]
+        plan = '\n'.join(
+            f'{number}. {other["title"]}: {other["summary"]}'
+            for number, other in enumerate(outline['scenes'], 1)
+        )
+        return [
+            {
+                'role': 'system',
+                'content': CHAPTER_SCENE_PROMPT.format(
+                    chapter_title=outline['title'],
+                    request=request,
+                    outline=plan,
+                    number=i + 1,
+                    scene_title=scene['title'],
+                    scene_summary=scene['summary'],
+                ),
+            },
+            {'role': 'user', 'content': f'Tulis adegan {i + 1}.'},
+        ]
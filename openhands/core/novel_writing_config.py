@@ -18,6 +18,20 @@ class NovelWritingConfig:
     temperature: float = 0.8
     max_output_tokens: int = 4000
     top_p: float = 0.9
+
+    # Chapter pipeline (outline, then scenes drafted concurrently, then merged)
+    chapter_outline_max_output_tokens: int = 1500
+    chapter_scene_max_output_tokens: int = 4000
+    chapter_max_scenes: int = 8
+    chapter_scene_concurrency: int = 4
+
+    # Story bible: the memory of a novel session beyond its most recent messages,
+    # updated after each exchange by a cheaper model
+    story_bible_model: str = "openai/gpt-4o-mini"
+    story_bible_max_output_tokens: int = 2000
+    # The most recent messages sent with the story bible, and their maximum length
+    recent_messages: int = 4
+    recent_message_max_chars: int = 8000
     
     # OpenRouter specific settings
     openrouter_site_url: str = "https://docs.all-hands.dev/"
@@ -109,4 +109,22 @@ def create_novel_writing_prompt(template: str | None = None, original_prompt: st
         context_section += "\nBerdasarkan permintaan di atas, ajukan pertanyaan spesifik untuk membantu penulis mengembangkan ide mereka lebih lanjut."
         base_prompt += context_section
     
-    return base_prompt
\ No newline at end of file
+    return base_prompt
+
+CHAPTER_OUTLINE_PROMPT = """Anda adalah penulis novel profesional berbahasa Indonesia. Rencanakan satu bab berdasarkan permintaan penulis.
+
+Bagi bab menjadi paling banyak {max_scenes} adegan. Setiap adegan harus bisa ditulis secara terpisah hanya dengan ringkasan adegan-adegan lain, jadi cantumkan di ringkasannya tokoh, tempat, dan apa yang berubah di akhir adegan.
+
+Balas HANYA dengan JSON, tanpa teks lain, dengan format:
+{{"title": "judul bab", "scenes": [{{"title": "judul adegan", "summary": "ringkasan adegan"}}]}}"""
+
+CHAPTER_SCENE_PROMPT = """Anda adalah penulis novel profesional berbahasa Indonesia. Tulis satu adegan dari bab "{chapter_title}" sebagai prosa yang utuh dan siap dibaca: narasi, dialog, dan detail yang hidup. Jangan menulis judul, catatan, atau pertanyaan kepada penulis.
+
+PERMINTAAN PENULIS:
+{request}
+
+RENCANA BAB:
+{outline}
+
+Tulis HANYA adegan {number}: "{scene_title}" - {scene_summary}
+Mulailah tepat setelah akhir adegan sebelumnya, dan berhentilah tepat sebelum adegan berikutnya dimulai."""
@@ -1,23 +1,62 @@
 import asyncio
-from typing import Any, AsyncIterator
+from itertools import islice
+from typing import Any, AsyncIterator, Iterator
 
 from openhands.events.event import Event
-from openhands.events.event_store import EventStore
+from openhands.events.event_store_abc import EventStoreABC
+
+DEFAULT_PAGE_SIZE = 100
 
 
 class AsyncEventStoreWrapper:
-    def __init__(self, event_store: EventStore, *args: Any, **kwargs: Any) -> None:
+    """Iterate the events of an event store without blocking the event loop.
+
+    Events are read from the store in pages on the thread pool, and yielded from
+    memory. With `read_ahead`, the next page is read while the events of the current
+    one are consumed, so that a consumer doing I/O of its own (e.g. sending events to
+    a socket) rarely waits for the store.
+    """
+
+    def __init__(
+        self,
+        event_store: EventStoreABC,
+        *args: Any,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        read_ahead: bool = True,
+        **kwargs: Any,
+    ) -> None:
         self.event_store = event_store
         self.args = args
         self.kwargs = kwargs
+        self.page_size = page_size
+        self.read_ahead = read_ahead
 
     async def __aiter__(self) -> AsyncIterator[Event]:
         loop = asyncio.get_running_loop()
+        events: Iterator[Event] | None = None
 
-        # Create an async generator that yields events
-        for event in self.event_store.get_events(*self.args, **self.kwargs):
-            # Run the blocking get_events() in a thread pool
-            def get_event(e: Event = event) -> Event:
-                return e
+        def read_page() -> list[Event]:
+            # Pages are read one at a time, so the generator is never used by two
+            # threads at once. It is created on the thread pool too, as get_events()
+            # may read from the store before returning it.
+            nonlocal events
+            if events is None:
+                events = iter(self.event_store.get_events(*self.args, **self.kwargs))
+            return list(islice(events, self.page_size))
 
-            yield await loop.run_in_executor(None, get_event)
+        next_page: asyncio.Future | None = loop.run_in_executor(None, read_page)
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+                has_more = len(page) == self.page_size
+                if has_more and self.read_ahead:
+                    next_page = loop.run_in_executor(None, read_page)
+                for event in page:
+                    yield event
+                if has_more and next_page is None:
+                    next_page = loop.run_in_executor(None, read_page)
+        finally:
+            # The consumer stopped early: don't read a page nobody will get
+            if next_page is not None:
+                next_page.cancel()
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.events.event import Event
+from openhands.utils.prometheus import SIZE_BUCKETS, Histogram
+
+# 'thread' gives each subscriber of each stream a dedicated thread (the default),
+# 'shared' dispatches events for all streams using a single bounded pool
+EVENT_DISPATCH_MODE = os.getenv('EVENT_DISPATCH_MODE', 'thread')
+EVENT_DISPATCH_WORKERS = int(os.getenv('EVENT_DISPATCH_WORKERS', '32'))
+
+EVENT_QUEUE_DEPTH = Histogram(
+    'openhands_event_queue_depth',
+    'Events waiting to be delivered, observed as each event is queued',
+    buckets=SIZE_BUCKETS,
+)
+
+
+class DispatchSubscription:
+    """A mailbox of events for one subscriber callback.
+
+    Events are delivered in order, one at a time, by whichever worker of the shared pool
+    picks up the mailbox - no thread is held while the mailbox is empty. Synchronous
+    callbacks run with an event loop dedicated to this subscription set as the current
+    loop (created on first use), so callbacks which run coroutines on the current loop
+    and leave tasks behind on it behave as they would on a dedicated thread.
+    """
+
+    def __init__(
+        self,
+        dispatcher: 'EventDispatcher',
+        callback: Callable[[Event], Any],
+        name: str,
+    ):
+        self.dispatcher = dispatcher
+        self.callback = callback
+        self.name = name
+        self.is_async = asyncio.iscoroutinefunction(callback)
+        self._pending: deque[Event] = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._closed = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def put(self, event: Event) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.append(event)
+            EVENT_QUEUE_DEPTH.observe(len(self._pending))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.dispatcher._schedule(self)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            if self._scheduled:
+                # The mailbox is being drained - the drain closes the loop when done
+                return
+        self._close_loop()
+
+    def _next_event(self) -> Event | None:
+        with self._lock:
+            if self._pending and not self._closed:
+                return self._pending.popleft()
+            self._scheduled = False
+            closed = self._closed
+        if closed:
+            self._close_loop()
+        return None
+
+    def _drain(self) -> None:
+        while (event := self._next_event()) is not None:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                if self.is_async:
+                    self._loop.run_until_complete(self.callback(event))
+                else:
+                    self.callback(event)
+            except Exception as e:
+                self._log_error(e)
+            finally:
+                asyncio.set_event_loop(None)
+
+    async def _drain_async(self) -> None:
+        while (event := self._next_event()) is not None:
+            try:
+                await self.callback(event)
+            except Exception as e:
+                self._log_error(e)
+
+    def _log_error(self, e: Exception) -> None:
+        logger.error(f'Error in event callback {self.name}: {str(e)}', exc_info=True)
+
+    def _close_loop(self) -> None:
+        loop = self._loop
+        self._loop = None
+        if loop is None:
+            return
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        try:
+            loop.close()
+        except Exception as e:
+            logger.warning(f'Error closing loop for {self.name}: {e}')
+
+
+class EventDispatcher:
+    """Delivers events from any number of event streams to their subscribers using a
+    bounded pool of threads shared by all of them.
+
+    Coroutine function callbacks run on `async_loop` when one is set (e.g. the main
+    loop of the server), rather than occupying a thread from the pool.
+    """
+
+    def __init__(self, max_workers: int = EVENT_DISPATCH_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='event_dispatch'
+        )
+        self.async_loop: asyncio.AbstractEventLoop | None = None
+
+    def set_async_loop(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        self.async_loop = loop
+
+    def subscribe(
+        self, callback: Callable[[Event], Any], name: str
+    ) -> DispatchSubscription:
+        return DispatchSubscription(self, callback, name)
+
+    def _schedule(self, subscription: DispatchSubscription) -> None:
+        loop = self.async_loop
+        if subscription.is_async and loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(subscription._drain_async(), loop)
+        else:
+            self._executor.submit(subscription._drain)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_shared_dispatcher: EventDispatcher | None = None
+_shared_dispatcher_lock = threading.Lock()
+
+
+def get_shared_dispatcher() -> EventDispatcher:
+    global _shared_dispatcher
+    with _shared_dispatcher_lock:
+        if _shared_dispatcher is None:
+            _shared_dispatcher = EventDispatcher()
+        return _shared_dispatcher
+
+
+def get_default_dispatcher() -> EventDispatcher | None:
+    """Get the dispatcher event streams use when none is specified, based on EVENT_DISPATCH_MODE."""
+    if EVENT_DISPATCH_MODE == 'shared':
+        return get_shared_dispatcher()
+    return None
@@ -1,5 +1,8 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Any, Iterable
 from urllib.parse import urlencode
 
 import httpx  # type: ignore
@@ -10,6 +13,32 @@ from openhands.events.event_filter import EventFilter
 from openhands.events.event_store_abc import EventStoreABC
 from openhands.events.serialization.event import event_from_dict
 
+# The number of events read at once from the nested server
+NESTED_EVENTS_PAGE_SIZE = int(os.getenv('NESTED_EVENTS_PAGE_SIZE', '1000'))
+# The largest page accepted by servers which predate larger pages
+_LEGACY_PAGE_SIZE = 100
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_prefetch_executor = ThreadPoolExecutor(thread_name_prefix='nested-event-store')
+
+
+def _get_client() -> httpx.Client:
+    """The client shared by the nested event stores, which keeps connections open."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client()
+        return _client
+
+
+def _is_no_event(response: httpx.Response) -> bool:
+    """Whether a 404 response means there is no such event (and not an unknown route)."""
+    try:
+        return response.json().get('error') == 'no_event'
+    except (ValueError, AttributeError):
+        return False
+
 
 @dataclass
 class NestedEventStore(EventStoreABC):
@@ -21,6 +50,7 @@ class NestedEventStore(EventStoreABC):
     sid: str
     user_id: str | None
     session_api_key: str | None = None
+    page_size: int = NESTED_EVENTS_PAGE_SIZE
 
     def search_events(
         self,
@@ -30,42 +60,57 @@ class NestedEventStore(EventStoreABC):
         filter: EventFilter | None = None,
         limit: int | None = None,
     ) -> Iterable[Event]:
-        while True:
-            search_params = {
-                'start_id': start_id,
-                'reverse': reverse,
-            }
-            if limit is not None:
-                search_params['limit'] = min(100, limit)
-            search_str = urlencode(search_params)
-            url = f'{self.base_url}/events?{search_str}'
-            headers = {}
-            if self.session_api_key:
-                headers['X-Session-API-Key'] = self.session_api_key
-            response = httpx.get(url, headers=headers)
-            if response.status_code == status.HTTP_404_NOT_FOUND:
-                # Follow pattern of event store not throwing errors on not found
-                return
-            result_set = response.json()
-            for result in result_set['events']:
-                event = event_from_dict(result)
-                start_id = max(start_id, event.id + 1)
-                if end_id == event.id:
-                    if not filter or filter.include(event):
-                        yield event
-                    return
-                if filter and filter.exclude(event):
-                    continue
-                yield event
-                if limit is not None:
-                    limit -= 1
-                    if limit <= 0:
+        # The next page is read while the events of the current one are consumed
+        next_page: Future | None = None
+        try:
+            page = self._search_page(start_id, end_id, reverse, limit)
+            while page is not None:
+                results = page['events']
+                if page['has_more'] and results:
+                    last_id = results[-1]['id']
+                    if reverse:
+                        end_id = last_id - 1
+                    else:
+                        start_id = max(start_id, last_id + 1)
+                    # Without a filter, every event of this page counts in the limit
+                    next_limit = limit
+                    if limit is not None and filter is None:
+                        next_limit = limit - len(results)
+                    if (next_limit is None or next_limit > 0) and (
+                        end_id is None or start_id <= end_id
+                    ):
+                        next_page = _prefetch_executor.submit(
+                            self._search_page, start_id, end_id, reverse, next_limit
+                        )
+                for result in results:
+                    event = event_from_dict(result)
+                    if end_id == event.id and not reverse:
+                        if not filter or filter.include(event):
+                            yield event
                         return
-            if not result_set['has_more']:
-                return
+                    if filter and filter.exclude(event):
+                        continue
+                    yield event
+                    if limit is not None:
+                        limit -= 1
+                        if limit <= 0:
+                            return
+                if next_page is None:
+                    return
+                page = next_page.result()
+                next_page = None
+        finally:
+            if next_page is not None:
+                next_page.cancel()
 
     def get_event(self, id: int) -> Event:
-        events = list(self.search_events(start_id=id, limit=1))
+        response = self._get(f'{self.base_url}/events/{id}')
+        if response.status_code == status.HTTP_200_OK:
+            return event_from_dict(response.json())
+        if response.status_code == status.HTTP_404_NOT_FOUND and _is_no_event(response):
+            raise FileNotFoundError('no_event')
+        # A server without the endpoint for single events
+        events = list(self.search_events(start_id=id, end_id=id, limit=1))
         if not events:
             raise FileNotFoundError('no_event')
         return events[0]
@@ -77,5 +122,43 @@ class NestedEventStore(EventStoreABC):
         return events[0]
 
     def get_latest_event_id(self) -> int:
+        response = self._get(f'{self.base_url}/events/latest-id')
+        if response.status_code == status.HTTP_200_OK:
+            return response.json()['id']
+        if response.status_code == status.HTTP_404_NOT_FOUND and _is_no_event(response):
+            raise FileNotFoundError('no_event')
+        # A server without the endpoint for the latest ID
         event = self.get_latest_event()
         return event.id
+
+    def _search_page(
+        self, start_id: int, end_id: int | None, reverse: bool, limit: int | None
+    ) -> dict[str, Any] | None:
+        """Get a page of events, or None if the conversation was not found."""
+        search_params: dict[str, Any] = {'start_id': start_id}
+        if end_id is not None:
+            search_params['end_id'] = end_id
+        search_params['reverse'] = reverse
+        search_params['limit'] = (
+            self.page_size if limit is None else min(self.page_size, limit)
+        )
+        url = f'{self.base_url}/events?{urlencode(search_params)}'
+        response = self._get(url)
+        if (
+            response.status_code == status.HTTP_400_BAD_REQUEST
+            and search_params['limit'] > _LEGACY_PAGE_SIZE
+        ):
+            # The server only accepts smaller pages
+            self.page_size = _LEGACY_PAGE_SIZE
+            return self._search_page(start_id, end_id, reverse, limit)
+        if response.status_code == status.HTTP_404_NOT_FOUND:
+            # Follow pattern of event store not throwing errors on not found
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def _get(self, url: str) -> httpx.Response:
+        headers = {}
+        if self.session_api_key:
+            headers['X-Session-API-Key'] = self.session_api_key
+        return _get_client().get(url, headers=headers)
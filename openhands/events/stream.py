@@ -1,6 +1,7 @@
 import asyncio
 import queue
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
@@ -8,6 +9,12 @@ from functools import partial
 from typing import Any, Callable
 
 from openhands.core.logger import openhands_logger as logger
+from openhands.events.dispatcher import (
+    EVENT_QUEUE_DEPTH,
+    DispatchSubscription,
+    EventDispatcher,
+    get_default_dispatcher,
+)
 from openhands.events.event import Event, EventSource
 from openhands.events.event_store import EventStore
 from openhands.events.serialization.event import event_from_dict, event_to_dict
@@ -17,9 +24,22 @@ from openhands.storage.locations import (
     get_conversation_dir,
 )
 from openhands.utils.async_utils import call_sync_from_async
+from openhands.utils.profiler import (
+    profile_callback,
+    profile_link_event,
+    profile_span,
+)
+from openhands.utils.prometheus import Histogram
+from openhands.utils.secret_redactor import SecretRedactor
 from openhands.utils.shutdown_listener import should_continue
 
 
+EVENT_WRITE_LATENCY = Histogram(
+    'openhands_event_store_write_seconds',
+    'Time taken to write events (and full cache pages) to the file store',
+)
+
+
 class EventStreamSubscriber(str, Enum):
     AGENT_CONTROLLER = 'agent_controller'
     SECURITY_ANALYZER = 'security_analyzer'
@@ -48,25 +68,41 @@ class EventStream(EventStore):
     _subscribers: dict[str, dict[str, Callable]]
     _lock: threading.Lock
     _queue: queue.Queue[Event]
-    _queue_thread: threading.Thread
+    _queue_thread: threading.Thread | None
     _queue_loop: asyncio.AbstractEventLoop | None
     _thread_pools: dict[str, dict[str, ThreadPoolExecutor]]
     _thread_loops: dict[str, dict[str, asyncio.AbstractEventLoop]]
-    _write_page_cache: list[dict]
+    _dispatcher: EventDispatcher | None
+    _subscriptions: dict[str, dict[str, DispatchSubscription]]
+    _secret_redactor: SecretRedactor
+    _write_page_cache: list[str | None]
 
-    def __init__(self, sid: str, file_store: FileStore, user_id: str | None = None):
+    def __init__(
+        self,
+        sid: str,
+        file_store: FileStore,
+        user_id: str | None = None,
+        dispatcher: EventDispatcher | None = None,
+    ):
         super().__init__(sid, file_store, user_id)
         self._stop_flag = threading.Event()
         self._queue: queue.Queue[Event] = queue.Queue()
         self._thread_pools = {}
         self._thread_loops = {}
+        self._subscriptions = {}
         self._queue_loop = None
-        self._queue_thread = threading.Thread(target=self._run_queue_loop)
-        self._queue_thread.daemon = True
-        self._queue_thread.start()
+        self._queue_thread = None
+        # With a dispatcher, events are handed to its shared pool as they are added,
+        # so the stream needs no threads of its own
+        self._dispatcher = dispatcher or get_default_dispatcher()
+        if self._dispatcher is None:
+            self._queue_thread = threading.Thread(target=self._run_queue_loop)
+            self._queue_thread.daemon = True
+            self._queue_thread.start()
         self._subscribers = {}
         self._lock = threading.Lock()
         self.secrets = {}
+        self._secret_redactor = SecretRedactor()
         self._write_page_cache = []
 
     def _init_thread_loop(self, subscriber_id: str, callback_id: str) -> None:
@@ -78,7 +114,7 @@ class EventStream(EventStore):
 
     def close(self) -> None:
         self._stop_flag.set()
-        if self._queue_thread.is_alive():
+        if self._queue_thread and self._queue_thread.is_alive():
             self._queue_thread.join()
 
         subscriber_ids = list(self._subscribers.keys())
@@ -98,6 +134,12 @@ class EventStream(EventStore):
         if callback_id not in self._subscribers[subscriber_id]:
             logger.warning(f'Callback not found during cleanup: {callback_id}')
             return
+        if (
+            subscriber_id in self._subscriptions
+            and callback_id in self._subscriptions[subscriber_id]
+        ):
+            self._subscriptions[subscriber_id].pop(callback_id).close()
+
         if (
             subscriber_id in self._thread_loops
             and callback_id in self._thread_loops[subscriber_id]
@@ -134,19 +176,28 @@ class EventStream(EventStore):
         callback: Callable[[Event], None],
         callback_id: str,
     ) -> None:
-        initializer = partial(self._init_thread_loop, subscriber_id, callback_id)
-        pool = ThreadPoolExecutor(max_workers=1, initializer=initializer)
         if subscriber_id not in self._subscribers:
             self._subscribers[subscriber_id] = {}
             self._thread_pools[subscriber_id] = {}
+            self._subscriptions[subscriber_id] = {}
 
         if callback_id in self._subscribers[subscriber_id]:
             raise ValueError(
                 f'Callback ID on subscriber {subscriber_id} already exists: {callback_id}'
             )
 
+        callback = profile_callback(
+            self.sid, f'{subscriber_id.value}/{callback_id}', callback
+        )
+        if self._dispatcher:
+            self._subscriptions[subscriber_id][callback_id] = (
+                self._dispatcher.subscribe(callback, f'{subscriber_id}/{callback_id}')
+            )
+        else:
+            initializer = partial(self._init_thread_loop, subscriber_id, callback_id)
+            pool = ThreadPoolExecutor(max_workers=1, initializer=initializer)
+            self._thread_pools[subscriber_id][callback_id] = pool
         self._subscribers[subscriber_id][callback_id] = callback
-        self._thread_pools[subscriber_id][callback_id] = pool
 
     def unsubscribe(
         self, subscriber_id: EventStreamSubscriber, callback_id: str
@@ -162,71 +213,90 @@ class EventStream(EventStore):
         self._clean_up_subscriber(subscriber_id, callback_id)
 
     def add_event(self, event: Event, source: EventSource) -> None:
+        with profile_span('add_event', event_type=type(event).__name__):
+            self._add_event(event, source)
+
+    def _add_event(self, event: Event, source: EventSource) -> None:
         if event.id != Event.INVALID_ID:
             raise ValueError(
                 f'Event already has an ID:{event.id}. It was probably added back to the EventStream from inside a handler, triggering a loop.'
             )
         event._timestamp = datetime.now().isoformat()
         event._source = source  # type: ignore [attr-defined]
+        # The lock is only held to assign the ID and reserve a slot in the write page -
+        # serialization and storage happen outside of it
         with self._lock:
             event._id = self.cur_id  # type: ignore [attr-defined]
             self.cur_id += 1
 
-            # Take a copy of the current write page
             current_write_page = self._write_page_cache
-
-            data = event_to_dict(event)
-            data = self._replace_secrets(data)
-            event = event_from_dict(data)
-            current_write_page.append(data)
+            page_index = len(current_write_page)
+            current_write_page.append(None)
 
             # If the page is full, create a new page for future events / other threads to use
             if len(current_write_page) == self.cache_size:
                 self._write_page_cache = []
+        profile_link_event(event.id)
 
-        if event.id is not None:
-            # Write the event to the store - this can take some time
-            event_json = json.dumps(data)
-            filename = self._get_filename_for_id(event.id, self.user_id)
-            if len(event_json) > 1_000_000:  # Roughly 1MB in bytes, ignoring encoding
-                logger.warning(
-                    f'Saving event JSON over 1MB: {len(event_json):,} bytes, filename: {filename}',
-                    extra={
-                        'user_id': self.user_id,
-                        'session_id': self.sid,
-                        'size': len(event_json),
-                    },
-                )
+        # Serialize once and redact in place. The event is only rebuilt from the data if
+        # it contained secrets, so that subscribers never see them either.
+        with profile_span('serialize_event'):
+            data = event_to_dict(event)
+            if self._secret_redactor.redact_in_place(data):
+                event = event_from_dict(data)
+            event_json = json.dumps_fast(data)
+
+        # Write the event to the store - this can take some time
+        current_write_page[page_index] = event_json
+        filename = self._get_filename_for_id(event.id, self.user_id)
+        if len(event_json) > 1_000_000:  # Roughly 1MB in bytes, ignoring encoding
+            logger.warning(
+                f'Saving event JSON over 1MB: {len(event_json):,} bytes, filename: {filename}',
+                extra={
+                    'user_id': self.user_id,
+                    'session_id': self.sid,
+                    'size': len(event_json),
+                },
+            )
+        with profile_span('persist_event', size=len(event_json)):
+            started_at = time.perf_counter()
             self.file_store.write(filename, event_json)
 
             # Store the cache page last - if it is not present during reads then it will simply be bypassed.
-            self._store_cache_page(current_write_page)
-        self._queue.put(event)
-
-    def _store_cache_page(self, current_write_page: list[dict]):
+            self._store_cache_page(current_write_page, event.id - page_index)
+            EVENT_WRITE_LATENCY.observe(time.perf_counter() - started_at)
+        if self._dispatcher:
+            self._dispatch(event)
+        else:
+            self._queue.put(event)
+            EVENT_QUEUE_DEPTH.observe(self._queue.qsize())
+
+    def _dispatch(self, event: Event) -> None:
+        """Hand an event to the mailbox of each subscriber, which the dispatcher delivers in order."""
+        for key in sorted(self._subscriptions.keys()):
+            subscriptions = self._subscriptions[key]
+            for subscription in list(subscriptions.values()):
+                subscription.put(event)
+
+    def _store_cache_page(self, current_write_page: list[str | None], start: int):
         """Store a page in the cache. Reading individual events is slow when there are a lot of them, so we use pages."""
         if len(current_write_page) < self.cache_size:
             return
-        start = current_write_page[0]['id']
+        # Events in the page are serialized concurrently - whichever finishes last stores it
+        if any(event_json is None for event_json in current_write_page):
+            return
         end = start + self.cache_size
-        contents = json.dumps(current_write_page)
+        contents = '[' + ','.join(current_write_page) + ']'  # type: ignore [arg-type]
         cache_filename = self._get_filename_for_cache(start, end)
         self.file_store.write(cache_filename, contents)
 
     def set_secrets(self, secrets: dict[str, str]) -> None:
         self.secrets = secrets.copy()
+        self._secret_redactor = SecretRedactor(self.secrets.values())
 
     def update_secrets(self, secrets: dict[str, str]) -> None:
         self.secrets.update(secrets)
-
-    def _replace_secrets(self, data: dict[str, Any]) -> dict[str, Any]:
-        for key in data:
-            if isinstance(data[key], dict):
-                data[key] = self._replace_secrets(data[key])
-            elif isinstance(data[key], str):
-                for secret in self.secrets.values():
-                    data[key] = data[key].replace(secret, '<secret_hidden>')
-        return data
+        self._secret_redactor = SecretRedactor(self.secrets.values())
 
     def _run_queue_loop(self) -> None:
         self._queue_loop = asyncio.new_event_loop()
@@ -10,6 +10,12 @@ from openhands.events.observation import CmdOutputMetadata
 from openhands.events.serialization import event_to_dict
 from openhands.llm.metrics import Metrics
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional - the standard library encoder is used without it
+    orjson = None  # type: ignore[assignment]
+
 
 class OpenHandsJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder that handles datetime and event objects"""
@@ -30,6 +36,7 @@ class OpenHandsJSONEncoder(json.JSONEncoder):
 
 # Create a single reusable encoder instance
 _json_encoder = OpenHandsJSONEncoder()
+_compact_json_encoder = OpenHandsJSONEncoder(separators=(',', ':'))
 
 
 def dumps(obj, **kwargs):
@@ -47,6 +54,21 @@ def dumps(obj, **kwargs):
     return json.dumps(obj, **encoder_kwargs)
 
 
+def dumps_fast(obj) -> str:
+    """Serialize an object to a compact str, using orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                default=_json_encoder.default,
+                option=orjson.OPT_NON_STR_KEYS,
+            ).decode()
+        except TypeError:
+            # e.g. integers over 64 bits, which the standard encoder supports
+            pass
+    return _compact_json_encoder.encode(obj)
+
+
 def loads(json_str, **kwargs):
     """Create a JSON object from str"""
     try:
@@ -1,8 +1,12 @@
 import copy
+import hashlib
+import json
 import os
+import threading
 import time
 import warnings
-from functools import partial
+from collections import OrderedDict
+from functools import lru_cache, partial
 from typing import Any, Callable
 
 import httpx
@@ -33,10 +37,22 @@ from openhands.llm.fn_call_converter import (
     convert_non_fncall_messages_to_fncall_messages,
 )
 from openhands.llm.metrics import Metrics
+from openhands.llm.response_cache import get_response_cache, response_cache_key
 from openhands.llm.retry_mixin import RetryMixin
+from openhands.utils.prometheus import TOKEN_BUCKETS, Histogram
 
 __all__ = ['LLM']
 
+LLM_LATENCY = Histogram(
+    'openhands_llm_latency_seconds', 'Latency of LLM completions', ['model']
+)
+LLM_TOKENS = Histogram(
+    'openhands_llm_tokens',
+    'Tokens used by LLM completions',
+    ['model', 'type'],
+    buckets=TOKEN_BUCKETS,
+)
+
 # tuple of exceptions to retry on
 LLM_RETRY_EXCEPTIONS: tuple[type[Exception], ...] = (
     RateLimitError,
@@ -102,6 +118,20 @@ MODELS_WITHOUT_STOP_WORDS = [
     'o1-2024-12-17',
 ]
 
+# the number of messages whose token count is cached by each LLM
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv('LLM_TOKEN_COUNT_CACHE_SIZE', '10000'))
+
+
+@lru_cache(maxsize=None)
+def _load_tokenizer(identifier: str) -> dict:
+    """Load a custom tokenizer once, for all the LLMs using it."""
+    return create_pretrained_tokenizer(identifier)
+
+
+def _hash_message(message: dict) -> str:
+    serialized = json.dumps(message, sort_keys=True, default=str)
+    return hashlib.blake2b(serialized.encode(), digest_size=16).hexdigest()
+
 
 class LLM(RetryMixin, DebugMixin):
     """The LLM class represents a Language Model instance.
@@ -154,9 +184,13 @@ class LLM(RetryMixin, DebugMixin):
 
         # if using a custom tokenizer, make sure it's loaded and accessible in the format expected by litellm
         if self.config.custom_tokenizer is not None:
-            self.tokenizer = create_pretrained_tokenizer(self.config.custom_tokenizer)
+            self.tokenizer = _load_tokenizer(self.config.custom_tokenizer)
         else:
             self.tokenizer = None
+        # token counts of single messages, keyed by the hash of the message
+        self._token_counts: OrderedDict[str, int] = OrderedDict()
+        self._token_counts_lock = threading.Lock()
+        self._reply_token_count: int | None = None
 
         # set up the completion function
         kwargs: dict[str, Any] = {
@@ -198,6 +232,7 @@ class LLM(RetryMixin, DebugMixin):
         )
 
         self._completion_unwrapped = self._completion
+        self._response_cache = get_response_cache(self.config.response_cache_dir)
 
         @self.retry_decorator(
             num_retries=self.config.num_retries,
@@ -211,6 +246,9 @@ class LLM(RetryMixin, DebugMixin):
             """Wrapper for the litellm completion function. Logs the input and output of the completion function."""
             from openhands.io import json
 
+            # whether the response may be cached even if the completion isn't deterministic
+            cacheable: bool | None = kwargs.pop('cacheable', None)
+
             messages_kwarg: list[dict[str, Any]] | dict[str, Any] = []
             mock_function_calling = not self.is_function_calling_active()
 
@@ -287,13 +325,24 @@ class LLM(RetryMixin, DebugMixin):
 
             # Record start time for latency measurement
             start_time = time.time()
-            # we don't support streaming here, thus we get a ModelResponse
-            resp: ModelResponse = self._completion_unwrapped(*args, **kwargs)
+            cache_key = self._response_cache_key(kwargs, cacheable)
+            cached_resp = (
+                self._response_cache.get(cache_key, self.config.model)
+                if cache_key is not None
+                else None
+            )
+            resp: ModelResponse
+            if cached_resp is not None:
+                resp = cached_resp
+            else:
+                # we don't support streaming here, thus we get a ModelResponse
+                resp = self._completion_unwrapped(*args, **kwargs)
 
-            # Calculate and record latency
-            latency = time.time() - start_time
-            response_id = resp.get('id', 'unknown')
-            self.metrics.add_response_latency(latency, response_id)
+                # Calculate and record latency
+                latency = time.time() - start_time
+                response_id = resp.get('id', 'unknown')
+                self.metrics.add_response_latency(latency, response_id)
+                LLM_LATENCY.labels(self.config.model).observe(latency)
 
             non_fncall_response = copy.deepcopy(resp)
 
@@ -326,6 +375,10 @@ class LLM(RetryMixin, DebugMixin):
                     + str(resp)
                 )
 
+            # cache the response as the LLM returned it, before any conversion
+            if cache_key is not None and cached_resp is None:
+                self._response_cache.put(cache_key, non_fncall_response)
+
             message_back: str = resp['choices'][0]['message']['content'] or ''
             tool_calls: list[ChatCompletionMessageToolCall] = resp['choices'][0][
                 'message'
@@ -339,8 +392,8 @@ class LLM(RetryMixin, DebugMixin):
             # log the LLM response
             self.log_response(message_back)
 
-            # post-process the response first to calculate cost
-            cost = self._post_completion(resp)
+            # post-process the response first to calculate cost (cached responses are free)
+            cost = self._post_completion(resp) if cached_resp is None else 0.0
 
             # log for evals or other scripts that need the raw completion
             if self.config.log_completions:
@@ -388,6 +441,21 @@ class LLM(RetryMixin, DebugMixin):
         """
         return self._completion
 
+    def _response_cache_key(
+        self, kwargs: dict[str, Any], cacheable: bool | None
+    ) -> str | None:
+        """The key of the response of a completion in the cache, if it may be cached.
+
+        Completions may be cached if `cache_responses` is enabled, and they are either
+        deterministic (temperature 0) or called with `cacheable=True`.
+        """
+        if not self.config.cache_responses or cacheable is False:
+            return None
+        params = {**getattr(self._completion_unwrapped, 'keywords', {}), **kwargs}
+        if not cacheable and params.get('temperature') != 0:
+            return None
+        return response_cache_key(self.config.model, kwargs.get('messages', []), params)
+
     def init_model_info(self) -> None:
         if self._tried_model_info:
             return
@@ -622,6 +690,11 @@ class LLM(RetryMixin, DebugMixin):
                 context_window = self.model_info['max_input_tokens']
                 logger.debug(f'Using context window: {context_window}')
 
+            LLM_TOKENS.labels(self.config.model, 'prompt').observe(prompt_tokens)
+            LLM_TOKENS.labels(self.config.model, 'completion').observe(
+                completion_tokens
+            )
+
             # Record in metrics
             # We'll treat cache_hit_tokens as "cache read" and cache_write_tokens as "cache write"
             self.metrics.add_token_usage(
@@ -642,11 +715,41 @@ class LLM(RetryMixin, DebugMixin):
     def get_token_count(self, messages: list[dict] | list[Message]) -> int:
         """Get the number of tokens in a list of messages. Use dicts for better token counting.
 
+        This is the sum of the token counts of the messages (see `get_token_counts`),
+        plus the tokens priming the reply.
+
         Args:
             messages (list): A list of messages, either as a list of dicts or as a list of Message objects.
         Returns:
             int: The number of tokens.
         """
+        try:
+            counts = self._count_message_tokens(self._format_for_token_count(messages))
+            return sum(counts) + self._count_reply_tokens()
+        except Exception as e:
+            self._log_token_count_error(e)
+            return 0
+
+    def get_token_counts(self, messages: list[dict] | list[Message]) -> list[int]:
+        """Get the number of tokens in each message of a list.
+
+        The count of each message is cached by a hash of its content, so counting a
+        conversation which grows by a few messages at a time only tokenizes the new ones.
+
+        Args:
+            messages (list): A list of messages, either as a list of dicts or as a list of Message objects.
+        Returns:
+            list[int]: The number of tokens in each message, or zeros if they can't be counted.
+        """
+        try:
+            return self._count_message_tokens(self._format_for_token_count(messages))
+        except Exception as e:
+            self._log_token_count_error(e)
+            return [0] * len(messages)
+
+    def _format_for_token_count(
+        self, messages: list[dict] | list[Message]
+    ) -> list[dict]:
         # attempt to convert Message objects to dicts, litellm expects dicts
         if (
             isinstance(messages, list)
@@ -664,29 +767,53 @@ class LLM(RetryMixin, DebugMixin):
             # We've already asserted that messages is a list of Message objects
             # Use explicit typing to satisfy mypy
             messages_typed: list[Message] = messages  # type: ignore
-            messages = self.format_messages_for_llm(messages_typed)
+            return self.format_messages_for_llm(messages_typed)
+        return messages  # type: ignore
 
-        # try to get the token count with the default litellm tokenizers
+    def _count_tokens(self, messages: list[dict]) -> int:
+        # get the token count with the default litellm tokenizers
         # or the custom tokenizer if set for this LLM configuration
-        try:
-            return int(
-                litellm.token_counter(
-                    model=self.config.model,
-                    messages=messages,
-                    custom_tokenizer=self.tokenizer,
-                )
+        return int(
+            litellm.token_counter(
+                model=self.config.model,
+                messages=messages,
+                custom_tokenizer=self.tokenizer,
             )
-        except Exception as e:
-            # limit logspam in case token count is not supported
-            logger.error(
-                f'Error getting token count for\n model {self.config.model}\n{e}'
-                + (
-                    f'\ncustom_tokenizer: {self.config.custom_tokenizer}'
-                    if self.config.custom_tokenizer is not None
-                    else ''
-                )
+        )
+
+    def _count_reply_tokens(self) -> int:
+        """The tokens counted for any list of messages, even an empty one."""
+        if self._reply_token_count is None:
+            self._reply_token_count = self._count_tokens([])
+        return self._reply_token_count
+
+    def _count_message_tokens(self, messages: list[dict]) -> list[int]:
+        counts = []
+        for message in messages:
+            key = _hash_message(message)
+            with self._token_counts_lock:
+                count = self._token_counts.get(key)
+                if count is not None:
+                    self._token_counts.move_to_end(key)
+            if count is None:
+                count = self._count_tokens([message]) - self._count_reply_tokens()
+                with self._token_counts_lock:
+                    self._token_counts[key] = count
+                    while len(self._token_counts) > TOKEN_COUNT_CACHE_SIZE:
+                        self._token_counts.popitem(last=False)
+            counts.append(count)
+        return counts
+
+    def _log_token_count_error(self, e: Exception) -> None:
+        # limit logspam in case token count is not supported
+        logger.error(
+            f'Error getting token count for\n model {self.config.model}\n{e}'
+            + (
+                f'\ncustom_tokenizer: {self.config.custom_tokenizer}'
+                if self.config.custom_tokenizer is not None
+                else ''
             )
-            return 0
+        )
 
     def _is_local(self) -> bool:
         """Determines if the system is using a locally running LLM.
@@ -0,0 +1,154 @@
+"""A cache of the responses of deterministic LLM completions.
+
+Many completions are repeated with the same inputs: conversation titles for similar
+first messages, connectivity probes, prompt templates, or trajectories replayed in
+evals. With `cache_responses` enabled in the LLM config, completions which are
+deterministic (temperature 0) or explicitly marked `cacheable=True` are answered from
+this cache when the same model was already asked the same messages with the same
+sampling parameters. The cache keeps the most recent responses in memory, and all of
+them on disk when `response_cache_dir` is set, so that they are shared between
+processes and survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from litellm.types.utils import ModelResponse
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.utils.prometheus import Counter
+
+LLM_RESPONSE_CACHE_SIZE = int(os.getenv('LLM_RESPONSE_CACHE_SIZE', '1000'))
+
+LLM_RESPONSE_CACHE_LOOKUPS = Counter(
+    'openhands_llm_response_cache_lookups_total',
+    'Lookups in the LLM response cache, by result (memory_hit, disk_hit or miss)',
+    ['model', 'result'],
+)
+
+# The parameters of a completion which change its response
+_KEY_PARAMS = (
+    'temperature',
+    'top_p',
+    'top_k',
+    'max_tokens',
+    'max_completion_tokens',
+    'seed',
+    'stop',
+    'tools',
+    'tool_choice',
+    'response_format',
+    'reasoning_effort',
+    'base_url',
+    'api_version',
+    'custom_llm_provider',
+)
+
+
+def response_cache_key(model: str, messages: list[Any], params: dict[str, Any]) -> str:
+    """The key of a completion: its model, messages and sampling parameters."""
+    serialized = json.dumps(
+        {
+            'model': model,
+            'messages': messages,
+            'params': {name: params.get(name) for name in _KEY_PARAMS},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(serialized.encode(), digest_size=20).hexdigest()
+
+
+class LLMResponseCache:
+    """The responses of completions, by key: the most recent in memory, all on disk."""
+
+    def __init__(
+        self, directory: str | None = None, max_entries: int = LLM_RESPONSE_CACHE_SIZE
+    ) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        # Responses are kept serialized, so that callers can't change cached responses
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, model: str = '') -> ModelResponse | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+        result = 'memory_hit'
+        if data is None and self.directory is not None:
+            data = self._read(key)
+            if data is not None:
+                result = 'disk_hit'
+                self._remember(key, data)
+        if data is None:
+            LLM_RESPONSE_CACHE_LOOKUPS.labels(model, 'miss').inc()
+            return None
+        LLM_RESPONSE_CACHE_LOOKUPS.labels(model, result).inc()
+        return ModelResponse(**json.loads(data))
+
+    def put(self, key: str, response: ModelResponse) -> None:
+        data = json.dumps(
+            response.model_dump() if isinstance(response, ModelResponse) else response,
+            default=str,
+        )
+        self._remember(key, data)
+        if self.directory is not None:
+            self._write(key, data)
+
+    def clear(self) -> None:
+        """Forget the responses in memory (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, data: str) -> None:
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        assert self.directory is not None
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def _read(self, key: str) -> str | None:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f'Error reading cached LLM response {key}: {e}')
+            return None
+
+    def _write(self, key: str, data: str) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written to a temporary file first, so that readers never see part of it
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f'Error caching LLM response {key}: {e}')
+
+
+_caches: dict[str | None, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(directory: str | None = None) -> LLMResponseCache:
+    """Get the response cache shared by the LLMs using the same directory."""
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = LLMResponseCache(directory)
+        return cache
@@ -19,6 +19,10 @@ from openhands.memory.condenser.impl.pipeline import CondenserPipeline
 from openhands.memory.condenser.impl.recent_events_condenser import (
     RecentEventsCondenser,
 )
+from openhands.memory.condenser.impl.story_bible_condenser import (
+    StoryBible,
+    StoryBibleCondenser,
+)
 from openhands.memory.condenser.impl.structured_summary_condenser import (
     StructuredSummaryCondenser,
 )
@@ -33,5 +37,7 @@ __all__ = [
     'BrowserOutputCondenser',
     'RecentEventsCondenser',
     'StructuredSummaryCondenser',
+    'StoryBible',
+    'StoryBibleCondenser',
     'CondenserPipeline',
 ]
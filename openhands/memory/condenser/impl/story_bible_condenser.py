@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import re
+
+from pydantic import BaseModel, Field
+
+from openhands.core.config.condenser_config import StoryBibleCondenserConfig
+from openhands.core.logger import openhands_logger as logger
+from openhands.core.message import Message, TextContent
+from openhands.events.action.agent import CondensationAction
+from openhands.events.observation.agent import AgentCondensationObservation
+from openhands.events.serialization.event import truncate_content
+from openhands.llm import LLM
+from openhands.memory.condenser.condenser import (
+    Condensation,
+    RollingCondenser,
+    View,
+)
+
+STORY_BIBLE_PROMPT = """You are maintaining the story bible of a novel being written with an AI writing assistant. The story bible is the only memory of the manuscript beyond the most recent exchange, so it must keep everything needed to continue the story consistently, and nothing else.
+
+You will be given the current story bible (possibly empty) and new passages of the conversation. Update the story bible with what the new passages establish or change, keeping what they don't change. Be concise: prefer short facts to prose, and drop details that no longer matter to the story.
+
+Reply ONLY with a JSON object, with these string fields:
+- characters: names, roles, traits, relationships, and current situation of each character
+- locations: places of the story and what matters about them
+- plot_state: what has happened so far, and where the story currently stands
+- style_notes: point of view, tense, tone, language, and the writer's stated preferences
+- open_threads: unresolved conflicts, promises, and mysteries to pay off later
+
+Write the story bible in the language of the manuscript."""
+
+# The sections of a story bible written as text, and their fields
+_SECTIONS = {
+    'Characters': 'characters',
+    'Locations': 'locations',
+    'Plot State': 'plot_state',
+    'Style Notes': 'style_notes',
+    'Open Threads': 'open_threads',
+}
+
+
+class StoryBible(BaseModel):
+    """What a novel has established so far, to continue it without the manuscript."""
+
+    characters: str = Field(default='')
+    locations: str = Field(default='')
+    plot_state: str = Field(default='')
+    style_notes: str = Field(default='')
+    open_threads: str = Field(default='')
+
+    def is_empty(self) -> bool:
+        return not any(self.model_dump().values())
+
+    def __str__(self) -> str:
+        sections = [(title, getattr(self, name)) for title, name in _SECTIONS.items()]
+        return '# Story Bible\n\n' + '\n\n'.join(
+            f'## {title}\n{content}' for title, content in sections if content
+        )
+
+    @classmethod
+    def from_summary(cls, summary: str) -> StoryBible:
+        """Read back a story bible written as text, e.g. in a restored history.
+
+        A summary which isn't a story bible is kept whole as the plot state.
+        """
+        titles = '|'.join(re.escape(title) for title in _SECTIONS)
+        parts = re.split(rf'^## ({titles})\n', summary, flags=re.MULTILINE)
+        fields = {
+            _SECTIONS[title]: content.strip()
+            for title, content in zip(parts[1::2], parts[2::2])
+        }
+        if not fields and summary.strip():
+            fields['plot_state'] = summary.strip()
+        return cls(**fields)
+
+
+def story_bible_prompt(
+    previous: StoryBible | str, passages: list[str], max_passage_length: int = 10_000
+) -> str:
+    """The prompt asking to update a story bible with new passages of a conversation."""
+    prompt = STORY_BIBLE_PROMPT + '\n\n'
+    prompt += f'<STORY BIBLE>\n{previous}\n</STORY BIBLE>\n\n'
+    for passage in passages:
+        passage = truncate_content(passage, max_chars=max_passage_length)
+        prompt += f'<PASSAGE>\n{passage}\n</PASSAGE>\n'
+    return prompt
+
+
+def parse_story_bible(text: str, previous: StoryBible) -> StoryBible:
+    """Parse the story bible written by the LLM, keeping the fields it didn't write."""
+    match = re.search(r'\{.*\}', text or '', re.DOTALL)
+    try:
+        if match is None:
+            raise ValueError('No JSON object found')
+        fields = json.loads(match.group(0))
+        if not isinstance(fields, dict):
+            raise ValueError('Not a JSON object')
+    except (ValueError, json.JSONDecodeError) as e:
+        logger.warning(f'Failed to parse story bible: {e}. Keeping the previous one.')
+        return previous
+    updated = previous.model_dump()
+    for name in StoryBible.model_fields:
+        value = fields.get(name)
+        if isinstance(value, (list, dict)):
+            value = json.dumps(value, ensure_ascii=False)
+        if value:
+            updated[name] = str(value)
+    return StoryBible(**updated)
+
+
+class StoryBibleCondenser(RollingCondenser):
+    """A condenser for novel writing, which folds forgotten events into a story bible.
+
+    Like the LLM summarizing condenser it keeps a prefix and the most recent events,
+    but the summary replacing the forgotten events is a story bible (characters,
+    locations, plot state, style notes and open threads), updated incrementally by
+    what is usually a cheaper model than the one writing the novel.
+    """
+
+    def __init__(
+        self,
+        llm: LLM,
+        max_size: int = 20,
+        keep_first: int = 1,
+        max_event_length: int = 10_000,
+    ):
+        if keep_first >= max_size // 2:
+            raise ValueError(
+                f'keep_first ({keep_first}) must be less than half of max_size ({max_size})'
+            )
+        if keep_first < 0:
+            raise ValueError(f'keep_first ({keep_first}) cannot be negative')
+        if max_size < 1:
+            raise ValueError(f'max_size ({max_size}) cannot be non-positive')
+
+        self.max_size = max_size
+        self.keep_first = keep_first
+        self.max_event_length = max_event_length
+        self.llm = llm
+        self.story_bible = StoryBible()
+
+        super().__init__()
+
+    def get_condensation(self, view: View) -> Condensation:
+        head = view[: self.keep_first]
+        target_size = self.max_size // 2
+        # Number of events to keep from the tail -- target size, minus however many
+        # prefix events from the head, minus one for the story bible event
+        events_from_tail = target_size - len(head) - 1
+
+        summary_event = view[self.keep_first]
+        forgotten_events = [
+            event
+            for event in view[self.keep_first : -events_from_tail]
+            if not isinstance(event, AgentCondensationObservation)
+        ]
+
+        # The story bible in the history if the condenser was created after it (e.g.
+        # when a conversation is restored), so that it is updated and not replaced
+        if self.story_bible.is_empty() and isinstance(
+            summary_event, AgentCondensationObservation
+        ):
+            self.story_bible = StoryBible.from_summary(summary_event.message or '')
+
+        prompt = story_bible_prompt(
+            self.story_bible,
+            [str(event) for event in forgotten_events],
+            self.max_event_length,
+        )
+        messages = [Message(role='user', content=[TextContent(text=prompt)])]
+
+        response = self.llm.completion(
+            messages=self.llm.format_messages_for_llm(messages),
+            extra_body={'metadata': self._llm_metadata},
+        )
+        self.story_bible = parse_story_bible(
+            response.choices[0].message.content, self.story_bible
+        )
+
+        self.add_metadata('response', response.model_dump())
+        self.add_metadata('metrics', self.llm.metrics.get())
+
+        return Condensation(
+            action=CondensationAction(
+                forgotten_events_start_id=min(event.id for event in forgotten_events),
+                forgotten_events_end_id=max(event.id for event in forgotten_events),
+                summary=str(self.story_bible),
+                summary_offset=self.keep_first,
+            )
+        )
+
+    def should_condense(self, view: View) -> bool:
+        return len(view) > self.max_size
+
+    @classmethod
+    def from_config(cls, config: StoryBibleCondenserConfig) -> StoryBibleCondenser:
+        # This condenser cannot take advantage of prompt caching. If it happens
+        # to be set, we'll pay for the cache writes but never get a chance to
+        # save on a read.
+        llm_config = config.llm_config.model_copy()
+        llm_config.caching_prompt = False
+
+        return StoryBibleCondenser(
+            llm=LLM(config=llm_config),
+            max_size=config.max_size,
+            keep_first=config.keep_first,
+            max_event_length=config.max_event_length,
+        )
+
+
+StoryBibleCondenser.register_config(StoryBibleCondenserConfig)
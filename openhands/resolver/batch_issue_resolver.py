@@ -0,0 +1,190 @@
+# flake8: noqa: E501
+
+import asyncio
+import copy
+import os
+import pathlib
+import queue
+import shutil
+import subprocess
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.core.main import create_runtime
+from openhands.resolver.interfaces.issue import Issue
+from openhands.resolver.io_utils import (
+    ResolverOutputWriter,
+    load_resolver_output_index,
+)
+from openhands.resolver.issue_resolver import IssueResolver
+from openhands.resolver.resolver_output import ResolverOutput
+from openhands.runtime.base import Runtime
+
+
+class BatchIssueResolver(IssueResolver):
+    """Resolves a batch of issues concurrently, reusing warm runtimes between them.
+
+    Each of `num_workers` workers creates a runtime on its own copy of the repository
+    the first time it takes an issue, and then takes issues from a shared queue,
+    resetting the runtime to a clean checkout between them rather than building a new
+    one. Results are appended to output.jsonl as each issue finishes, and issues which
+    are already in it are skipped, so an interrupted batch can be resumed.
+    """
+
+    def __init__(self, args: Namespace) -> None:
+        """Initialize the BatchIssueResolver with the given parameters.
+        Params initialized (in addition to those of IssueResolver):
+            issue_numbers: Issues to resolve, or None for all open issues.
+            limit_issues: Maximum number of issues to resolve.
+            num_workers: Number of issues to resolve concurrently.
+        """
+        super().__init__(args)
+        self.issue_numbers: list[int] | None = args.issue_numbers
+        self.limit_issues: int | None = args.limit_issues
+        self.num_workers: int = max(1, args.num_workers)
+
+    def select_issues(self) -> list[Issue]:
+        issue_numbers = self.issue_numbers
+        if not issue_numbers:
+            issue_numbers = [
+                issue['number'] for issue in self.issue_handler.download_issues()
+            ]
+        issues = self.issue_handler.get_converted_issues(issue_numbers=issue_numbers)
+        if self.limit_issues is not None:
+            issues = issues[: self.limit_issues]
+        return issues
+
+    def get_base_commit(self, issue: Issue, default_base_commit: str) -> str:
+        """Get the commit to resolve an issue from, fetching the branch of a PR."""
+        if self.issue_type != 'pr':
+            return default_base_commit
+        if not issue.head_branch:
+            raise ValueError(f'Branch name cannot be None for PR {issue.number}')
+        repo_dir = os.path.join(self.output_dir, 'repo')
+        subprocess.check_output(
+            ['git', 'fetch', 'origin', issue.head_branch], cwd=repo_dir
+        )
+        return (
+            subprocess.check_output(['git', 'rev-parse', 'FETCH_HEAD'], cwd=repo_dir)
+            .decode('utf-8')
+            .strip()
+        )
+
+    def build_worker_workspace_base(self, worker_id: int) -> str:
+        return os.path.abspath(
+            os.path.join(
+                self.output_dir, 'workspace', f'{self.issue_type}_worker_{worker_id}'
+            )
+        )
+
+    async def create_worker_runtime(self, worker_id: int) -> Runtime:
+        """Create a connected and initialized runtime for a worker, on its own copy of the repository."""
+        workspace_base = self.build_worker_workspace_base(worker_id)
+        if os.path.exists(workspace_base):
+            shutil.rmtree(workspace_base)
+        shutil.copytree(os.path.join(self.output_dir, 'repo'), workspace_base)
+
+        config = copy.deepcopy(self.app_config)
+        config.workspace_base = workspace_base
+        config.workspace_mount_path = workspace_base
+        runtime = create_runtime(config)
+        await runtime.connect()
+        self.initialize_runtime(runtime)
+        return runtime
+
+    async def run_worker(
+        self,
+        worker_id: int,
+        pending: 'queue.Queue[tuple[Issue, str]]',
+        write_output: Callable[[ResolverOutput], None],
+    ) -> None:
+        runtime: Runtime | None = None
+        try:
+            while True:
+                try:
+                    issue, base_commit = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if runtime is None:
+                        runtime = await self.create_worker_runtime(worker_id)
+                    output = await self.process_issue(
+                        issue, base_commit, self.issue_handler, runtime=runtime
+                    )
+                except Exception as e:
+                    logger.error(
+                        f'Worker {worker_id} failed to resolve issue {issue.number}: {e}',
+                        exc_info=True,
+                    )
+                    # The runtime may be broken, so the next issue gets a new one
+                    if runtime is not None:
+                        runtime.close()
+                        runtime = None
+                    continue
+                write_output(output)
+        finally:
+            if runtime is not None:
+                runtime.close()
+
+    def _run_worker_in_thread(
+        self,
+        worker_id: int,
+        pending: 'queue.Queue[tuple[Issue, str]]',
+        write_output: Callable[[ResolverOutput], None],
+    ) -> None:
+        # Runtime actions block, so each worker runs its own event loop in its own thread
+        asyncio.run(self.run_worker(worker_id, pending, write_output))
+
+    async def resolve_issues(self) -> None:
+        """Resolve all selected issues which are not already in output.jsonl."""
+        pathlib.Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        pathlib.Path(os.path.join(self.output_dir, 'infer_logs')).mkdir(
+            parents=True, exist_ok=True
+        )
+        logger.info(f'Using output directory: {self.output_dir}')
+
+        default_base_commit = self.checkout_repo()
+        issues = self.select_issues()
+
+        output_file = os.path.join(self.output_dir, 'output.jsonl')
+        logger.info(f'Writing output to {output_file}')
+        processed_numbers: set[int] = set()
+        if os.path.exists(output_file):
+            processed_numbers = set(load_resolver_output_index(output_file))
+
+        pending: queue.Queue[tuple[Issue, str]] = queue.Queue()
+        for issue in issues:
+            if issue.number in processed_numbers:
+                logger.warning(
+                    f'Issue {issue.number} was already processed. Skipping.'
+                )
+                continue
+            pending.put((issue, self.get_base_commit(issue, default_base_commit)))
+        if pending.empty():
+            logger.info('No issues to resolve.')
+            return
+
+        num_workers = min(self.num_workers, pending.qsize())
+        logger.info(
+            f'Resolving {pending.qsize()} issues with {num_workers} workers, max iterations {self.max_iterations}.'
+        )
+        with ResolverOutputWriter(output_file) as output_writer:
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(
+                max_workers=num_workers, thread_name_prefix='resolver_worker'
+            ) as executor:
+                await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            executor,
+                            self._run_worker_in_thread,
+                            worker_id,
+                            pending,
+                            output_writer.write,
+                        )
+                        for worker_id in range(num_workers)
+                    )
+                )
+        logger.info('Finished.')
@@ -1,17 +1,184 @@
 import json
-from typing import Iterable
+import os
+import threading
+from typing import Any, BinaryIO, Iterable
 
+from openhands.core.logger import openhands_logger as logger
 from openhands.resolver.resolver_output import ResolverOutput
 
+# The index of an output.jsonl file is kept in a sidecar file next to it, with a line
+# of "<issue number> <byte offset> <byte length>" for each output
+INDEX_SUFFIX = '.index'
 
-def load_all_resolver_outputs(output_jsonl: str) -> Iterable[ResolverOutput]:
+
+def get_index_path(output_jsonl: str) -> str:
+    return output_jsonl + INDEX_SUFFIX
+
+
+class ResolverOutputWriter:
+    """Appends outputs to an output.jsonl file, recording where each one is in its index.
+
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, output_jsonl: str):
+        self.output_jsonl = output_jsonl
+        self._output_fp = open(output_jsonl, 'ab')
+        # Outputs written before the index existed would otherwise be missing from it
+        load_resolver_output_index(output_jsonl, update_index=True)
+        self._index_fp = open(get_index_path(output_jsonl), 'a')
+        self._lock = threading.Lock()
+
+    def write(self, output: ResolverOutput) -> None:
+        line = (output.model_dump_json() + '\n').encode('utf-8')
+        with self._lock:
+            offset = self._output_fp.seek(0, os.SEEK_END)
+            self._output_fp.write(line)
+            self._output_fp.flush()
+            self._index_fp.write(f'{output.issue.number} {offset} {len(line)}\n')
+            self._index_fp.flush()
+
+    def close(self) -> None:
+        self._output_fp.close()
+        self._index_fp.close()
+
+    def __enter__(self) -> 'ResolverOutputWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def load_resolver_output_index(
+    output_jsonl: str, update_index: bool = False
+) -> dict[int, int]:
+    """Get the byte offset of the first output for each issue number in an output.jsonl file.
+
+    The index file is used for the part of the output file it covers, and any outputs
+    after that (e.g. written by an older version) are scanned.
+
+    Args:
+        update_index: Whether to add the scanned outputs to the index file, so that
+            they aren't scanned again. The index is left as is if it can't be written.
+    """
+    index: dict[int, int] = {}
+    indexed_end = 0
+    index_path = get_index_path(output_jsonl)
+    output_size = os.path.getsize(output_jsonl)
+    if os.path.exists(index_path):
+        with open(index_path, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 3:
+                    continue
+                number, offset, length = (int(part) for part in parts)
+                index.setdefault(number, offset)
+                indexed_end = max(indexed_end, offset + length)
+        if indexed_end > output_size or not _is_line_start(output_jsonl, indexed_end):
+            # The output file was replaced, so the index does not describe it
+            index = {}
+            indexed_end = 0
+            if update_index:
+                try:
+                    os.remove(index_path)
+                except OSError as e:
+                    logger.warning(f'Failed to remove stale index {index_path}: {e}')
+                    update_index = False
+
+    if indexed_end < output_size:
+        added = []
+        with open(output_jsonl, 'rb') as f:
+            f.seek(indexed_end)
+            offset = indexed_end
+            for line in f:
+                complete = line.endswith(b'\n')
+                if line.strip():
+                    try:
+                        number = json.loads(line)['issue']['number']
+                    except ValueError:
+                        if complete:
+                            raise
+                        # An output still being written
+                        break
+                    index.setdefault(number, offset)
+                    # The index ends on a line start, so it can be extended later
+                    if complete:
+                        added.append(f'{number} {offset} {len(line)}\n')
+                offset += len(line)
+        if update_index and added:
+            try:
+                with open(index_path, 'a') as f:
+                    f.writelines(added)
+            except OSError as e:
+                logger.warning(f'Failed to update index {index_path}: {e}')
+    return index
+
+
+def _is_line_start(path: str, offset: int) -> bool:
+    if offset == 0:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(offset - 1)
+        return f.read(1) == b'\n'
+
+
+def _parse_resolver_output(line: bytes | str, include_history: bool) -> ResolverOutput:
+    if include_history:
+        return ResolverOutput.model_validate_json(line)
+    data = json.loads(line)
+    data['history'] = []
+    return ResolverOutput.model_validate(data)
+
+
+def load_all_resolver_outputs(
+    output_jsonl: str, include_history: bool = True
+) -> Iterable[ResolverOutput]:
+    """Read the outputs in an output.jsonl file one at a time.
+
+    Args:
+        include_history: If False, the (large) histories of the outputs are not kept,
+            for when only the patches and results are needed.
+    """
     with open(output_jsonl, 'r') as f:
         for line in f:
-            yield ResolverOutput.model_validate(json.loads(line))
+            yield _parse_resolver_output(line, include_history)
 
 
-def load_single_resolver_output(output_jsonl: str, issue_number: int) -> ResolverOutput:
-    for resolver_output in load_all_resolver_outputs(output_jsonl):
-        if resolver_output.issue.number == issue_number:
-            return resolver_output
+def load_single_resolver_output(
+    output_jsonl: str, issue_number: int, include_history: bool = True
+) -> ResolverOutput:
+    # Outputs written before the index existed are added to it, to be scanned only once
+    offset = load_resolver_output_index(output_jsonl, update_index=True).get(
+        issue_number
+    )
+    if offset is None:
+        raise ValueError(f'Issue number {issue_number} not found in {output_jsonl}')
+    with open(output_jsonl, 'rb') as f:
+        output = _read_indexed_output(f, offset, issue_number, include_history)
+        if output is not None:
+            return output
+        # The output file was changed without updating its index
+        logger.warning(f'Stale index for {output_jsonl}, scanning it for the output')
+        f.seek(0)
+        for line in f:
+            if line.strip() and json.loads(line)['issue']['number'] == issue_number:
+                return _parse_resolver_output(line, include_history)
     raise ValueError(f'Issue number {issue_number} not found in {output_jsonl}')
+
+
+def _read_indexed_output(
+    f: BinaryIO, offset: int, issue_number: int, include_history: bool
+) -> ResolverOutput | None:
+    """Read the output at an indexed offset, or None if it isn't the expected output."""
+    if offset > 0:
+        f.seek(offset - 1)
+        if f.read(1) != b'\n':
+            return None
+    f.seek(offset)
+    try:
+        output = _parse_resolver_output(f.readline(), include_history)
+    except ValueError:
+        return None
+    if output.issue.number != issue_number:
+        return None
+    return output
@@ -1,6 +1,7 @@
 # flake8: noqa: E501
 
 import asyncio
+import copy
 import dataclasses
 import json
 import os
@@ -26,13 +27,17 @@ from openhands.events.observation import (
     ErrorObservation,
     Observation,
 )
-from openhands.events.stream import EventStreamSubscriber
+from openhands.events.stream import EventStream, EventStreamSubscriber
 from openhands.integrations.service_types import ProviderType
 from openhands.resolver.interfaces.issue import Issue
 from openhands.resolver.interfaces.issue_definitions import (
     ServiceContextIssue,
     ServiceContextPR,
 )
+from openhands.resolver.io_utils import (
+    ResolverOutputWriter,
+    load_resolver_output_index,
+)
 from openhands.resolver.issue_handler_factory import IssueHandlerFactory
 from openhands.resolver.resolver_output import ResolverOutput
 from openhands.resolver.utils import (
@@ -294,6 +299,40 @@ class IssueResolver:
         logger.info('Checking for .openhands/pre-commit.sh script...')
         runtime.maybe_setup_git_hooks()
 
+    def reset_runtime(self, runtime: Runtime, issue: Issue, base_commit: str) -> None:
+        """Reset a runtime which resolved a previous issue, so it can be reused.
+
+        The workspace is reset to a clean checkout of `base_commit`, keeping files ignored
+        by git (such as installed dependencies), and the runtime is given a new event
+        stream so the history of the previous issue is not carried over.
+        """
+        logger.info(f'Resetting runtime {runtime.sid} for issue {issue.number}')
+        previous_stream = runtime.event_stream
+        previous_stream.unsubscribe(EventStreamSubscriber.RUNTIME, runtime.sid)
+        previous_stream.close()
+        event_stream = EventStream(
+            f'{runtime.sid}-{issue.number}',
+            previous_stream.file_store,
+            previous_stream.user_id,
+        )
+        event_stream.set_secrets(previous_stream.secrets)
+        event_stream.subscribe(
+            EventStreamSubscriber.RUNTIME, runtime.on_event, runtime.sid
+        )
+        runtime.event_stream = event_stream
+
+        for command in (
+            'cd /workspace',
+            f'git checkout --force {base_commit}',
+            'git clean -fd',
+        ):
+            action = CmdRunAction(command=command)
+            logger.info(action, extra={'msg_type': 'ACTION'})
+            obs = runtime.run_action(action)
+            logger.info(obs, extra={'msg_type': 'OBSERVATION'})
+            if not isinstance(obs, CmdOutputObservation) or obs.exit_code != 0:
+                raise RuntimeError(f'Failed to reset the workspace.\n{obs}')
+
     async def complete_runtime(
         self,
         runtime: Runtime,
@@ -388,7 +427,14 @@ class IssueResolver:
         base_commit: str,
         issue_handler: ServiceContextIssue | ServiceContextPR,
         reset_logger: bool = False,
+        runtime: Runtime | None = None,
     ) -> ResolverOutput:
+        """Run the agent on an issue and collect its patch.
+
+        Args:
+            runtime: A connected and initialized runtime which was used for a previous
+                issue, to be reset and reused. If None, a new runtime is created.
+        """
         # Setup the logger properly, so you can run multi-processing to parallelize processing
         if reset_logger:
             log_dir = os.path.join(self.output_dir, 'infer_logs')
@@ -396,13 +442,20 @@ class IssueResolver:
         else:
             logger.info(f'Starting fixing issue {issue.number}.')
 
-        # write the repo to the workspace
-        if os.path.exists(self.workspace_base):
-            shutil.rmtree(self.workspace_base)
-        shutil.copytree(os.path.join(self.output_dir, 'repo'), self.workspace_base)
+        reuse_runtime = runtime is not None
+        if runtime is None:
+            # write the repo to the workspace
+            if os.path.exists(self.workspace_base):
+                shutil.rmtree(self.workspace_base)
+            shutil.copytree(os.path.join(self.output_dir, 'repo'), self.workspace_base)
 
-        runtime = create_runtime(self.app_config)
-        await runtime.connect()
+            config = self.app_config
+            runtime = create_runtime(config)
+            await runtime.connect()
+        else:
+            self.reset_runtime(runtime, issue, base_commit)
+            # run_controller modifies the config it is given, so each issue gets a copy
+            config = copy.deepcopy(runtime.config)
 
         def on_event(evt: Event) -> None:
             logger.info(evt)
@@ -411,7 +464,8 @@ class IssueResolver:
             EventStreamSubscriber.MAIN, on_event, str(uuid4())
         )
 
-        self.initialize_runtime(runtime)
+        if not reuse_runtime:
+            self.initialize_runtime(runtime)
 
         instruction, conversation_instructions, images_urls = (
             issue_handler.get_instruction(
@@ -425,7 +479,7 @@ class IssueResolver:
         action = MessageAction(content=instruction, image_urls=images_urls)
         try:
             state: State | None = await run_controller(
-                config=self.app_config,
+                config=config,
                 initial_user_action=action,
                 runtime=runtime,
                 fake_user_response_fn=codeact_user_response,
@@ -519,6 +573,45 @@ class IssueResolver:
 
         return issues[0]
 
+    def checkout_repo(self) -> str:
+        """Clone the repository into the output directory if needed.
+
+        Also loads the repository instructions from the repository when none were given.
+
+        Returns:
+            The commit checked out.
+        """
+        repo_dir = os.path.join(self.output_dir, 'repo')
+        if not os.path.exists(repo_dir):
+            checkout_output = subprocess.check_output(
+                [
+                    'git',
+                    'clone',
+                    self.issue_handler.get_clone_url(),
+                    f'{self.output_dir}/repo',
+                ]
+            ).decode('utf-8')
+            if 'fatal' in checkout_output:
+                raise RuntimeError(f'Failed to clone repository: {checkout_output}')
+
+        # get the commit id of current repo for reproducibility
+        base_commit = (
+            subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=repo_dir)
+            .decode('utf-8')
+            .strip()
+        )
+        logger.info(f'Base commit: {base_commit}')
+
+        if self.repo_instruction is None:
+            # Check for .openhands_instructions file in the workspace directory
+            openhands_instructions_path = os.path.join(
+                repo_dir, '.openhands_instructions'
+            )
+            if os.path.exists(openhands_instructions_path):
+                with open(openhands_instructions_path, 'r') as f:
+                    self.repo_instruction = f.read()
+        return base_commit
+
     async def resolve_issue(
         self,
         reset_logger: bool = False,
@@ -556,53 +649,24 @@ class IssueResolver:
         )
         logger.info(f'Using output directory: {self.output_dir}')
 
-        # checkout the repo
         repo_dir = os.path.join(self.output_dir, 'repo')
-        if not os.path.exists(repo_dir):
-            checkout_output = subprocess.check_output(  # noqa: ASYNC101
-                [
-                    'git',
-                    'clone',
-                    self.issue_handler.get_clone_url(),
-                    f'{self.output_dir}/repo',
-                ]
-            ).decode('utf-8')
-            if 'fatal' in checkout_output:
-                raise RuntimeError(f'Failed to clone repository: {checkout_output}')
-
-        # get the commit id of current repo for reproducibility
-        base_commit = (
-            subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=repo_dir)  # noqa: ASYNC101
-            .decode('utf-8')
-            .strip()
-        )
-        logger.info(f'Base commit: {base_commit}')
-
-        if self.repo_instruction is None:
-            # Check for .openhands_instructions file in the workspace directory
-            openhands_instructions_path = os.path.join(
-                repo_dir, '.openhands_instructions'
-            )
-            if os.path.exists(openhands_instructions_path):
-                with open(openhands_instructions_path, 'r') as f:  # noqa: ASYNC101
-                    self.repo_instruction = f.read()
+        base_commit = self.checkout_repo()
 
         # OUTPUT FILE
         output_file = os.path.join(self.output_dir, 'output.jsonl')
         logger.info(f'Writing output to {output_file}')
 
         # Check if this issue was already processed
-        if os.path.exists(output_file):
-            with open(output_file, 'r') as f:  # noqa: ASYNC101
-                for line in f:
-                    data = ResolverOutput.model_validate_json(line)
-                    if data.issue.number == self.issue_number:
-                        logger.warning(
-                            f'Issue {self.issue_number} was already processed. Skipping.'
-                        )
-                        return
-
-        output_fp = open(output_file, 'a')  # noqa: ASYNC101
+        if (
+            os.path.exists(output_file)
+            and self.issue_number in load_resolver_output_index(output_file)
+        ):
+            logger.warning(
+                f'Issue {self.issue_number} was already processed. Skipping.'
+            )
+            return
+
+        output_writer = ResolverOutputWriter(output_file)
 
         logger.info(
             f'Resolving issue {self.issue_number} with Agent {AGENT_CLASS}, model {model_name}, max iterations {self.max_iterations}.'
@@ -645,9 +709,8 @@ class IssueResolver:
                 self.issue_handler,
                 reset_logger,
             )
-            output_fp.write(output.model_dump_json() + '\n')
-            output_fp.flush()
+            output_writer.write(output)
 
         finally:
-            output_fp.close()
+            output_writer.close()
             logger.info('Finished.')
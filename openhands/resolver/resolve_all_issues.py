@@ -0,0 +1,41 @@
+# flake8: noqa: E501
+
+import asyncio
+
+from openhands.resolver.batch_issue_resolver import BatchIssueResolver
+from openhands.resolver.resolve_issue import build_argument_parser
+
+
+def main() -> None:
+    def int_list(value: str) -> list[int]:
+        return [int(number) for number in value.split(',') if number.strip()]
+
+    parser = build_argument_parser('Resolve multiple issues.')
+    parser.add_argument(
+        '--issue-numbers',
+        type=int_list,
+        default=None,
+        help='Comma separated issue numbers to resolve (defaults to all open issues).',
+    )
+    parser.add_argument(
+        '--limit-issues',
+        type=int,
+        default=None,
+        help='Maximum number of issues to resolve.',
+    )
+    parser.add_argument(
+        '--num-workers',
+        type=int,
+        default=1,
+        help='Number of issues to resolve concurrently, each with its own runtime.',
+    )
+    parser.set_defaults(issue_number=None, comment_id=None)
+
+    my_args = parser.parse_args()
+
+    issue_resolver = BatchIssueResolver(my_args)
+    asyncio.run(issue_resolver.resolve_issues())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,14 @@
 # flake8: noqa: E501
 
+import argparse
 import asyncio
 
 from openhands.resolver.issue_resolver import IssueResolver
 
 
-def main() -> None:
-    import argparse
-
-    def int_or_none(value: str) -> int | None:
-        if value.lower() == 'none':
-            return None
-        else:
-            return int(value)
-
-    parser = argparse.ArgumentParser(description='Resolve a single issue.')
+def build_argument_parser(description: str) -> argparse.ArgumentParser:
+    """Build a parser for the arguments shared by the resolver commands."""
+    parser = argparse.ArgumentParser(description=description)
     parser.add_argument(
         '--selected-repo',
         type=str,
@@ -51,19 +45,6 @@ def main() -> None:
         default=50,
         help='Maximum number of iterations to run.',
     )
-    parser.add_argument(
-        '--issue-number',
-        type=int,
-        required=True,
-        help='Issue number to resolve.',
-    )
-    parser.add_argument(
-        '--comment-id',
-        type=int_or_none,
-        required=False,
-        default=None,
-        help='Resolve a specific comment',
-    )
     parser.add_argument(
         '--output-dir',
         type=str,
@@ -118,6 +99,30 @@ def main() -> None:
         default=None,
         help='Base domain for the git server (defaults to "github.com" for GitHub and "gitlab.com" for GitLab)',
     )
+    return parser
+
+
+def main() -> None:
+    def int_or_none(value: str) -> int | None:
+        if value.lower() == 'none':
+            return None
+        else:
+            return int(value)
+
+    parser = build_argument_parser('Resolve a single issue.')
+    parser.add_argument(
+        '--issue-number',
+        type=int,
+        required=True,
+        help='Issue number to resolve.',
+    )
+    parser.add_argument(
+        '--comment-id',
+        type=int_or_none,
+        required=False,
+        default=None,
+        help='Resolve a specific comment',
+    )
 
     my_args = parser.parse_args()
 
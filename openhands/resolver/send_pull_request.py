@@ -672,7 +672,10 @@ def main() -> None:
         raise ValueError(f'Issue number {my_args.issue_number} is not a number.')
     issue_number = int(my_args.issue_number)
     output_path = os.path.join(my_args.output_dir, 'output.jsonl')
-    resolver_output = load_single_resolver_output(output_path, issue_number)
+    # The history is not needed to send the pull request, and is by far the largest part
+    resolver_output = load_single_resolver_output(
+        output_path, issue_number, include_history=False
+    )
     if not username:
         raise ValueError('username is required.')
     process_single_issue(
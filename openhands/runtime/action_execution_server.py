@@ -182,6 +182,7 @@ from openhands.runtime.mcp.proxy import MCPProxyManager
 from openhands.runtime.plugins import ALL_PLUGINS, JupyterPlugin, Plugin, VSCodePlugin
 from openhands.runtime.utils import find_available_tcp_port
 from openhands.runtime.utils.bash import BashSession
+from openhands.runtime.utils.file_tree import get_file_tree
 from openhands.runtime.utils.files import insert_lines, read_lines
 from openhands.runtime.utils.memory_monitor import MemoryMonitor
 from openhands.runtime.utils.runtime_init import init_user_and_working_directory
@@ -1078,7 +1079,8 @@ if __name__ == '__main__':
         """List files in the specified path.
 
         This function retrieves a list of files from the agent's runtime file store,
-        excluding certain system and hidden files/directories.
+        excluding the files ignored by the .gitignore of the workspace. Listings are
+        cached until the directory changes, and their version is sent as an ETag.
 
         To list files:
         ```sh
@@ -1109,47 +1111,18 @@ if __name__ == '__main__':
         else:
             full_path = os.path.join(client.initial_cwd, path)
 
-        if not os.path.exists(full_path):
-            # if user just removed a folder, prevent server error 500 in UI
-            return JSONResponse(content=[])
-
         try:
-            # Check if the directory exists
-            if not os.path.exists(full_path) or not os.path.isdir(full_path):
-                return JSONResponse(content=[])
-
-            entries = os.listdir(full_path)
-
-            # Separate directories and files
-            directories = []
-            files = []
-            for entry in entries:
-                # Remove leading slash and any parent directory components
-                entry_relative = entry.lstrip('/').split('/')[-1]
-
-                # Construct the full path by joining the base path with the relative entry path
-                full_entry_path = os.path.join(full_path, entry_relative)
-                if os.path.exists(full_entry_path):
-                    is_dir = os.path.isdir(full_entry_path)
-                    if is_dir:
-                        # add trailing slash to directories
-                        # required by FE to differentiate directories and files
-                        entry = entry.rstrip('/') + '/'
-                        directories.append(entry)
-                    else:
-                        files.append(entry)
-
-            # Sort directories and files separately
-            directories.sort(key=lambda s: s.lower())
-            files.sort(key=lambda s: s.lower())
-
-            # Combine sorted directories and files
-            sorted_entries = directories + files
-            return JSONResponse(content=sorted_entries)
-
+            listing = await call_sync_from_async(
+                get_file_tree(client.initial_cwd).list_directory, full_path
+            )
         except Exception as e:
             logger.error(f'Error listing files: {e}')
             return JSONResponse(content=[])
+        if listing is None:
+            # if user just removed a folder, prevent server error 500 in UI
+            return JSONResponse(content=[])
+        version, entries = listing
+        return JSONResponse(content=entries, headers={'ETag': f'"{version}"'})
 
     logger.debug(f'Starting action execution API on port {args.port}')
     run(app, host='0.0.0.0', port=args.port)
@@ -7,6 +7,8 @@ import random
 import shutil
 import string
 import tempfile
+import time
+import weakref
 from abc import abstractmethod
 from pathlib import Path
 from types import MappingProxyType
@@ -67,6 +69,17 @@ from openhands.utils.async_utils import (
     call_async_from_sync,
     call_sync_from_async,
 )
+from openhands.utils.profiler import profile_span
+from openhands.utils.prometheus import Gauge, Histogram
+
+ACTION_LATENCY = Histogram(
+    'openhands_action_execution_seconds',
+    'Time taken by runtimes to execute actions',
+    ['action'],
+)
+ACTIVE_RUNTIMES = Gauge('openhands_runtimes', 'Runtimes which were not closed')
+_active_runtimes: 'weakref.WeakSet[Runtime]' = weakref.WeakSet()
+ACTIVE_RUNTIMES.set_function(lambda: len(_active_runtimes))
 
 
 def _default_env_vars(sandbox_config: SandboxConfig) -> dict[str, str]:
@@ -117,6 +130,8 @@ class Runtime(FileEditRuntimeMixin):
     status_callback: Callable[[str, str, str], None] | None
     runtime_status: RuntimeStatus | None
     _runtime_initialized: bool = False
+    # Whether list_files leaves out the files ignored by the .gitignore of the workspace
+    list_files_respects_gitignore: bool = False
 
     def __init__(
         self,
@@ -136,6 +151,7 @@ class Runtime(FileEditRuntimeMixin):
         )
         self.sid = sid
         self.event_stream = event_stream
+        _active_runtimes.add(self)
         if event_stream:
             event_stream.subscribe(
                 EventStreamSubscriber.RUNTIME, self.on_event, self.sid
@@ -198,7 +214,7 @@ class Runtime(FileEditRuntimeMixin):
         This should only be called by conversation manager or closing the session.
         If called for instance by error handling, it could prevent recovery.
         """
-        pass
+        _active_runtimes.discard(self)
 
     @classmethod
     async def delete(cls, conversation_id: str) -> None:
@@ -340,10 +356,16 @@ class Runtime(FileEditRuntimeMixin):
         assert event.timeout is not None
         try:
             await self._export_latest_git_provider_tokens(event)
-            if isinstance(event, MCPAction):
-                observation: Observation = await self.call_tool_mcp(event)
-            else:
-                observation = await call_sync_from_async(self.run_action, event)
+            started_at = time.perf_counter()
+            with profile_span('run_action', action=event.action):
+                if isinstance(event, MCPAction):
+                    observation: Observation = await self.call_tool_mcp(event)
+                else:
+                    observation = await call_sync_from_async(self.run_action, event)
+            if event.runnable:
+                ACTION_LATENCY.labels(event.action).observe(
+                    time.perf_counter() - started_at
+                )
         except Exception as e:
             err_id = ''
             if isinstance(e, httpx.NetworkError) or isinstance(
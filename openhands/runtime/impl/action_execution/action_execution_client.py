@@ -152,6 +152,8 @@ class ActionExecutionClient(Runtime):
             assert response.is_closed
             response_json = response.json()
             assert isinstance(response_json, list)
+            # Only action execution servers which filter listings send their version
+            self.list_files_respects_gitignore = 'etag' in response.headers
             return response_json
         except httpx.TimeoutException:
             raise TimeoutError('List files operation timed out')
@@ -480,3 +482,4 @@ class ActionExecutionClient(Runtime):
             return
         self._runtime_closed = True
         self.session.close()
+        super().close()
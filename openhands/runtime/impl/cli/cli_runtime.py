@@ -173,6 +173,7 @@ from openhands.integrations.provider import PROVIDER_TOKEN_TYPE
 from openhands.runtime.base import Runtime
 from openhands.runtime.plugins import PluginRequirement
 from openhands.runtime.runtime_status import RuntimeStatus
+from openhands.runtime.utils.file_tree import get_file_tree
 
 
 class CLIRuntime(Runtime):
@@ -193,6 +194,8 @@ class CLIRuntime(Runtime):
         git_provider_tokens (PROVIDER_TOKEN_TYPE | None, optional): Git provider tokens. Defaults to None.
     """
 
+    list_files_respects_gitignore = True
+
     def __init__(
         self,
         config: OpenHandsConfig,
@@ -821,8 +824,13 @@ class CLIRuntime(Runtime):
             if not os.path.isdir(dir_path):
                 return [dir_path]
 
-            # List files in the directory
-            return [os.path.join(dir_path, f) for f in os.listdir(dir_path)]
+            # List files in the directory, without the files ignored by git
+            file_tree = get_file_tree(os.path.realpath(self._workspace_path))
+            listing = file_tree.list_directory(dir_path)
+            if listing is None:
+                return []
+            _, entries = listing
+            return [os.path.join(dir_path, entry.rstrip('/')) for entry in entries]
         except Exception as e:
             logger.error(f'Error listing files: {str(e)}')
             return []
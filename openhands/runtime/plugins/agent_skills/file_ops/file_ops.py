@@ -20,6 +20,7 @@ Note:
 import os
 
 from openhands.linter import DefaultLinter, LintResult
+from openhands.runtime.utils.workspace_index import get_workspace_index
 
 CURRENT_FILE: str | None = None
 CURRENT_LINE = 1
@@ -304,16 +305,14 @@ def search_dir(search_term: str, dir_path: str = './') -> None:
     if not os.path.isdir(dir_path):
         _output_error(f'Directory {dir_path} not found')
         return
+    # The index skips ignored and binary files, and only reads files which may match
+    index, prefix = get_workspace_index(dir_path)
     matches = []
-    for root, _, files in os.walk(dir_path):
-        for file in files:
-            if file.startswith('.'):
-                continue
-            file_path = os.path.join(root, file)
-            with open(file_path, 'r', errors='ignore') as f:
-                for line_num, line in enumerate(f, 1):
-                    if search_term in line:
-                        matches.append((file_path, line_num, line.strip()))
+    for rel_path, line_num, line in index.search(search_term, prefix):
+        if os.path.basename(rel_path).startswith('.'):
+            continue
+        file_path = os.path.join(dir_path, rel_path[len(prefix) :])
+        matches.append((file_path, line_num, line.strip()))
 
     if not matches:
         print(f'No matches found for "{search_term}" in {dir_path}')
@@ -377,11 +376,12 @@ def find_file(file_name: str, dir_path: str = './') -> None:
         _output_error(f'Directory {dir_path} not found')
         return
 
-    matches = []
-    for root, _, files in os.walk(dir_path):
-        for file in files:
-            if file_name in file:
-                matches.append(os.path.join(root, file))
+    index, prefix = get_workspace_index(dir_path)
+    matches = [
+        os.path.join(dir_path, rel_path[len(prefix) :])
+        for rel_path in index.files(prefix)
+        if file_name in os.path.basename(rel_path)
+    ]
 
     if matches:
         print(f'[Found {len(matches)} matches for "{file_name}" in {dir_path}]')
@@ -5,76 +5,91 @@ try:
         search_code_snippets,
     )
 except ImportError:
-    # Fallback implementations for HF Spaces
-    import os
+    # Fallback implementations for HF Spaces, backed by the workspace index
     import fnmatch
-    from pathlib import Path
-    from typing import List, Dict, Any
-    
+    import os
+    from typing import Any, Dict, List
+
+    from openhands.runtime.utils.workspace_index import (
+        get_workspace_index,
+        read_text,
+        split_lines,
+    )
+
     def explore_tree_structure(path: str, max_depth: int = 3) -> Dict[str, Any]:
         """Fallback tree exploration."""
-        def _explore(current_path: str, current_depth: int = 0) -> Dict[str, Any]:
-            if current_depth >= max_depth:
-                return {}
-            
-            result = {}
-            try:
-                for item in os.listdir(current_path):
-                    if item.startswith('.'):
-                        continue
-                    
-                    item_path = os.path.join(current_path, item)
-                    if os.path.isdir(item_path):
-                        result[item] = _explore(item_path, current_depth + 1)
-                    else:
-                        result[item] = "file"
-            except PermissionError:
-                pass
-            
-            return result
-        
-        return _explore(path)
-    
+        index, prefix = get_workspace_index(path)
+        result: Dict[str, Any] = {}
+        for rel_path in index.files(prefix):
+            parts = rel_path[len(prefix) :].split('/')
+            if any(part.startswith('.') for part in parts):
+                continue
+            node = result
+            for depth, part in enumerate(parts[:max_depth]):
+                if depth == len(parts) - 1:
+                    node[part] = 'file'
+                else:
+                    node = node.setdefault(part, {})
+        return result
+
     def get_entity_contents(path: str, entity_name: str) -> str:
-        """Fallback entity content retrieval."""
+        """Fallback entity content retrieval.
+
+        The entity may be a file, or a class or function given as `name`,
+        `file_path:name` or `file_path:Class.method`.
+        """
         try:
             full_path = os.path.join(path, entity_name)
             if os.path.isfile(full_path):
                 with open(full_path, 'r', encoding='utf-8') as f:
                     return f.read()
-            return f"Entity not found: {entity_name}"
+
+            file_name, _, symbol_name = entity_name.rpartition(':')
+            symbol_name = symbol_name.split('.')[-1]
+            index, prefix = get_workspace_index(path)
+            symbols = [
+                symbol
+                for symbol in index.find_symbols(symbol_name, prefix)
+                if not file_name or symbol.path == prefix + file_name
+            ]
+            if not symbols:
+                return f"Entity not found: {entity_name}"
+            contents = []
+            for symbol in symbols:
+                lines = split_lines(read_text(os.path.join(index.root, symbol.path)) or '')
+                body = '\n'.join(lines[symbol.line - 1 : symbol.end_line])
+                contents.append(f'{symbol.path[len(prefix) :]}:{symbol.line}\n{body}')
+            return '\n\n'.join(contents)
         except Exception as e:
             return f"Error reading entity: {str(e)}"
-    
+
     def search_code_snippets(path: str, query: str, file_pattern: str = "*.py") -> List[Dict[str, Any]]:
         """Fallback code search."""
         results = []
         try:
-            for root, dirs, files in os.walk(path):
+            index, prefix = get_workspace_index(path)
+            lines: list[str] = []
+            lines_path = None
+            for rel_path, line_num, line in index.search(query, prefix, ignore_case=True):
                 # Skip hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                
-                for file in files:
-                    if fnmatch.fnmatch(file, file_pattern):
-                        file_path = os.path.join(root, file)
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                                if query.lower() in content.lower():
-                                    lines = content.splitlines()
-                                    for i, line in enumerate(lines):
-                                        if query.lower() in line.lower():
-                                            results.append({
-                                                "file": file_path,
-                                                "line": i + 1,
-                                                "content": line.strip(),
-                                                "context": lines[max(0, i-2):i+3]
-                                            })
-                        except Exception:
-                            continue
+                parts = rel_path[len(prefix) :].split('/')
+                if any(part.startswith('.') for part in parts[:-1]):
+                    continue
+                if not fnmatch.fnmatch(parts[-1], file_pattern):
+                    continue
+                if lines_path != rel_path:
+                    lines_path = rel_path
+                    lines = split_lines(read_text(os.path.join(index.root, rel_path)) or '')
+                i = line_num - 1
+                results.append({
+                    "file": os.path.join(path, rel_path[len(prefix) :]),
+                    "line": line_num,
+                    "content": line.strip(),
+                    "context": lines[max(0, i-2):i+3]
+                })
         except Exception:
             pass
-        
+
         return results
 
 __all__ = [
@@ -0,0 +1,135 @@
+"""Cached listings of workspace directories, for the file explorer of the UI.
+
+The UI lists a directory each time a folder is expanded or the explorer is refreshed,
+which is often. A listing is read with a single `os.scandir` (which gives the type of
+each entry without a `stat` per entry), filtered by the `.gitignore` of the workspace,
+and cached until the modification time of the directory or of the `.gitignore` changes:
+adding, removing or renaming an entry updates the modification time of its directory,
+so unchanged directories are listed from the cache. The `.gitignore` is compiled once
+per modification time, instead of for every listing.
+"""
+
+import os
+import stat
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pathspec
+
+# Number of directory listings kept in memory
+FILE_TREE_CACHE_SIZE = int(os.getenv('FILE_TREE_CACHE_SIZE', '1000'))
+# Number of workspaces for which listings are kept in memory
+MAX_FILE_TREES = 4
+
+
+@dataclass
+class _Listing:
+    version: str
+    entries: list[str]
+
+
+class FileTree:
+    """Lists the directories of the workspace under `root`, caching the listings."""
+
+    def __init__(self, root: str, max_listings: int = FILE_TREE_CACHE_SIZE) -> None:
+        self.root = root
+        self.max_listings = max_listings
+        self._listings: OrderedDict[str, _Listing] = OrderedDict()
+        self._gitignore: pathspec.PathSpec | None = None
+        self._gitignore_mtime_ns: int | None = None
+        self._lock = threading.Lock()
+
+    def list_directory(self, path: str) -> tuple[str, list[str]] | None:
+        """List the entries of a directory, with a trailing slash for directories.
+
+        Directories come first, each group sorted case-insensitively, and entries
+        ignored by the `.gitignore` of the workspace are left out.
+
+        Returns:
+            A version of the listing (which changes whenever the listing does), and its
+            entries, or None if `path` is not a directory.
+        """
+        try:
+            dir_stat = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            return None
+        gitignore, gitignore_mtime_ns = self._get_gitignore()
+        version = f'{dir_stat.st_mtime_ns:x}-{dir_stat.st_ctime_ns:x}-{gitignore_mtime_ns or 0:x}'
+        with self._lock:
+            listing = self._listings.get(path)
+            if listing is not None and listing.version == version:
+                self._listings.move_to_end(path)
+                return version, listing.entries
+
+        entries = self._scan(path, gitignore)
+        with self._lock:
+            self._listings[path] = _Listing(version, entries)
+            self._listings.move_to_end(path)
+            while len(self._listings) > self.max_listings:
+                self._listings.popitem(last=False)
+        return version, entries
+
+    def _scan(self, path: str, gitignore: pathspec.PathSpec | None) -> list[str]:
+        rel_dir = os.path.relpath(path, self.root)
+        # Ignore rules only apply inside the workspace
+        if rel_dir == '.':
+            rel_dir = ''
+        elif rel_dir.startswith('..'):
+            gitignore = None
+        directories = []
+        files = []
+        with os.scandir(path) as dir_entries:
+            for dir_entry in dir_entries:
+                try:
+                    is_dir = dir_entry.is_dir()
+                except OSError:
+                    continue
+                # Trailing slashes tell the UI (and gitignore patterns) about directories
+                entry = f'{dir_entry.name}/' if is_dir else dir_entry.name
+                if gitignore is not None and gitignore.match_file(
+                    os.path.join(rel_dir, entry)
+                ):
+                    continue
+                (directories if is_dir else files).append(entry)
+        directories.sort(key=lambda s: s.lower())
+        files.sort(key=lambda s: s.lower())
+        return directories + files
+
+    def _get_gitignore(self) -> tuple[pathspec.PathSpec | None, int | None]:
+        path = os.path.join(self.root, '.gitignore')
+        try:
+            mtime_ns: int | None = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        with self._lock:
+            if mtime_ns != self._gitignore_mtime_ns:
+                self._gitignore = None
+                if mtime_ns is not None:
+                    try:
+                        with open(path, 'r', errors='ignore') as f:
+                            self._gitignore = pathspec.PathSpec.from_lines(
+                                'gitwildmatch', f
+                            )
+                    except OSError:
+                        mtime_ns = None
+                self._gitignore_mtime_ns = mtime_ns
+            return self._gitignore, self._gitignore_mtime_ns
+
+
+_file_trees: OrderedDict[str, FileTree] = OrderedDict()
+_file_trees_lock = threading.Lock()
+
+
+def get_file_tree(root: str) -> FileTree:
+    """Get the file tree of the workspace under `root`, creating it if there is none."""
+    with _file_trees_lock:
+        file_tree = _file_trees.get(root)
+        if file_tree is None:
+            file_tree = _file_trees[root] = FileTree(root)
+        _file_trees.move_to_end(root)
+        while len(_file_trees) > MAX_FILE_TREES:
+            _file_trees.popitem(last=False)
+        return file_tree
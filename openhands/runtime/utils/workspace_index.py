@@ -0,0 +1,344 @@
+"""Incrementally maintained index of the files in a workspace.
+
+Searching a workspace by walking it and reading every file takes seconds on a
+mid-size repository, and agents search many times. The index keeps a list of the
+files in a workspace (excluding ignored and binary files), an inverted index from
+lowercase trigrams to the files containing them, and a table of the symbols defined
+in source files. Before each query, files are compared against the (mtime, size)
+they were indexed with, so only files which changed are read again.
+
+A directory which the index skips (e.g. one ignored by git) is still searched when it is
+asked for explicitly, by walking it without the ignore rules.
+"""
+
+import ast
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import pathspec
+
+# Directories which are never worth searching, whether or not they are ignored by git
+DEFAULT_EXCLUDED_DIRS = frozenset(
+    {'.git', '.hg', '.svn', 'node_modules', '__pycache__', '.mypy_cache', '.venv'}
+)
+# Larger files are not added to the trigram index, and are always scanned instead
+MAX_INDEXED_FILE_SIZE = 1_000_000
+# Like git, files with a NUL byte near the start are treated as binary
+BINARY_CHECK_BYTES = 8192
+# Number of workspaces for which an index is kept in memory
+MAX_INDEXES = 4
+
+_SYMBOL_RE = re.compile(
+    r'^\s*(?:export\s+)?(?:async\s+)?(def|class|function|interface|struct|func|fn)\s+([A-Za-z_$][\w$]*)',
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class Symbol:
+    name: str
+    kind: str
+    path: str
+    line: int
+    end_line: int
+
+
+@dataclass
+class _FileEntry:
+    mtime_ns: int
+    size: int
+    # Contents are only read (and trigrams computed) once a content query needs them
+    indexed: bool = False
+    binary: bool = False
+    trigrams: frozenset[str] | None = None
+    symbols: list[Symbol] | None = None
+
+
+def _trigrams(text: str) -> frozenset[str]:
+    return frozenset(text[i : i + 3] for i in range(len(text) - 2))
+
+
+def read_text(path: str) -> str | None:
+    """Read a file as text with universal newlines, or None if it is binary or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b'\0' in data[:BINARY_CHECK_BYTES]:
+        return None
+    text = data.decode('utf-8', errors='ignore')
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def split_lines(text: str) -> list[str]:
+    lines = text.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+@dataclass
+class WorkspaceIndex:
+    """An index of the files under `root`. Paths in the index are relative to `root`."""
+
+    root: str
+    _files: dict[str, _FileEntry] = field(default_factory=dict)
+    _postings: dict[str, set[str]] = field(default_factory=dict)
+    _gitignore: pathspec.PathSpec | None = None
+    _gitignore_mtime_ns: int | None = None
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def refresh(self) -> None:
+        """Bring the index up to date with the workspace, reading only changed files."""
+        with self._lock:
+            self._refresh_gitignore()
+            seen = set()
+            for rel_path, stat in self._walk():
+                seen.add(rel_path)
+                entry = self._files.get(rel_path)
+                if (
+                    entry is None
+                    or entry.mtime_ns != stat.st_mtime_ns
+                    or entry.size != stat.st_size
+                ):
+                    self._remove_file(rel_path)
+                    self._files[rel_path] = _FileEntry(stat.st_mtime_ns, stat.st_size)
+            for rel_path in set(self._files) - seen:
+                self._remove_file(rel_path)
+
+    def files(self, prefix: str = '') -> list[str]:
+        """Get the paths of all files under the relative directory `prefix`, sorted."""
+        self.refresh()
+        with self._lock:
+            if self._is_excluded_prefix(prefix):
+                return self._unindexed_files(prefix)
+            return sorted(
+                rel_path for rel_path in self._files if _is_under(rel_path, prefix)
+            )
+
+    def search(
+        self, term: str, prefix: str = '', ignore_case: bool = False
+    ) -> Iterator[tuple[str, int, str]]:
+        """Find lines containing `term` in files under `prefix`.
+
+        Yields:
+            Tuples of (relative path, 1-based line number, line) in path order.
+        """
+        for rel_path in self._candidates(term, prefix):
+            text = read_text(os.path.join(self.root, rel_path))
+            if text is None:
+                continue
+            haystack = text.lower() if ignore_case else text
+            needle = term.lower() if ignore_case else term
+            if needle not in haystack:
+                continue
+            lines = split_lines(text)
+            for line_num, line in enumerate(split_lines(haystack), 1):
+                if needle in line:
+                    yield rel_path, line_num, lines[line_num - 1]
+
+    def find_symbols(self, name: str, prefix: str = '') -> list[Symbol]:
+        """Find the definitions of classes and functions called `name` under `prefix`."""
+        results = []
+        for rel_path in self._candidates(name, prefix):
+            results.extend(s for s in self._get_symbols(rel_path) if s.name == name)
+        return results
+
+    def _candidates(self, term: str, prefix: str) -> list[str]:
+        self.refresh()
+        with self._lock:
+            if self._is_excluded_prefix(prefix):
+                # Binary files are skipped when they are read
+                return self._unindexed_files(prefix)
+            for rel_path, entry in self._files.items():
+                if not entry.indexed:
+                    self._index_contents(rel_path, entry)
+            lower = term.lower()
+            if len(lower) < 3:
+                candidates = set(self._files)
+            else:
+                # Files too large to be indexed are always candidates
+                candidates = {
+                    rel_path
+                    for rel_path, entry in self._files.items()
+                    if entry.trigrams is None
+                }
+                postings = [self._postings.get(t, set()) for t in _trigrams(lower)]
+                postings.sort(key=len)
+                if postings:
+                    candidates |= set.intersection(*postings)
+            return sorted(
+                rel_path
+                for rel_path in candidates
+                if _is_under(rel_path, prefix) and not self._files[rel_path].binary
+            )
+
+    def _get_symbols(self, rel_path: str) -> list[Symbol]:
+        entry = self._files.get(rel_path)
+        if entry is None or entry.symbols is None:
+            text = read_text(os.path.join(self.root, rel_path)) or ''
+            symbols = _extract_symbols(rel_path, text)
+            if entry is None:
+                return symbols
+            entry.symbols = symbols
+        return entry.symbols
+
+    def _is_excluded_prefix(self, prefix: str) -> bool:
+        """Whether the index skips the relative directory `prefix` (or one of its parents)."""
+        parts = prefix.rstrip('/').split('/') if prefix else []
+        return any(
+            self._is_excluded_dir(name, '/'.join(parts[: i + 1]))
+            for i, name in enumerate(parts)
+        )
+
+    def _unindexed_files(self, prefix: str) -> list[str]:
+        """The files under a directory which the index skips, walked without the ignore rules."""
+        return sorted(rel_path for rel_path, _ in self._walk(prefix, filtered=False))
+
+    def _walk(
+        self, start: str = '', filtered: bool = True
+    ) -> Iterator[tuple[str, os.stat_result]]:
+        stack = [start]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                with os.scandir(os.path.join(self.root, rel_dir)) as entries:
+                    for dir_entry in entries:
+                        rel_path = f'{rel_dir}{dir_entry.name}'
+                        try:
+                            if dir_entry.is_dir(follow_symlinks=False):
+                                if not filtered or not self._is_excluded_dir(
+                                    dir_entry.name, rel_path
+                                ):
+                                    stack.append(f'{rel_path}/')
+                            elif dir_entry.is_file() and not (
+                                filtered and self._is_ignored(rel_path)
+                            ):
+                                yield rel_path, dir_entry.stat()
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _is_excluded_dir(self, name: str, rel_path: str) -> bool:
+        if name in DEFAULT_EXCLUDED_DIRS:
+            return True
+        return self._is_ignored(f'{rel_path}/')
+
+    def _is_ignored(self, rel_path: str) -> bool:
+        return self._gitignore is not None and self._gitignore.match_file(rel_path)
+
+    def _refresh_gitignore(self) -> None:
+        path = os.path.join(self.root, '.gitignore')
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns == self._gitignore_mtime_ns:
+            return
+        self._gitignore_mtime_ns = mtime_ns
+        self._gitignore = None
+        if mtime_ns is not None:
+            with open(path, 'r', errors='ignore') as f:
+                self._gitignore = pathspec.PathSpec.from_lines('gitwildmatch', f)
+        # Files which are no longer ignored need to be picked up again
+        for rel_path in list(self._files):
+            self._remove_file(rel_path)
+
+    def _index_contents(self, rel_path: str, entry: _FileEntry) -> None:
+        entry.indexed = True
+        if entry.size > MAX_INDEXED_FILE_SIZE:
+            return
+        text = read_text(os.path.join(self.root, rel_path))
+        if text is None:
+            entry.binary = True
+            return
+        entry.trigrams = _trigrams(text.lower())
+        for trigram in entry.trigrams:
+            self._postings.setdefault(trigram, set()).add(rel_path)
+
+    def _remove_file(self, rel_path: str) -> None:
+        entry = self._files.pop(rel_path, None)
+        if entry is None or entry.trigrams is None:
+            return
+        for trigram in entry.trigrams:
+            posting = self._postings.get(trigram)
+            if posting is not None:
+                posting.discard(rel_path)
+                if not posting:
+                    del self._postings[trigram]
+
+
+def _is_under(rel_path: str, prefix: str) -> bool:
+    return not prefix or rel_path.startswith(prefix)
+
+
+def _extract_symbols(rel_path: str, text: str) -> list[Symbol]:
+    if rel_path.endswith('.py'):
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            return [
+                Symbol(
+                    node.name,
+                    'class' if isinstance(node, ast.ClassDef) else 'function',
+                    rel_path,
+                    node.lineno,
+                    node.end_lineno or node.lineno,
+                )
+                for node in ast.walk(tree)
+                if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+    symbols = []
+    for match in _SYMBOL_RE.finditer(text):
+        line = text.count('\n', 0, match.start()) + 1
+        kind = 'class' if match.group(1) in ('class', 'interface', 'struct') else 'function'
+        symbols.append(Symbol(match.group(2), kind, rel_path, line, line))
+    return symbols
+
+
+_indexes: OrderedDict[str, WorkspaceIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _find_index_root(path: str) -> str:
+    """The root of the git repository containing `path`, or `path` itself outside of one.
+
+    The `.gitignore` of the index is the one at its root, so rooting indexes at
+    repositories gives the same results for a directory whichever was searched first.
+    """
+    directory = path
+    while True:
+        if os.path.exists(os.path.join(directory, '.git')):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return path
+        directory = parent
+
+
+def get_workspace_index(path: str) -> tuple[WorkspaceIndex, str]:
+    """Get the index covering the directory `path`, creating one for it if there is none.
+
+    Returns:
+        The index, and the path of the directory relative to its root (empty, or ending with '/').
+    """
+    real_path = os.path.realpath(path)
+    root = _find_index_root(real_path)
+    prefix = os.path.relpath(real_path, root)
+    prefix = '' if prefix == '.' else f'{prefix}/'
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = WorkspaceIndex(root)
+        _indexes.move_to_end(root)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+        return index, prefix
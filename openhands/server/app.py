@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import warnings
 from contextlib import asynccontextmanager
@@ -22,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 import openhands.agenthub  # noqa F401 (we import this to get the agents registered)
 from openhands import __version__
+from openhands.events.dispatcher import get_default_dispatcher
 from openhands.server.routes.conversation import app as conversation_api_router
 from openhands.server.routes.feedback import app as feedback_api_router
 from openhands.server.routes.files import app as files_api_router
@@ -32,12 +34,14 @@ from openhands.server.routes.manage_conversations import (
     public_app as public_conversation_api_router,
 )
 from openhands.server.routes.mcp import mcp_server
+from openhands.server.routes.metrics import app as metrics_router
 from openhands.server.routes.public import app as public_api_router
 from openhands.server.routes.secrets import app as secrets_router
 from openhands.server.routes.security import app as security_api_router
 from openhands.server.routes.settings import app as settings_router
 from openhands.server.routes.trajectory import app as trajectory_router
 from openhands.server.shared import conversation_manager
+from openhands.storage import close_file_stores
 
 # Import HF Spaces routes if available
 try:
@@ -105,8 +109,14 @@ def combine_lifespans(*lifespans):
 
 @asynccontextmanager
 async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    dispatcher = get_default_dispatcher()
+    if dispatcher:
+        # Coroutine subscribers run on the server loop rather than in the shared pool
+        dispatcher.set_async_loop(asyncio.get_running_loop())
     async with conversation_manager:
         yield
+    # The file stores are shared by all requests: release their clients on shutdown
+    close_file_stores()
 
 
 app = FastAPI(
@@ -239,6 +249,7 @@ app.include_router(settings_router)
 app.include_router(secrets_router)
 app.include_router(git_api_router)
 app.include_router(trajectory_router)
+app.include_router(metrics_router)
 
 # Add HF Spaces routes if available
 if HF_SPACES_AVAILABLE:
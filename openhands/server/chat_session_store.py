@@ -0,0 +1,262 @@
+"""Bounded, persistent storage for the sessions of the chat routes.
+
+The novel writing, OpenRouter chat and memory chat routes keep a session per
+conversation: a JSON document with the list of its messages. Only the most recently
+used sessions are kept in memory, as compact (and for large sessions, compressed) JSON,
+up to CHAT_SESSIONS_MAX sessions and CHAT_SESSIONS_MAX_BYTES bytes, and a session is
+dropped from memory after CHAT_SESSIONS_TTL seconds without use. Every change to a
+session is also written to the file store, so that sessions dropped from memory are
+loaded back on their next use, and survive restarts.
+
+Handlers change a session inside `edit`, which holds a lock per session, so that
+concurrent requests on the same session don't overwrite each other's messages.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.storage.files import FileStore
+from openhands.utils.async_utils import call_sync_from_async
+
+CHAT_SESSIONS_MAX = int(os.getenv('CHAT_SESSIONS_MAX', '1000'))
+CHAT_SESSIONS_MAX_BYTES = int(os.getenv('CHAT_SESSIONS_MAX_BYTES', str(64 * 1024**2)))
+CHAT_SESSIONS_TTL = float(os.getenv('CHAT_SESSIONS_TTL', '3600'))
+
+# Sessions larger than this are compressed in memory
+_COMPRESS_MIN_BYTES = 4096
+_SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,128}$')
+
+
+def is_valid_session_id(session_id: str) -> bool:
+    """Whether a session ID (which is also a file name) is safe to use."""
+    return bool(_SESSION_ID_RE.match(session_id))
+
+
+def _encode(session: dict[str, Any]) -> bytes:
+    data = json.dumps(session, separators=(',', ':'), ensure_ascii=False).encode()
+    if len(data) >= _COMPRESS_MIN_BYTES:
+        return b'z' + zlib.compress(data, 1)
+    return b'j' + data
+
+
+def _decode(data: bytes) -> dict[str, Any]:
+    if data[:1] == b'z':
+        return json.loads(zlib.decompress(data[1:]))
+    return json.loads(data[1:])
+
+
+@dataclass
+class _Entry:
+    data: bytes
+    last_used: float
+
+
+class ChatSessionStore:
+    """The sessions of a chat route, cached in memory and persisted to a file store."""
+
+    def __init__(
+        self,
+        namespace: str,
+        file_store: FileStore | None = None,
+        max_sessions: int = CHAT_SESSIONS_MAX,
+        max_bytes: int = CHAT_SESSIONS_MAX_BYTES,
+        ttl: float = CHAT_SESSIONS_TTL,
+    ) -> None:
+        self.namespace = namespace
+        self.file_store = file_store
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def __len__(self) -> int:
+        """The number of sessions in memory."""
+        self._evict()
+        return len(self._entries)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    async def get(self, session_id: str) -> dict[str, Any] | None:
+        """Get a copy of a session, or None if there is no such session."""
+        if not is_valid_session_id(session_id):
+            return None
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self._touch(session_id, entry)
+            return _decode(entry.data)
+        session = await self._read(session_id)
+        if session is not None:
+            self._put(session_id, _encode(session))
+        return session
+
+    @asynccontextmanager
+    async def edit(
+        self, session_id: str, factory: Callable[[], dict[str, Any]]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Change a session (created with `factory` if it doesn't exist), and save it.
+
+        The session is saved even if the block raises, so that the messages added
+        before an error are kept.
+        """
+        if not is_valid_session_id(session_id):
+            raise ValueError(f'Invalid session ID: {session_id!r}')
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        async with lock:
+            session = await self.get(session_id)
+            if session is None:
+                session = factory()
+            try:
+                yield session
+            finally:
+                data = _encode(session)
+                self._put(session_id, data)
+                if self.file_store is not None:
+                    await call_sync_from_async(
+                        self.file_store.write,
+                        self._path(session_id),
+                        json.dumps(session, ensure_ascii=False),
+                    )
+
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session, returning whether it existed."""
+        if not is_valid_session_id(session_id):
+            return False
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= len(entry.data)
+        existed = entry is not None
+        if self.file_store is not None:
+            # Not all file stores raise FileNotFoundError when deleting missing files
+            if not existed:
+                existed = await self._read(session_id) is not None
+            if existed:
+                await call_sync_from_async(
+                    self.file_store.delete, self._path(session_id)
+                )
+        return existed
+
+    async def clear(self) -> int:
+        """Delete all the sessions, returning how many there were."""
+        session_ids = await self.list_ids()
+        self._entries.clear()
+        self._bytes = 0
+        if self.file_store is not None:
+            try:
+                await call_sync_from_async(self.file_store.delete, self._dir())
+            except FileNotFoundError:
+                pass
+        return len(session_ids)
+
+    async def list_ids(self) -> list[str]:
+        """The IDs of all the sessions, in memory or in the file store."""
+        self._evict()
+        session_ids = dict.fromkeys(self._entries)
+        if self.file_store is not None:
+            try:
+                paths = await call_sync_from_async(self.file_store.list, self._dir())
+            except FileNotFoundError:
+                paths = []
+            for path in paths:
+                name = path.rstrip('/').rsplit('/', 1)[-1]
+                if name.endswith('.json'):
+                    session_ids[name[: -len('.json')]] = None
+        return list(session_ids)
+
+    async def list_sessions(self) -> list[dict[str, Any]]:
+        """All the sessions. Sessions which are not in memory are not cached by this."""
+        sessions = []
+        for session_id in await self.list_ids():
+            entry = self._entries.get(session_id)
+            session = _decode(entry.data) if entry else await self._read(session_id)
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
+    def _dir(self) -> str:
+        return f'chat_sessions/{self.namespace}/'
+
+    def _path(self, session_id: str) -> str:
+        return f'{self._dir()}{session_id}.json'
+
+    async def _read(self, session_id: str) -> dict[str, Any] | None:
+        if self.file_store is None:
+            return None
+        try:
+            content = await call_sync_from_async(
+                self.file_store.read, self._path(session_id)
+            )
+            return json.loads(content)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            logger.warning(f'Corrupt chat session {self.namespace}/{session_id}')
+            return None
+
+    def _touch(self, session_id: str, entry: _Entry) -> None:
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(session_id)
+
+    def _put(self, session_id: str, data: bytes) -> None:
+        previous = self._entries.pop(session_id, None)
+        if previous is not None:
+            self._bytes -= len(previous.data)
+        self._entries[session_id] = _Entry(data, time.monotonic())
+        self._bytes += len(data)
+        self._evict()
+
+    def _evict(self) -> None:
+        # Entries are ordered from the least recently used, so expired ones come first
+        expired_before = time.monotonic() - self.ttl
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if (
+                len(self._entries) <= self.max_sessions
+                and self._bytes <= self.max_bytes
+                and entry.last_used >= expired_before
+            ):
+                break
+            del self._entries[session_id]
+            self._bytes -= len(entry.data)
+
+
+# Stores are shared while they are in use, so that concurrent edits share their locks.
+# Stores without a file store are kept, as they hold the only copy of their sessions.
+_stores: weakref.WeakValueDictionary[tuple[str, int], ChatSessionStore] = (
+    weakref.WeakValueDictionary()
+)
+_memory_stores: dict[str, ChatSessionStore] = {}
+
+
+def get_chat_session_store(
+    namespace: str, file_store: FileStore | None = None
+) -> ChatSessionStore:
+    """Get the store of a namespace shared in the process, so that its locks are too."""
+    if file_store is None:
+        store = _memory_stores.get(namespace)
+        if store is None:
+            store = _memory_stores[namespace] = ChatSessionStore(namespace)
+        return store
+    key = (namespace, id(file_store))
+    store = _stores.get(key)
+    if store is None:
+        # The store keeps a reference to the file store, so its id isn't reused
+        store = _stores[key] = ChatSessionStore(namespace, file_store)
+    return store
@@ -31,7 +31,10 @@ class ServerConfig(ServerConfigInterface):
         'CONVERSATION_MANAGER_CLASS',
         'openhands.server.conversation_manager.standalone_conversation_manager.StandaloneConversationManager',
     )
-    monitoring_listener_class: str = 'openhands.server.monitoring.MonitoringListener'
+    monitoring_listener_class: str = os.environ.get(
+        'MONITORING_LISTENER_CLASS',
+        'openhands.server.monitoring.PrometheusMonitoringListener',
+    )
     user_auth_class: str = (
         'openhands.server.user_auth.default_user_auth.DefaultUserAuth'
     )
@@ -310,6 +310,7 @@ class StandaloneConversationManager(ConversationManager):
             config=self.config,
             sio=self.sio,
             user_id=user_id,
+            monitoring_listener=self.monitoring_listener,
         )
         self._local_agent_loops_by_sid[sid] = session
         asyncio.create_task(
@@ -6,9 +6,12 @@ from openhands.server.app import app as base_app
 from openhands.server.listen_socket import sio
 from openhands.server.middleware import (
     CacheControlMiddleware,
+    DEFAULT_ROUTE_LIMITS,
     InMemoryRateLimiter,
     LocalhostCORSMiddleware,
     RateLimitMiddleware,
+    RateLimiterBackend,
+    RedisRateLimiterBackend,
 )
 from openhands.server.static import SPAStaticFiles
 
@@ -32,9 +35,23 @@ else:
 
 base_app.add_middleware(LocalhostCORSMiddleware)
 base_app.add_middleware(CacheControlMiddleware)
-base_app.add_middleware(
-    RateLimitMiddleware,
-    rate_limiter=InMemoryRateLimiter(requests=10, seconds=1),
-)
+# Rate limiting can be disabled for load tests, where all clients share one address
+if os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true':
+    # Share rate limits between workers when redis is available
+    rate_limiter_backend: RateLimiterBackend | None = None
+    if os.getenv('REDIS_HOST'):
+        rate_limiter_backend = RedisRateLimiterBackend(
+            f'redis://{os.environ["REDIS_HOST"]}', password=os.getenv('REDIS_PASSWORD')
+        )
+    base_app.add_middleware(
+        RateLimitMiddleware,
+        rate_limiter=InMemoryRateLimiter(
+            requests=10,
+            seconds=1,
+            burst=20,
+            route_limits=DEFAULT_ROUTE_LIMITS,
+            backend=rate_limiter_backend,
+        ),
+    )
 
 app = socketio.ASGIApp(sio, other_asgi_app=base_app)
@@ -7,22 +7,11 @@ from urllib.parse import parse_qs
 from socketio.exceptions import ConnectionRefusedError
 
 from openhands.core.logger import openhands_logger as logger
-from openhands.events.action import (
-    NullAction,
-)
-from openhands.events.action.agent import RecallAction
-from openhands.events.async_event_store_wrapper import AsyncEventStoreWrapper
 from openhands.events.event_store import EventStore
-from openhands.events.observation import (
-    NullObservation,
-)
-from openhands.events.observation.agent import (
-    AgentStateChangedObservation,
-)
-from openhands.events.serialization import event_to_dict
 from openhands.experiments.experiment_manager import ExperimentManagerImpl
 from openhands.integrations.provider import PROVIDER_TOKEN_TYPE, ProviderToken
 from openhands.integrations.service_types import ProviderType
+from openhands.server.replay_snapshot import chunk_events, replay_snapshot_cache
 from openhands.server.session.conversation_init_data import ConversationInitData
 from openhands.server.shared import (
     SecretsStoreImpl,
@@ -96,6 +85,9 @@ async def connect(connection_id: str, environ: dict) -> None:
             )
             latest_event_id = -1
         conversation_id = query_params.get('conversation_id', [None])[0]
+        # Clients which understand 'oh_event_batch' frames may request them to
+        # speed up the replay of long conversations
+        replay_mode = query_params.get('replay_mode', ['event'])[0]
         logger.info(
             f'Socket request for conversation {conversation_id} with connection_id {connection_id}'
         )
@@ -138,30 +130,21 @@ async def connect(connection_id: str, environ: dict) -> None:
         logger.info(
             f'Replaying event stream for conversation {conversation_id} with connection_id {connection_id}...'
         )
-        agent_state_changed = None
-
-        # Create an async store to replay events
-        async_store = AsyncEventStoreWrapper(event_store, latest_event_id + 1)
-
-        # Process all available events
-        async for event in async_store:
-            logger.debug(f'oh_event: {event.__class__.__name__}')
-
-            if isinstance(
-                event,
-                (NullAction, NullObservation, RecallAction),
-            ):
-                continue
-            elif isinstance(event, AgentStateChangedObservation):
-                agent_state_changed = event
-            else:
-                await sio.emit('oh_event', event_to_dict(event), to=connection_id)
+        # Replay from the precomputed snapshot, so only the tail of events added since
+        # the last connection needs to be read from the store
+        snapshot = await replay_snapshot_cache.get_snapshot(event_store)
+        events, agent_state_changed = snapshot.since(latest_event_id)
+
+        if replay_mode == 'batch':
+            for chunk in chunk_events(events):
+                await sio.emit('oh_event_batch', chunk, to=connection_id)
+        else:
+            for event_dict in events:
+                await sio.emit('oh_event', event_dict, to=connection_id)
 
         # Send the agent state changed event last if we have one
         if agent_state_changed:
-            await sio.emit(
-                'oh_event', event_to_dict(agent_state_changed), to=connection_id
-            )
+            await sio.emit('oh_event', agent_state_changed, to=connection_id)
 
         logger.info(
             f'Finished replaying event stream for conversation {conversation_id}'
@@ -1,7 +1,10 @@
-import asyncio
+import math
 import os
-from collections import defaultdict
-from datetime import datetime, timedelta
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
 from urllib.parse import urlparse
 
 from fastapi import Request
@@ -85,42 +88,163 @@ class CacheControlMiddleware(BaseHTTPMiddleware):
         return response
 
 
-class InMemoryRateLimiter:
-    history: dict[str, list[datetime]]
+@dataclass(frozen=True)
+class RateLimit:
+    """Allow `requests` requests every `seconds` seconds, with bursts of up to `burst` requests."""
+
     requests: int
-    seconds: int
-    sleep_seconds: int
+    seconds: float
+    burst: int | None = None
 
-    def __init__(self, requests: int = 2, seconds: int = 1, sleep_seconds: int = 1):
-        self.requests = requests
-        self.seconds = seconds
-        self.sleep_seconds = sleep_seconds
-        self.history = defaultdict(list)
-        self.sleep_seconds = sleep_seconds
+    @property
+    def emission_interval(self) -> float:
+        return self.seconds / self.requests
 
-    def _clean_old_requests(self, key: str) -> None:
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=self.seconds)
-        self.history[key] = [ts for ts in self.history[key] if ts > cutoff]
+    @property
+    def burst_tolerance(self) -> float:
+        return self.emission_interval * ((self.burst or self.requests) - 1)
 
-    async def __call__(self, request: Request) -> bool:
-        key = request.client.host
-        now = datetime.now()
 
-        self._clean_old_requests(key)
+@dataclass(frozen=True)
+class RouteRateLimit:
+    """A rate limit applied to requests whose path starts with `path_prefix`.
+
+    With `exact`, the path must be `path_prefix` itself (with or without a trailing
+    slash), so that the limit doesn't apply to the routes nested under it.
+    """
 
-        self.history[key].append(now)
+    path_prefix: str
+    limit: RateLimit
+    methods: frozenset[str] | None = None
+    exact: bool = False
 
-        if len(self.history[key]) > self.requests * 2:
+    def matches(self, request: StarletteRequest) -> bool:
+        if self.methods and request.method not in self.methods:
             return False
-        elif len(self.history[key]) > self.requests:
-            if self.sleep_seconds > 0:
-                await asyncio.sleep(self.sleep_seconds)
-                return True
-            else:
-                return False
+        if self.exact:
+            return request.url.path.rstrip('/') == self.path_prefix.rstrip('/')
+        return request.url.path.startswith(self.path_prefix)
 
-        return True
+
+# Stricter limits for routes which trigger LLM completions or browser automation
+DEFAULT_ROUTE_LIMITS = (
+    RouteRateLimit('/novel/write', RateLimit(requests=20, seconds=60, burst=5)),
+    RouteRateLimit('/api/novel/write', RateLimit(requests=20, seconds=60, burst=5)),
+    RouteRateLimit('/api/fizzo', RateLimit(requests=5, seconds=60, burst=2)),
+    # Only the creation of conversations, not the actions on existing ones
+    RouteRateLimit(
+        '/api/conversations',
+        RateLimit(requests=10, seconds=60, burst=5),
+        methods=frozenset({'POST'}),
+        exact=True,
+    ),
+)
+
+
+class RateLimiterBackend(ABC):
+    """Storage for rate limiter state.
+
+    Implementations use the generic cell rate algorithm (GCRA): the only state kept for
+    each key is its theoretical arrival time (TAT), so memory per client is constant.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: RateLimit) -> float:
+        """Record a request for `key`.
+
+        Returns:
+            0 if the request is allowed, otherwise the number of seconds until it would be.
+        """
+
+
+class InMemoryRateLimiterBackend(RateLimiterBackend):
+    """Process local GCRA state, evicting the least recently seen keys beyond `max_keys`."""
+
+    _tats: OrderedDict[str, float]
+    max_keys: int
+
+    def __init__(self, max_keys: int = 10_000):
+        self._tats = OrderedDict()
+        self.max_keys = max_keys
+
+    async def hit(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        tat = max(self._tats.get(key, now), now)
+        allow_at = tat - limit.burst_tolerance
+        if now < allow_at:
+            self._tats.move_to_end(key)
+            return allow_at - now
+        self._tats[key] = tat + limit.emission_interval
+        self._tats.move_to_end(key)
+        while len(self._tats) > self.max_keys:
+            self._tats.popitem(last=False)
+        return 0
+
+
+class RedisRateLimiterBackend(RateLimiterBackend):
+    """GCRA state shared between workers, stored in redis and updated atomically with a script."""
+
+    _SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local interval = tonumber(ARGV[2])
+    local tolerance = tonumber(ARGV[3])
+    local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+    if tat < now then tat = now end
+    local allow_at = tat - tolerance
+    if now < allow_at then return tostring(allow_at - now) end
+    local ttl = math.ceil(tat + interval - now)
+    redis.call('SET', KEYS[1], tostring(tat + interval), 'EX', math.max(ttl, 1))
+    return '0'
+    """
+
+    def __init__(self, url: str, password: str | None = None, prefix: str = 'ratelimit:'):
+        # Only required when a shared backend is configured
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url, password=password)
+        self._script = self._client.register_script(self._SCRIPT)
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: RateLimit) -> float:
+        result = await self._script(
+            keys=[f'{self.prefix}{key}'],
+            args=[time.time(), limit.emission_interval, limit.burst_tolerance],
+        )
+        return float(result)
+
+
+class InMemoryRateLimiter:
+    limit: RateLimit
+    route_limits: tuple[RouteRateLimit, ...]
+    backend: RateLimiterBackend
+
+    def __init__(
+        self,
+        requests: int = 2,
+        seconds: int = 1,
+        burst: int | None = None,
+        route_limits: Iterable[RouteRateLimit] = (),
+        backend: RateLimiterBackend | None = None,
+        max_keys: int = 10_000,
+    ):
+        self.limit = RateLimit(requests, seconds, burst)
+        self.route_limits = tuple(route_limits)
+        self.backend = backend or InMemoryRateLimiterBackend(max_keys)
+
+    def _get_key_and_limit(self, request: Request) -> tuple[str, RateLimit]:
+        host = request.client.host if request.client else 'unknown'
+        for route_limit in self.route_limits:
+            if route_limit.matches(request):
+                return f'{route_limit.path_prefix}:{host}', route_limit.limit
+        return host, self.limit
+
+    async def check(self, request: Request) -> float:
+        """Get the number of seconds the client must wait before retrying, or 0 if allowed."""
+        key, limit = self._get_key_and_limit(request)
+        return await self.backend.hit(key, limit)
+
+    async def __call__(self, request: Request) -> bool:
+        return await self.check(request) == 0
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -133,12 +257,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     ) -> Response:
         if not self.is_rate_limited_request(request):
             return await call_next(request)
-        ok = await self.rate_limiter(request)
-        if not ok:
+        retry_after = await self.rate_limiter.check(request)
+        if retry_after > 0:
             return JSONResponse(
                 status_code=429,
                 content={'message': 'Too many requests'},
-                headers={'Retry-After': '1'},
+                headers={'Retry-After': str(math.ceil(retry_after))},
             )
         return await call_next(request)
 
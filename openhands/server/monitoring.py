@@ -1,5 +1,17 @@
+import threading
+
 from openhands.core.config.openhands_config import OpenHandsConfig
 from openhands.events.event import Event
+from openhands.utils.prometheus import Counter, Gauge, Histogram
+
+ACTIVE_CONVERSATIONS = Gauge(
+    'openhands_active_conversations', 'Conversations with a running agent loop'
+)
+THREADS = Gauge('openhands_threads', 'Threads of the server process')
+THREADS.set_function(threading.active_count)
+FIZZO_BROWSERS = Gauge(
+    'openhands_fizzo_browsers', 'Browsers open for Fizzo automation requests'
+)
 
 
 class MonitoringListener:
@@ -43,3 +55,33 @@ class MonitoringListener:
         config: OpenHandsConfig,
     ) -> 'MonitoringListener':
         return cls()
+
+
+class PrometheusMonitoringListener(MonitoringListener):
+    """Records application activity as metrics, which `/metrics` exposes."""
+
+    def __init__(self) -> None:
+        self.session_events = Counter(
+            'openhands_session_events_total',
+            'Events added to the event streams of sessions',
+            ['source', 'type'],
+        )
+        self.agent_session_starts = Histogram(
+            'openhands_agent_session_start_seconds',
+            'Time taken to start agent sessions',
+            ['success'],
+        )
+        self.conversations_created = Counter(
+            'openhands_conversations_created_total', 'Conversations created'
+        )
+
+    def on_session_event(self, event: Event) -> None:
+        self.session_events.labels(
+            event.source.value if event.source else 'unknown', type(event).__name__
+        ).inc()
+
+    def on_agent_session_start(self, success: bool, duration: float) -> None:
+        self.agent_session_starts.labels(str(success).lower()).observe(duration)
+
+    def on_create_conversation(self) -> None:
+        self.conversations_created.inc()
@@ -0,0 +1,143 @@
+"""Compact, incrementally maintained snapshots used to replay conversations to clients.
+
+Replaying a long conversation to a reconnecting socket used to mean loading and
+filtering every event one by one. Instead we keep a snapshot per conversation
+holding only the serialized events the UI cares about, and on each connect only
+the events added since the snapshot was taken (the tail) need to be read.
+"""
+
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from openhands.events.action import NullAction
+from openhands.events.action.agent import RecallAction
+from openhands.events.async_event_store_wrapper import AsyncEventStoreWrapper
+from openhands.events.event_store import EventStore
+from openhands.events.observation import NullObservation
+from openhands.events.observation.agent import AgentStateChangedObservation
+from openhands.events.serialization import event_to_dict
+from openhands.io.json import dumps_fast
+from openhands.utils.async_utils import call_sync_from_async
+
+# Events which are never sent to the UI during a replay
+REPLAY_EXCLUDED_TYPES = (NullAction, NullObservation, RecallAction)
+
+# Number of events sent per frame when a client requests batched replay
+REPLAY_BATCH_SIZE = 100
+
+# Bytes of serialized events kept in memory by the replay snapshot cache
+REPLAY_SNAPSHOT_CACHE_MAX_BYTES = int(
+    os.getenv('REPLAY_SNAPSHOT_CACHE_MAX_BYTES', str(256 * 1024 * 1024))
+)
+
+
+@dataclass(frozen=True)
+class ReplaySnapshot:
+    """The UI relevant events of a conversation up to (and including) `last_event_id`.
+
+    The latest AgentStateChangedObservation is kept apart from the other events, as
+    it is always sent last during a replay. `size` is the number of bytes of the
+    events once serialized, as a measure of the memory they use.
+    """
+
+    events: tuple[dict[str, Any], ...] = ()
+    agent_state_changed: dict[str, Any] | None = None
+    last_event_id: int = -1
+    size: int = 0
+
+    def since(
+        self, latest_event_id: int
+    ) -> tuple[list[dict[str, Any]], dict[str, Any] | None]:
+        """Get the events a client which has already seen `latest_event_id` is missing."""
+        events = self.events
+        # Events are ordered by id, so only the tail the client is missing is scanned
+        index = len(events)
+        while index > 0 and events[index - 1]['id'] > latest_event_id:
+            index -= 1
+        agent_state_changed = self.agent_state_changed
+        if agent_state_changed and agent_state_changed['id'] <= latest_event_id:
+            agent_state_changed = None
+        return list(events[index:]), agent_state_changed
+
+
+async def extend_replay_snapshot(
+    snapshot: ReplaySnapshot, event_store: EventStore
+) -> ReplaySnapshot:
+    """Create a new snapshot including any events added to the store since `snapshot` was taken."""
+    events = list(snapshot.events)
+    agent_state_changed = snapshot.agent_state_changed
+    last_event_id = snapshot.last_event_id
+    size = snapshot.size
+    async for event in AsyncEventStoreWrapper(event_store, last_event_id + 1):
+        last_event_id = event.id
+        if isinstance(event, REPLAY_EXCLUDED_TYPES):
+            continue
+        elif isinstance(event, AgentStateChangedObservation):
+            agent_state_changed = event_to_dict(event)
+        else:
+            event_dict = event_to_dict(event)
+            events.append(event_dict)
+            size += len(dumps_fast(event_dict))
+    return ReplaySnapshot(tuple(events), agent_state_changed, last_event_id, size)
+
+
+@dataclass
+class ReplaySnapshotCache:
+    """A least recently used cache of replay snapshots for each conversation.
+
+    It is bounded both by number of snapshots and by their total size, as a few long
+    conversations can use more memory than many short ones.
+    """
+
+    max_entries: int = 64
+    max_bytes: int = REPLAY_SNAPSHOT_CACHE_MAX_BYTES
+    _snapshots: OrderedDict[tuple[str | None, str], ReplaySnapshot] = field(
+        default_factory=OrderedDict
+    )
+    _bytes: int = 0
+
+    async def get_snapshot(self, event_store: EventStore) -> ReplaySnapshot:
+        key = (event_store.user_id, event_store.sid)
+        snapshot = self._snapshots.get(key) or ReplaySnapshot()
+        latest_event_id = await call_sync_from_async(event_store.get_latest_event_id)
+        if snapshot.last_event_id > latest_event_id:
+            # The conversation was deleted and recreated - start from scratch
+            snapshot = ReplaySnapshot()
+        snapshot = await extend_replay_snapshot(snapshot, event_store)
+        existing = self._snapshots.get(key)
+        # Another connection may have extended the snapshot concurrently
+        if existing is None or existing.last_event_id <= snapshot.last_event_id:
+            self._remove(key)
+            # A snapshot larger than the whole cache is only used once
+            if snapshot.size > self.max_bytes:
+                return snapshot
+            self._snapshots[key] = snapshot
+            self._bytes += snapshot.size
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._snapshots.popitem(last=False)
+            self._bytes -= evicted.size
+        return snapshot
+
+    def invalidate(self, sid: str, user_id: str | None = None) -> None:
+        self._remove((user_id, sid))
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def _remove(self, key: tuple[str | None, str]) -> None:
+        snapshot = self._snapshots.pop(key, None)
+        if snapshot is not None:
+            self._bytes -= snapshot.size
+
+
+def chunk_events(
+    events: list[dict[str, Any]], batch_size: int = REPLAY_BATCH_SIZE
+) -> list[list[dict[str, Any]]]:
+    return [events[i : i + batch_size] for i in range(0, len(events), batch_size)]
+
+
+replay_snapshot_cache = ReplaySnapshotCache()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
@@ -12,11 +14,15 @@ from openhands.server.shared import conversation_manager
 from openhands.server.utils import get_conversation
 from openhands.microagent.types import InputMetadata
 from openhands.memory.memory import Memory
+from openhands.utils.profiler import get_profile
 
 app = APIRouter(
     prefix='/api/conversations/{conversation_id}', dependencies=get_dependencies()
 )
 
+# The largest page of events which can be searched at once
+MAX_EVENTS_PAGE_SIZE = 1000
+
 
 @app.get('/config')
 async def get_remote_runtime_config(
@@ -115,16 +121,16 @@ async def search_events(
         end_id: Ending ID in the event stream
         reverse: Whether to retrieve events in reverse order. Defaults to False.
         filter: Filter for events
-        limit: Maximum number of events to return. Must be between 1 and 100. Defaults to 20
+        limit: Maximum number of events to return. Must be between 1 and 1000. Defaults to 20
     Returns:
         dict: Dictionary containing:
             - events: List of matching events
             - has_more: Whether there are more matching events after this batch
     Raises:
         HTTPException: If conversation is not found
-        ValueError: If limit is less than 1 or greater than 100
+        ValueError: If limit is less than 1 or greater than 1000
     """
-    if limit < 0 or limit > 100:
+    if limit < 0 or limit > MAX_EVENTS_PAGE_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid limit'
         )
@@ -153,6 +159,42 @@ async def search_events(
     }
 
 
+@app.get('/events/latest-id')
+async def get_latest_event_id(
+    conversation: ServerConversation = Depends(get_conversation),
+) -> JSONResponse:
+    """Get the ID of the latest event, without reading it.
+
+    Returns:
+        JSONResponse: `{"id": ...}`, or a 404 error if there are no events yet.
+    """
+    latest_id = conversation.event_stream.get_latest_event_id()
+    if latest_id < 0:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND, content={'error': 'no_event'}
+        )
+    return JSONResponse(content={'id': latest_id})
+
+
+@app.get('/events/{event_id}')
+async def get_event(
+    event_id: int,
+    conversation: ServerConversation = Depends(get_conversation),
+) -> JSONResponse:
+    """Get a single event by its ID.
+
+    Returns:
+        JSONResponse: The event, or a 404 error if there is no such event.
+    """
+    try:
+        event = conversation.event_stream.get_event(event_id)
+    except FileNotFoundError:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND, content={'error': 'no_event'}
+        )
+    return JSONResponse(content=event_to_dict(event))
+
+
 @app.post('/events')
 async def add_event(
     request: Request, conversation: ServerConversation = Depends(get_conversation)
@@ -243,3 +285,38 @@ async def get_microagents(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={'error': f'Error getting microagents: {e}'},
         )
+
+
+@app.get('/profile')
+async def get_step_profile(
+    format: Literal['summary', 'chrome', 'otlp'] = 'summary',
+    conversation: ServerConversation = Depends(get_conversation),
+) -> JSONResponse:
+    """Get the profile of the agent steps of a conversation.
+
+    Steps are only profiled when the server runs with PROFILE_AGENT_STEPS=true.
+
+    Args:
+        format: `summary` for the time spent in each kind of span, in total and for
+            each step, `chrome` for a Chrome trace (chrome://tracing, Perfetto), or
+            `otlp` for OpenTelemetry (OTLP) JSON.
+
+    Returns:
+        JSONResponse: The profile in the requested format.
+    """
+    profile = get_profile(conversation.sid)
+    if profile is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                'error': 'No steps were profiled for this conversation. Set '
+                'PROFILE_AGENT_STEPS=true to profile agent steps.'
+            },
+        )
+    if format == 'chrome':
+        content = profile.to_chrome_trace()
+    elif format == 'otlp':
+        content = profile.to_otlp()
+    else:
+        content = profile.summary()
+    return JSONResponse(status_code=status.HTTP_200_OK, content=content)
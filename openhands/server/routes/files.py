@@ -1,4 +1,7 @@
+import hashlib
+import json
 import os
+from collections import OrderedDict
 from typing import Any
 
 from fastapi import (
@@ -8,7 +11,7 @@ from fastapi import (
     Request,
     status,
 )
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pathspec import PathSpec
 from pathspec.patterns import GitWildMatchPattern
 from starlette.background import BackgroundTask
@@ -39,19 +42,39 @@ from openhands.server.session.conversation import ServerConversation
 
 app = APIRouter(prefix='/api/conversations/{conversation_id}', dependencies=get_dependencies())
 
+# The compiled .gitignore of the conversations whose runtime doesn't filter listings,
+# with the content it was compiled from
+_GITIGNORE_SPECS_MAX = 256
+_gitignore_specs: OrderedDict[str, tuple[str, PathSpec]] = OrderedDict()
+
+
+def _get_gitignore_spec(conversation_id: str, content: str) -> PathSpec:
+    cached = _gitignore_specs.get(conversation_id)
+    if cached is not None and cached[0] == content:
+        _gitignore_specs.move_to_end(conversation_id)
+        return cached[1]
+    spec = PathSpec.from_lines(GitWildMatchPattern, content.splitlines())
+    _gitignore_specs[conversation_id] = (content, spec)
+    _gitignore_specs.move_to_end(conversation_id)
+    while len(_gitignore_specs) > _GITIGNORE_SPECS_MAX:
+        _gitignore_specs.popitem(last=False)
+    return spec
+
 
 @app.get(
     '/list-files',
     response_model=list[str],
     responses={
+        304: {'description': 'Files unchanged since the listing with the given ETag'},
         404: {'description': 'Runtime not initialized', 'model': dict},
         500: {'description': 'Error listing or filtering files', 'model': dict},
     },
 )
 async def list_files(
+    request: Request,
     conversation: ServerConversation = Depends(get_conversation),
     path: str | None = None
-) -> list[str] | JSONResponse:
+) -> list[str] | Response:
     """List files in the specified path.
 
     This function retrieves a list of files from the agent's runtime file store,
@@ -67,7 +90,8 @@ async def list_files(
         path (str, optional): The path to list files from. Defaults to None.
 
     Returns:
-        list: A list of file names in the specified path.
+        list: A list of file names in the specified path, with an ETag: a request with
+        this ETag in If-None-Match gets a 304 response if the list didn't change.
 
     Raises:
         HTTPException: If there's an error listing the files.
@@ -97,25 +121,36 @@ async def list_files(
         try:
             read_action = FileReadAction(gitignore_path)
             observation = await call_sync_from_async(runtime.run_action, read_action)
-            spec = PathSpec.from_lines(
-                GitWildMatchPattern, observation.content.splitlines()
-            )
+            if not isinstance(observation, FileReadObservation):
+                return file_list
+            spec = _get_gitignore_spec(conversation.sid, observation.content)
         except Exception as e:
             logger.warning(e)
             return file_list
         file_list = [entry for entry in file_list if not spec.match_file(entry)]
         return file_list
 
-    try:
-        file_list = await filter_for_gitignore(file_list, '')
-    except AgentRuntimeUnavailableError as e:
-        logger.error(f'Error filtering files: {e}')
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={'error': f'Error filtering files: {e}'},
-        )
+    # Most runtimes leave out the files ignored by the .gitignore of the workspace
+    # themselves, but older runtime images don't
+    if not runtime.list_files_respects_gitignore:
+        try:
+            file_list = await filter_for_gitignore(file_list, '')
+        except AgentRuntimeUnavailableError as e:
+            logger.error(f'Error filtering files: {e}')
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={'error': f'Error filtering files: {e}'},
+            )
 
-    return file_list
+    # The file explorer revalidates listings often: unchanged ones are not sent again
+    etag = '"{}"'.format(
+        hashlib.blake2b(json.dumps(file_list).encode(), digest_size=16).hexdigest()
+    )
+    if request.headers.get('if-none-match') == etag:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+        )
+    return JSONResponse(content=file_list, headers={'ETag': etag})
 
 
 # NOTE: We use response_model=None for endpoints that can return multiple response types
@@ -38,6 +38,7 @@ from openhands.server.data_models.conversation_info import ConversationInfo
 from openhands.server.data_models.conversation_info_result_set import (
     ConversationInfoResultSet,
 )
+from openhands.server.replay_snapshot import replay_snapshot_cache
 from openhands.server.services.conversation_service import create_new_conversation
 from openhands.server.session.conversation import ServerConversation
 from openhands.server.dependencies import get_dependencies
@@ -291,6 +292,7 @@ async def delete_conversation(
     runtime_cls = get_runtime_cls(config.runtime)
     await runtime_cls.delete(conversation_id)
     await conversation_store.delete_metadata(conversation_id)
+    replay_snapshot_cache.invalidate(conversation_id, user_id)
     return True
 
 
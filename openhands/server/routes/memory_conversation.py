@@ -10,10 +10,12 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from openhands.server.chat_session_store import ChatSessionStore, is_valid_session_id
+
 router = APIRouter(prefix="/memory-chat", tags=["memory-chat"])
 
-# In-memory storage for conversations
-CONVERSATIONS: Dict[str, Dict] = {}
+# Storage for conversations, bounded and in memory only
+CONVERSATIONS = ChatSessionStore("memory-chat")
 
 class MemoryChatRequest(BaseModel):
     message: str
@@ -50,34 +52,34 @@ async def send_message(request: MemoryChatRequest):
     try:
         # Get or create conversation
         conversation_id = request.conversation_id or str(uuid.uuid4())
+        if not is_valid_session_id(conversation_id):
+            raise HTTPException(status_code=400, detail="Invalid conversation ID")
         
-        if conversation_id not in CONVERSATIONS:
-            CONVERSATIONS[conversation_id] = {
-                "id": conversation_id,
-                "created_at": datetime.now().isoformat(),
-                "messages": [],
+        async with CONVERSATIONS.edit(conversation_id, lambda: {
+            "id": conversation_id,
+            "created_at": datetime.now().isoformat(),
+            "messages": [],
+            "model": request.model
+        }) as conversation:
+            # Add user message
+            user_message = {
+                "role": "user",
+                "content": request.message,
+                "timestamp": datetime.now().isoformat()
+            }
+            conversation["messages"].append(user_message)
+            
+            # Generate simple response (echo for now, can be replaced with OpenRouter call)
+            response_text = f"Echo from memory chat: {request.message}"
+            
+            # Add assistant response
+            assistant_message = {
+                "role": "assistant", 
+                "content": response_text,
+                "timestamp": datetime.now().isoformat(),
                 "model": request.model
             }
-        
-        # Add user message
-        user_message = {
-            "role": "user",
-            "content": request.message,
-            "timestamp": datetime.now().isoformat()
-        }
-        CONVERSATIONS[conversation_id]["messages"].append(user_message)
-        
-        # Generate simple response (echo for now, can be replaced with OpenRouter call)
-        response_text = f"Echo from memory chat: {request.message}"
-        
-        # Add assistant response
-        assistant_message = {
-            "role": "assistant", 
-            "content": response_text,
-            "timestamp": datetime.now().isoformat(),
-            "model": request.model
-        }
-        CONVERSATIONS[conversation_id]["messages"].append(assistant_message)
+            conversation["messages"].append(assistant_message)
         
         return JSONResponse({
             "conversation_id": conversation_id,
@@ -85,9 +87,11 @@ async def send_message(request: MemoryChatRequest):
             "timestamp": datetime.now().isoformat(),
             "model": request.model,
             "status": "success",
-            "message_count": len(CONVERSATIONS[conversation_id]["messages"])
+            "message_count": len(conversation["messages"])
         })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -98,9 +102,9 @@ async def send_message(request: MemoryChatRequest):
 async def list_conversations():
     """List all active conversations."""
     conversations = []
-    for conv_id, conv_data in CONVERSATIONS.items():
+    for conv_data in await CONVERSATIONS.list_sessions():
         conversations.append({
-            "id": conv_id,
+            "id": conv_data["id"],
             "created_at": conv_data["created_at"],
             "message_count": len(conv_data["messages"]),
             "model": conv_data.get("model", "unknown"),
@@ -116,19 +120,19 @@ async def list_conversations():
 @router.get("/conversations/{conversation_id}")
 async def get_conversation(conversation_id: str):
     """Get a specific conversation."""
-    if conversation_id not in CONVERSATIONS:
+    conversation = await CONVERSATIONS.get(conversation_id)
+    if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     return JSONResponse({
         "status": "success",
-        "conversation": CONVERSATIONS[conversation_id]
+        "conversation": conversation
     })
 
 @router.delete("/conversations")
 async def clear_all_conversations():
     """Clear all conversations from memory."""
-    count = len(CONVERSATIONS)
-    CONVERSATIONS.clear()
+    count = await CONVERSATIONS.clear()
     
     return JSONResponse({
         "status": "success",
@@ -139,11 +143,9 @@ async def clear_all_conversations():
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Delete a specific conversation."""
-    if conversation_id not in CONVERSATIONS:
+    if not await CONVERSATIONS.delete(conversation_id):
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    del CONVERSATIONS[conversation_id]
-    
     return JSONResponse({
         "status": "success",
         "message": f"Deleted conversation {conversation_id}",
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from openhands.server.monitoring import ACTIVE_CONVERSATIONS
+from openhands.server.shared import conversation_manager
+from openhands.utils.prometheus import CONTENT_TYPE, REGISTRY
+
+app = APIRouter()
+
+
+@app.get('/metrics', include_in_schema=False)
+async def get_metrics() -> Response:
+    """Get the metrics of the server, in the Prometheus text format."""
+    ACTIVE_CONVERSATIONS.set(len(await conversation_manager.get_running_agent_loops()))
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
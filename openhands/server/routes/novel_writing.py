@@ -2,31 +2,49 @@
 Novel Writing Mode API endpoints
 Specialized endpoints for Indonesian creative writing assistance
 """
+import asyncio
+import hashlib
 import os
 import uuid
 import json
 from datetime import datetime
 from typing import Dict, List, Optional
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+import httpx
 
 from openhands.core.novel_writing_prompts import (
     create_novel_writing_prompt, 
     get_novel_writing_questions,
     NOVEL_WRITING_QUESTIONS
 )
+from openhands.core.novel_chapter_pipeline import ChapterPipeline, CompletionStream
 from openhands.core.novel_writing_config import (
     create_novel_writing_llm_config,
     should_use_premium_model,
     get_novel_writing_model_info,
     NovelWritingConfig
 )
+from openhands.core.logger import openhands_logger as logger
+from openhands.memory.condenser.impl.story_bible_condenser import (
+    StoryBible,
+    parse_story_bible,
+    story_bible_prompt
+)
+from openhands.server.chat_session_store import ChatSessionStore, is_valid_session_id
+from openhands.server.shared import file_store
+from openhands.utils.async_utils import call_sync_from_async
 
 router = APIRouter(prefix="/novel", tags=["novel-writing"])
 
-# In-memory storage for novel writing sessions
-NOVEL_SESSIONS: Dict[str, Dict] = {}
+OPENROUTER_CHAT_COMPLETIONS_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Novel writing sessions, the most recent in memory and all in the file store
+NOVEL_SESSIONS = ChatSessionStore("novel", file_store)
+
+# The story bible updates running in the background, by session
+_STORY_BIBLE_UPDATES: Dict[str, asyncio.Task] = {}
 
 class NovelWritingRequest(BaseModel):
     message: str
@@ -36,6 +54,13 @@ class NovelWritingRequest(BaseModel):
     force_premium: Optional[bool] = False
     api_key: Optional[str] = None
 
+class NovelChapterRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+    chapter_id: Optional[str] = None
+    force_premium: Optional[bool] = False
+    api_key: Optional[str] = None
+
 class NovelWritingResponse(BaseModel):
     session_id: str
     response: str
@@ -67,6 +92,7 @@ async def novel_info():
         "endpoints": {
             "info": "GET /novel/",
             "write": "POST /novel/write",
+            "chapter": "POST /novel/chapter",
             "templates": "GET /novel/templates",
             "questions": "GET /novel/questions/{template}",
             "sessions": "GET /novel/sessions",
@@ -80,88 +106,14 @@ async def novel_write(request: NovelWritingRequest):
     try:
         # Get or create session
         session_id = request.session_id or str(uuid.uuid4())
-        
-        if session_id not in NOVEL_SESSIONS:
-            NOVEL_SESSIONS[session_id] = {
-                "id": session_id,
-                "created_at": datetime.now().isoformat(),
-                "messages": [],
-                "template_history": [],
-                "total_interactions": 0
-            }
-        
-        session = NOVEL_SESSIONS[session_id]
-        
-        # Determine model selection
-        use_premium = request.force_premium or should_use_premium_model(
-            request.template,
-            len(request.message)
-        )
-        
-        # Get model information
-        model_info = get_novel_writing_model_info(use_premium)
-        
-        # Create specialized prompt
-        system_prompt = create_novel_writing_prompt(
-            request.template,
-            request.original_prompt or request.message
-        )
-        
-        # Get template-specific questions
-        questions = get_novel_writing_questions(request.template) if request.template else []
-        
-        # Add to session history
-        user_message = {
-            "role": "user",
-            "content": request.message,
-            "template": request.template,
-            "timestamp": datetime.now().isoformat(),
-            "original_prompt": request.original_prompt
-        }
-        session["messages"].append(user_message)
-        
-        if request.template:
-            session["template_history"].append(request.template)
-        
-        session["total_interactions"] += 1
-        
-        # Get API key
-        api_key = request.api_key or os.getenv("LLM_API_KEY") or os.getenv("OPENROUTER_API_KEY")
-        
-        if not api_key:
-            # Return helpful response without API call
-            response_content = _create_helpful_response(request, questions, model_info)
-        else:
-            # Make actual API call to OpenRouter
-            response_content = await _call_openrouter_api(
-                request, system_prompt, session, api_key, model_info
-            )
-        
-        # Add AI response to session
-        ai_message = {
-            "role": "assistant",
-            "content": response_content,
-            "model": model_info["model"],
-            "template": request.template,
-            "timestamp": datetime.now().isoformat()
-        }
-        session["messages"].append(ai_message)
-        
-        return JSONResponse({
-            "session_id": session_id,
-            "response": response_content,
-            "template_used": request.template,
-            "model_info": model_info,
-            "questions": questions,
-            "timestamp": datetime.now().isoformat(),
-            "status": "success",
-            "session_stats": {
-                "total_interactions": session["total_interactions"],
-                "templates_used": list(set(session["template_history"])),
-                "message_count": len(session["messages"])
-            }
-        })
-        
+        if not is_valid_session_id(session_id):
+            raise HTTPException(status_code=400, detail="Invalid session ID")
+
+        async with NOVEL_SESSIONS.edit(session_id, _session_factory(session_id)) as session:
+            return await _novel_write(request, session_id, session)
+
+    except HTTPException:
+        raise
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -172,6 +124,90 @@ async def novel_write(request: NovelWritingRequest):
             }
         )
 
+def _session_factory(session_id: str):
+    """Create a new novel writing session."""
+    return lambda: {
+        "id": session_id,
+        "created_at": datetime.now().isoformat(),
+        "messages": [],
+        "template_history": [],
+        "total_interactions": 0
+    }
+
+async def _novel_write(request: NovelWritingRequest, session_id: str, session: Dict) -> JSONResponse:
+    """Answer a novel writing request, adding its messages to the session."""
+    # Determine model selection
+    use_premium = request.force_premium or should_use_premium_model(
+        request.template,
+        len(request.message)
+    )
+    
+    # Get model information
+    model_info = get_novel_writing_model_info(use_premium)
+    
+    # Create specialized prompt
+    system_prompt = create_novel_writing_prompt(
+        request.template,
+        request.original_prompt or request.message
+    )
+    
+    # Get template-specific questions
+    questions = get_novel_writing_questions(request.template) if request.template else []
+    
+    # Add to session history
+    user_message = {
+        "role": "user",
+        "content": request.message,
+        "template": request.template,
+        "timestamp": datetime.now().isoformat(),
+        "original_prompt": request.original_prompt
+    }
+    session["messages"].append(user_message)
+    
+    if request.template:
+        session["template_history"].append(request.template)
+    
+    session["total_interactions"] += 1
+    
+    # Get API key
+    api_key = request.api_key or os.getenv("LLM_API_KEY") or os.getenv("OPENROUTER_API_KEY")
+    
+    if not api_key:
+        # Return helpful response without API call
+        response_content = _create_helpful_response(request, questions, model_info)
+    else:
+        # Make actual API call to OpenRouter
+        response_content = await _call_openrouter_api(
+            request, system_prompt, session, api_key, model_info
+        )
+    
+    # Add AI response to session
+    ai_message = {
+        "role": "assistant",
+        "content": response_content,
+        "model": model_info["model"],
+        "template": request.template,
+        "timestamp": datetime.now().isoformat()
+    }
+    session["messages"].append(ai_message)
+    if api_key:
+        _schedule_story_bible_update(session_id, api_key)
+    
+    return JSONResponse({
+        "session_id": session_id,
+        "response": response_content,
+        "template_used": request.template,
+        "model_info": model_info,
+        "questions": questions,
+        "timestamp": datetime.now().isoformat(),
+        "status": "success",
+        "session_stats": {
+            "total_interactions": session["total_interactions"],
+            "templates_used": list(set(session["template_history"])),
+            "message_count": len(session["messages"])
+        }
+    })
+
 def _create_helpful_response(request: NovelWritingRequest, questions: List[str], model_info: Dict) -> str:
     """Create helpful response when API key is not available."""
     template_name = request.template or "umum"
@@ -204,20 +240,8 @@ Saya siap membantu Anda mengembangkan cerita dengan pendekatan yang mendalam dan
 async def _call_openrouter_api(request: NovelWritingRequest, system_prompt: str, 
                               session: Dict, api_key: str, model_info: Dict) -> str:
     """Make actual API call to OpenRouter for novel writing."""
-    import requests
-    
-    # Prepare conversation history (last 6 messages for context)
-    conversation_messages = session["messages"][-6:]
-    openrouter_messages = [
-        {"role": msg["role"], "content": msg["content"]} 
-        for msg in conversation_messages
-    ]
-    
-    # Add system prompt
-    openrouter_messages.insert(0, {
-        "role": "system", 
-        "content": system_prompt
-    })
+    # The story bible and the most recent messages, instead of the whole manuscript
+    openrouter_messages = _novel_context_messages(session, system_prompt)
     
     # Add current user message
     openrouter_messages.append({
@@ -225,14 +249,6 @@ async def _call_openrouter_api(request: NovelWritingRequest, system_prompt: str,
         "content": request.message
     })
     
-    # Prepare API request
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://huggingface.co/spaces/Minatoz997/Backend66",
-        "X-Title": "OpenHands Novel Writing"
-    }
-    
     # Use novel writing optimized parameters
     config = NovelWritingConfig()
     payload = {
@@ -243,10 +259,15 @@ async def _call_openrouter_api(request: NovelWritingRequest, system_prompt: str,
         "top_p": config.top_p,
         "stream": False
     }
-    
-    response = requests.post(
-        "https://openrouter.ai/api/v1/chat/completions",
-        headers=headers,
+    return await _openrouter_completion(api_key, payload)
+
+async def _openrouter_completion(api_key: str, payload: Dict) -> str:
+    import requests
+
+    response = await call_sync_from_async(
+        requests.post,
+        OPENROUTER_CHAT_COMPLETIONS_URL,
+        headers=_openrouter_headers(api_key),
         json=payload,
         timeout=60
     )
@@ -257,6 +278,229 @@ async def _call_openrouter_api(request: NovelWritingRequest, system_prompt: str,
     else:
         raise Exception(f"OpenRouter API error: {response.status_code} - {response.text}")
 
+def _novel_context_messages(session: Dict, system_prompt: str) -> List[Dict[str, str]]:
+    """The system prompt with the story bible, and the recent messages of a session.
+
+    Only the messages the story bible doesn't cover yet are sent (but always at least
+    the last exchange, i.e. the last scene), so the prompt size doesn't grow with the
+    manuscript.
+    """
+    config = NovelWritingConfig()
+    story_bible = StoryBible(**session.get("story_bible", {}))
+    if not story_bible.is_empty():
+        system_prompt += f"\n\n{story_bible}"
+
+    # Without the message being answered, which the caller adds
+    history = session["messages"][:-1]
+    start = min(session.get("story_bible_through", 0), max(len(history) - 2, 0))
+    recent = history[start:][-config.recent_messages:]
+    return [{"role": "system", "content": system_prompt}] + [
+        # The end of a long scene matters most to continue it
+        {"role": msg["role"], "content": msg["content"][-config.recent_message_max_chars:]}
+        for msg in recent
+    ]
+
+def _schedule_story_bible_update(session_id: str, api_key: str) -> None:
+    """Update the story bible of a session in the background, after an exchange."""
+    if session_id in _STORY_BIBLE_UPDATES:
+        # The next exchange will add the messages this update misses
+        return
+    _STORY_BIBLE_UPDATES[session_id] = asyncio.create_task(
+        _update_story_bible(session_id, api_key)
+    )
+
+async def _update_story_bible(session_id: str, api_key: str) -> None:
+    """Fold the messages of a session that its story bible doesn't cover into it."""
+    try:
+        session = await NOVEL_SESSIONS.get(session_id)
+        if session is None:
+            return
+        through = session.get("story_bible_through", 0)
+        messages = session["messages"][through:]
+        if not messages:
+            return
+        previous = StoryBible(**session.get("story_bible", {}))
+        config = NovelWritingConfig()
+        prompt = story_bible_prompt(
+            previous, [f'{msg["role"]}: {msg["content"]}' for msg in messages]
+        )
+        content = await _openrouter_completion(api_key, {
+            "model": os.getenv("NOVEL_STORY_BIBLE_MODEL", config.story_bible_model),
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": config.story_bible_max_output_tokens,
+            "temperature": 0,
+            "stream": False
+        })
+        story_bible = parse_story_bible(content, previous)
+
+        async with NOVEL_SESSIONS.edit(session_id, _session_factory(session_id)) as session:
+            # Unless the session was changed meanwhile (e.g. deleted and started over)
+            if session.get("story_bible_through", 0) == through and len(session["messages"]) >= through + len(messages):
+                session["story_bible"] = story_bible.model_dump()
+                session["story_bible_through"] = through + len(messages)
+    except Exception as e:
+        logger.warning(f"Error updating the story bible of novel session {session_id}: {e}")
+    finally:
+        _STORY_BIBLE_UPDATES.pop(session_id, None)
+
+def _openrouter_headers(api_key: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://huggingface.co/spaces/Minatoz997/Backend66",
+        "X-Title": "OpenHands Novel Writing"
+    }
+
+@router.post("/chapter")
+async def novel_chapter(request: NovelChapterRequest):
+    """Write a whole chapter: an outline, then its scenes concurrently, then their merge.
+
+    The chapter is streamed as server-sent events (see ChapterPipeline for the events).
+    Each stage is checkpointed in the session, so a chapter which failed is resumed
+    by sending the same request again with the same session and chapter IDs. Once the
+    chapter is added to the history, only a reference to it is kept: sending the
+    request again sends the chapter again, and a new chapter ID writes a new one.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    chapter_id = request.chapter_id or uuid.uuid4().hex
+    if not is_valid_session_id(session_id) or not is_valid_session_id(chapter_id):
+        raise HTTPException(status_code=400, detail="Invalid session or chapter ID")
+
+    api_key = request.api_key or os.getenv("LLM_API_KEY") or os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        raise HTTPException(status_code=400, detail="An OpenRouter API key is required to write chapters")
+
+    use_premium = request.force_premium or should_use_premium_model(None, len(request.message))
+    model_info = get_novel_writing_model_info(use_premium)
+
+    async with NOVEL_SESSIONS.edit(session_id, _session_factory(session_id)) as session:
+        checkpoint = session.setdefault("chapters", {}).get(chapter_id)
+        written = _written_chapter(session, checkpoint, request.message)
+    if checkpoint and "content_sha256" in checkpoint:
+        # Written before, but no longer in the history: it is written again
+        checkpoint = None
+
+    async def save_checkpoint(checkpoint: Dict) -> None:
+        async with NOVEL_SESSIONS.edit(session_id, _session_factory(session_id)) as session:
+            session.setdefault("chapters", {})[chapter_id] = checkpoint
+
+    async def events():
+        yield _sse({
+            "type": "start",
+            "session_id": session_id,
+            "chapter_id": chapter_id,
+            "model_info": model_info
+        })
+        if written is not None:
+            # Sent again, but not added to the history again
+            yield _sse(written)
+            return
+        try:
+            # All the completions of the chapter share the connections of one client
+            async with httpx.AsyncClient(timeout=httpx.Timeout(60, read=120)) as client:
+                pipeline = ChapterPipeline(
+                    _openrouter_completion_stream(client, api_key, model_info["model"]),
+                    save_checkpoint
+                )
+                async for event in pipeline.run(request.message, checkpoint):
+                    if event["type"] == "chapter":
+                        await _add_chapter_messages(session_id, chapter_id, request, event, model_info)
+                        _schedule_story_bible_update(session_id, api_key)
+                    yield _sse(event)
+        except Exception as e:
+            yield _sse({
+                "type": "error",
+                "message": f"Novel chapter error: {str(e)}",
+                "timestamp": datetime.now().isoformat()
+            })
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+def _sse(event: Dict) -> str:
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+def _openrouter_completion_stream(client: httpx.AsyncClient, api_key: str, model: str) -> CompletionStream:
+    """Stream completions from OpenRouter, with the novel writing parameters."""
+    config = NovelWritingConfig()
+
+    async def complete(messages: List[Dict[str, str]], max_tokens: int):
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": config.temperature,
+            "top_p": config.top_p,
+            "stream": True
+        }
+        async with client.stream(
+            "POST", OPENROUTER_CHAT_COMPLETIONS_URL, headers=_openrouter_headers(api_key), json=payload
+        ) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode(errors="replace")
+                raise Exception(f"OpenRouter API error: {response.status_code} - {body}")
+            async for line in response.aiter_lines():
+                # Other lines are keep-alive comments
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise Exception(f"OpenRouter API error: {chunk['error']}")
+                choices = chunk.get("choices") or [{}]
+                text = (choices[0].get("delta") or {}).get("content")
+                if text:
+                    yield text
+
+    return complete
+
+def _content_sha256(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def _written_chapter(session: Dict, checkpoint: Optional[Dict], message: str) -> Optional[Dict]:
+    """The chapter event of a chapter which was written for `message`, from the history."""
+    if not checkpoint or checkpoint.get("request") != message:
+        return None
+    if checkpoint.get("content"):
+        # Written before checkpoints were replaced by references to the history
+        outline = checkpoint.get("outline") or {}
+        return {"type": "chapter", "title": outline.get("title"), "content": checkpoint["content"]}
+    if "content_sha256" not in checkpoint:
+        return None
+    for msg in reversed(session["messages"]):
+        if msg["role"] == "assistant" and _content_sha256(msg["content"]) == checkpoint["content_sha256"]:
+            return {"type": "chapter", "title": checkpoint.get("title"), "content": msg["content"]}
+    return None
+
+async def _add_chapter_messages(session_id: str, chapter_id: str, request: NovelChapterRequest, event: Dict, model_info: Dict) -> None:
+    """Add the request of a chapter and the chapter to the session history.
+
+    The checkpoint of the chapter is replaced by a reference to it, so that the session
+    (which is written whole on each change) doesn't hold the chapter twice.
+    """
+    async with NOVEL_SESSIONS.edit(session_id, _session_factory(session_id)) as session:
+        session.setdefault("chapters", {})[chapter_id] = {
+            "request": request.message,
+            "title": event["title"],
+            "content_sha256": _content_sha256(event["content"])
+        }
+        session["messages"].append({
+            "role": "user",
+            "content": request.message,
+            "template": None,
+            "timestamp": datetime.now().isoformat(),
+            "original_prompt": None
+        })
+        session["messages"].append({
+            "role": "assistant",
+            "content": event["content"],
+            "model": model_info["model"],
+            "template": None,
+            "timestamp": datetime.now().isoformat()
+        })
+        session["total_interactions"] += 1
+
 @router.get("/templates")
 async def get_novel_templates():
     """Get available novel writing templates."""
@@ -311,9 +555,9 @@ async def get_template_questions(template: str):
 async def list_novel_sessions():
     """List all novel writing sessions."""
     sessions = []
-    for session_id, session_data in NOVEL_SESSIONS.items():
+    for session_data in await NOVEL_SESSIONS.list_sessions():
         sessions.append({
-            "id": session_id,
+            "id": session_data["id"],
             "created_at": session_data["created_at"],
             "total_interactions": session_data["total_interactions"],
             "templates_used": list(set(session_data.get("template_history", []))),
@@ -330,22 +574,21 @@ async def list_novel_sessions():
 @router.get("/sessions/{session_id}")
 async def get_novel_session(session_id: str):
     """Get specific novel writing session."""
-    if session_id not in NOVEL_SESSIONS:
+    session = await NOVEL_SESSIONS.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
     return JSONResponse({
         "status": "success",
-        "session": NOVEL_SESSIONS[session_id]
+        "session": session
     })
 
 @router.delete("/sessions/{session_id}")
 async def delete_novel_session(session_id: str):
     """Delete specific novel writing session."""
-    if session_id not in NOVEL_SESSIONS:
+    if not await NOVEL_SESSIONS.delete(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    del NOVEL_SESSIONS[session_id]
-    
     return JSONResponse({
         "status": "success",
         "message": f"Deleted novel session {session_id}",
@@ -12,10 +12,14 @@ from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+from openhands.server.chat_session_store import ChatSessionStore, is_valid_session_id
+from openhands.server.shared import file_store
+from openhands.utils.async_utils import call_sync_from_async
+
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-# In-memory storage for conversations
-CHAT_CONVERSATIONS: Dict[str, Dict] = {}
+# Chat conversations, the most recent in memory and all in the file store
+CHAT_CONVERSATIONS = ChatSessionStore("openrouter-chat", file_store)
 
 class ChatRequest(BaseModel):
     message: str
@@ -79,127 +83,20 @@ async def send_chat_message(request: ChatRequest):
         
         # Get or create conversation
         conversation_id = request.conversation_id or str(uuid.uuid4())
+        if not is_valid_session_id(conversation_id):
+            raise HTTPException(status_code=400, detail="Invalid conversation ID")
         
-        if conversation_id not in CHAT_CONVERSATIONS:
-            CHAT_CONVERSATIONS[conversation_id] = {
-                "id": conversation_id,
-                "created_at": datetime.now().isoformat(),
-                "messages": [],
-                "model": request.model,
-                "total_tokens": 0
-            }
-        
-        # Add user message to conversation
-        user_message = {
-            "role": "user",
-            "content": request.message,
-            "timestamp": datetime.now().isoformat()
-        }
-        CHAT_CONVERSATIONS[conversation_id]["messages"].append(user_message)
-        
-        # Prepare messages for OpenRouter (last 10 messages to avoid token limit)
-        conversation_messages = CHAT_CONVERSATIONS[conversation_id]["messages"][-10:]
-        openrouter_messages = [
-            {"role": msg["role"], "content": msg["content"]} 
-            for msg in conversation_messages
-        ]
-        
-        # Add system message for better responses
-        system_message = {
-            "role": "system",
-            "content": "You are a helpful AI assistant. Provide clear, concise, and helpful responses."
-        }
-        openrouter_messages.insert(0, system_message)
-        
-        # Prepare OpenRouter API request
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://huggingface.co/spaces/Minatoz997/Backend66",
-            "X-Title": "OpenHands Backend Chat"
-        }
-        
-        payload = {
+        async with CHAT_CONVERSATIONS.edit(conversation_id, lambda: {
+            "id": conversation_id,
+            "created_at": datetime.now().isoformat(),
+            "messages": [],
             "model": request.model,
-            "messages": openrouter_messages,
-            "max_tokens": request.max_tokens,
-            "temperature": request.temperature,
-            "stream": False  # For now, disable streaming
-        }
-        
-        # Make request to OpenRouter
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            assistant_message_content = data["choices"][0]["message"]["content"]
-            
-            # Add assistant response to conversation
-            assistant_message = {
-                "role": "assistant",
-                "content": assistant_message_content,
-                "timestamp": datetime.now().isoformat(),
-                "model": request.model
-            }
-            CHAT_CONVERSATIONS[conversation_id]["messages"].append(assistant_message)
-            
-            # Update token usage
-            usage = data.get("usage", {})
-            CHAT_CONVERSATIONS[conversation_id]["total_tokens"] += usage.get("total_tokens", 0)
-            
-            return JSONResponse({
-                "conversation_id": conversation_id,
-                "response": assistant_message_content,
-                "model": request.model,
-                "timestamp": datetime.now().isoformat(),
-                "usage": usage,
-                "status": "success",
-                "message_count": len(CHAT_CONVERSATIONS[conversation_id]["messages"]),
-                "total_tokens": CHAT_CONVERSATIONS[conversation_id]["total_tokens"]
-            })
-        
-        elif response.status_code == 401:
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "status": "error",
-                    "message": "Invalid OpenRouter API key",
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
-        
-        elif response.status_code == 429:
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "status": "error",
-                    "message": "Rate limit exceeded. Please try again later.",
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
-        
-        else:
-            error_data = response.text
-            try:
-                error_json = response.json()
-                error_message = error_json.get("error", {}).get("message", error_data)
-            except:
-                error_message = error_data
-            
-            return JSONResponse(
-                status_code=response.status_code,
-                content={
-                    "status": "error",
-                    "message": f"OpenRouter API error: {error_message}",
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
+            "total_tokens": 0
+        }) as conversation:
+            return await _send_chat_message(request, api_key, conversation_id, conversation)
             
+    except HTTPException:
+        raise
     except requests.exceptions.Timeout:
         return JSONResponse(
             status_code=408,
@@ -219,13 +116,127 @@ async def send_chat_message(request: ChatRequest):
             }
         )
 
+async def _send_chat_message(request: ChatRequest, api_key: str, conversation_id: str, conversation: Dict) -> JSONResponse:
+    """Send a message of a conversation to OpenRouter, adding the messages to the conversation."""
+    # Add user message to conversation
+    user_message = {
+        "role": "user",
+        "content": request.message,
+        "timestamp": datetime.now().isoformat()
+    }
+    conversation["messages"].append(user_message)
+    
+    # Prepare messages for OpenRouter (last 10 messages to avoid token limit)
+    conversation_messages = conversation["messages"][-10:]
+    openrouter_messages = [
+        {"role": msg["role"], "content": msg["content"]} 
+        for msg in conversation_messages
+    ]
+    
+    # Add system message for better responses
+    system_message = {
+        "role": "system",
+        "content": "You are a helpful AI assistant. Provide clear, concise, and helpful responses."
+    }
+    openrouter_messages.insert(0, system_message)
+    
+    # Prepare OpenRouter API request
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://huggingface.co/spaces/Minatoz997/Backend66",
+        "X-Title": "OpenHands Backend Chat"
+    }
+    
+    payload = {
+        "model": request.model,
+        "messages": openrouter_messages,
+        "max_tokens": request.max_tokens,
+        "temperature": request.temperature,
+        "stream": False  # For now, disable streaming
+    }
+    
+    # Make request to OpenRouter
+    response = await call_sync_from_async(
+        requests.post,
+        "https://openrouter.ai/api/v1/chat/completions",
+        headers=headers,
+        json=payload,
+        timeout=60
+    )
+    
+    if response.status_code == 200:
+        data = response.json()
+        assistant_message_content = data["choices"][0]["message"]["content"]
+        
+        # Add assistant response to conversation
+        assistant_message = {
+            "role": "assistant",
+            "content": assistant_message_content,
+            "timestamp": datetime.now().isoformat(),
+            "model": request.model
+        }
+        conversation["messages"].append(assistant_message)
+        
+        # Update token usage
+        usage = data.get("usage", {})
+        conversation["total_tokens"] += usage.get("total_tokens", 0)
+        
+        return JSONResponse({
+            "conversation_id": conversation_id,
+            "response": assistant_message_content,
+            "model": request.model,
+            "timestamp": datetime.now().isoformat(),
+            "usage": usage,
+            "status": "success",
+            "message_count": len(conversation["messages"]),
+            "total_tokens": conversation["total_tokens"]
+        })
+    
+    elif response.status_code == 401:
+        return JSONResponse(
+            status_code=401,
+            content={
+                "status": "error",
+                "message": "Invalid OpenRouter API key",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    
+    elif response.status_code == 429:
+        return JSONResponse(
+            status_code=429,
+            content={
+                "status": "error",
+                "message": "Rate limit exceeded. Please try again later.",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    
+    else:
+        error_data = response.text
+        try:
+            error_json = response.json()
+            error_message = error_json.get("error", {}).get("message", error_data)
+        except:
+            error_message = error_data
+        
+        return JSONResponse(
+            status_code=response.status_code,
+            content={
+                "status": "error",
+                "message": f"OpenRouter API error: {error_message}",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
 @router.get("/conversations")
 async def list_chat_conversations():
     """List all chat conversations."""
     conversations = []
-    for conv_id, conv_data in CHAT_CONVERSATIONS.items():
+    for conv_data in await CHAT_CONVERSATIONS.list_sessions():
         conversations.append({
-            "id": conv_id,
+            "id": conv_data["id"],
             "created_at": conv_data["created_at"],
             "message_count": len(conv_data["messages"]),
             "model": conv_data.get("model", "unknown"),
@@ -242,22 +253,21 @@ async def list_chat_conversations():
 @router.get("/conversations/{conversation_id}")
 async def get_chat_conversation(conversation_id: str):
     """Get a specific chat conversation."""
-    if conversation_id not in CHAT_CONVERSATIONS:
+    conversation = await CHAT_CONVERSATIONS.get(conversation_id)
+    if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     return JSONResponse({
         "status": "success",
-        "conversation": CHAT_CONVERSATIONS[conversation_id]
+        "conversation": conversation
     })
 
 @router.delete("/conversations/{conversation_id}")
 async def delete_chat_conversation(conversation_id: str):
     """Delete a specific chat conversation."""
-    if conversation_id not in CHAT_CONVERSATIONS:
+    if not await CHAT_CONVERSATIONS.delete(conversation_id):
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    del CHAT_CONVERSATIONS[conversation_id]
-    
     return JSONResponse({
         "status": "success",
         "message": f"Deleted conversation {conversation_id}",
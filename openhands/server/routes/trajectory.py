@@ -1,45 +1,138 @@
-from fastapi import APIRouter, Depends, Request, status
-from fastapi.responses import JSONResponse
+import json
+import zlib
+from typing import AsyncIterable, AsyncIterator, Literal
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from openhands.core.logger import openhands_logger as logger
 from openhands.events.async_event_store_wrapper import AsyncEventStoreWrapper
+from openhands.events.event import Event
 from openhands.events.serialization import event_to_trajectory
+from openhands.events.serialization.utils import remove_fields
 from openhands.server.dependencies import get_dependencies
 from openhands.server.utils import get_conversation
 from openhands.server.session.conversation import ServerConversation
 
 app = APIRouter(prefix='/api/conversations/{conversation_id}', dependencies=get_dependencies())
 
+# Events are serialized (and compressed) a page at a time
+TRAJECTORY_PAGE_SIZE = 100
+
 
 @app.get('/trajectory')
-async def get_trajectory(conversation: ServerConversation = Depends(get_conversation)) -> JSONResponse:
+async def get_trajectory(
+    request: Request,
+    conversation: ServerConversation = Depends(get_conversation),
+    format: Literal['json', 'ndjson'] = 'json',
+    start_id: int = Query(0, ge=0),
+    end_id: int | None = Query(None, ge=0),
+    limit: int | None = Query(None, ge=1),
+    include_screenshots: bool = False,
+    fields: str | None = None,
+    exclude: str | None = None,
+) -> StreamingResponse:
     """Get trajectory.
 
-    This function retrieves the current trajectory and returns it.
+    The trajectory is streamed as it is read from the event store, so that the first
+    events are sent right away and memory use doesn't grow with the trajectory. It is
+    compressed on the fly if the client accepts gzip.
 
     Args:
         request (Request): The incoming request object.
+        format: 'json' for `{"trajectory": [...]}`, or 'ndjson' for one event per line.
+        start_id: The ID of the first event to export.
+        end_id: The ID of the last event to export.
+        limit: The maximum number of events to export.
+        include_screenshots: Whether to keep the screenshots of browser observations.
+        fields: Comma separated top-level fields of the events to keep (e.g. `id,source,message`).
+        exclude: Comma separated fields to remove from the events, at any depth (e.g. `axtree_object`).
 
     Returns:
-        JSONResponse: A JSON response containing the trajectory as a list of
-        events.
+        StreamingResponse: The events of the trajectory. If reading them fails midway,
+        an `error` is added after the events that were sent.
     """
+    async_store = AsyncEventStoreWrapper(
+        conversation.event_stream,
+        start_id=start_id,
+        end_id=end_id,
+        filter_hidden=True,
+        page_size=TRAJECTORY_PAGE_SIZE,
+    )
+    chunks = _trajectory_chunks(
+        async_store,
+        format,
+        limit,
+        include_screenshots,
+        _split_fields(fields),
+        _split_fields(exclude),
+    )
+    headers = {}
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        chunks = _gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    media_type = 'application/x-ndjson' if format == 'ndjson' else 'application/json'
+    return StreamingResponse(
+        chunks, status_code=status.HTTP_200_OK, media_type=media_type, headers=headers
+    )
+
+
+def _split_fields(value: str | None) -> set[str] | None:
+    if not value:
+        return None
+    return {field.strip() for field in value.split(',') if field.strip()}
+
+
+async def _trajectory_chunks(
+    events: AsyncIterable[Event],
+    format: Literal['json', 'ndjson'],
+    limit: int | None,
+    include_screenshots: bool,
+    fields: set[str] | None,
+    exclude: set[str] | None,
+) -> AsyncIterator[str]:
+    """Serialize the events of a trajectory, a page at a time."""
+    ndjson = format == 'ndjson'
+    page: list[str] = []
+    count = 0
+    if not ndjson:
+        yield '{"trajectory": ['
     try:
-        async_store = AsyncEventStoreWrapper(
-            conversation.event_stream, filter_hidden=True
-        )
-        trajectory = []
-        async for event in async_store:
-            trajectory.append(event_to_trajectory(event))
-        return JSONResponse(
-            status_code=status.HTTP_200_OK, content={'trajectory': trajectory}
-        )
+        async for event in events:
+            if limit is not None and count >= limit:
+                break
+            data = event_to_trajectory(event, include_screenshots)
+            if fields is not None:
+                data = {key: value for key, value in data.items() if key in fields}
+            if exclude is not None:
+                remove_fields(data, exclude)
+            serialized = json.dumps(data)
+            if ndjson:
+                page.append(serialized + '\n')
+            else:
+                page.append(serialized if count == 0 else ', ' + serialized)
+            count += 1
+            if len(page) >= TRAJECTORY_PAGE_SIZE:
+                yield ''.join(page)
+                page = []
+        if page:
+            yield ''.join(page)
+        if not ndjson:
+            yield ']}'
     except Exception as e:
+        # The status was already sent: report the error after the events sent so far
         logger.error(f'Error getting trajectory: {e}', exc_info=True)
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                'trajectory': None,
-                'error': f'Error getting trajectory: {e}',
-            },
-        )
+        if page:
+            yield ''.join(page)
+        error = json.dumps(f'Error getting trajectory: {e}')
+        yield f'{{"error": {error}}}\n' if ndjson else f'], "error": {error}}}'
+
+
+async def _gzip_chunks(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk.encode())
+        # Flushed for each chunk, so that clients get events as they are read
+        compressed += compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressed
+    yield compressor.flush()
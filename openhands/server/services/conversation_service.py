@@ -17,6 +17,7 @@ from openhands.server.shared import (
     SettingsStoreImpl,
     config,
     conversation_manager,
+    monitoring_listener,
 )
 from openhands.server.types import LLMAuthenticationError, MissingSettingsError
 from openhands.storage.data_models.conversation_metadata import (
@@ -49,6 +50,7 @@ async def create_new_conversation(
             'trigger': conversation_trigger.value,
         },
     )
+    monitoring_listener.on_create_conversation()
     logger.info('Loading settings')
     settings_store = await SettingsStoreImpl.get_instance(config, user_id)
     settings = await settings_store.load()
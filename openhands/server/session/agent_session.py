@@ -28,6 +28,7 @@ from openhands.runtime import get_runtime_cls
 from openhands.runtime.base import Runtime
 from openhands.runtime.impl.remote.remote_runtime import RemoteRuntime
 from openhands.security import SecurityAnalyzer, options
+from openhands.server.monitoring import MonitoringListener
 from openhands.storage.data_models.user_secrets import UserSecrets
 from openhands.storage.files import FileStore
 from openhands.utils.async_utils import EXECUTOR, call_sync_from_async
@@ -64,12 +65,14 @@ class AgentSession:
         file_store: FileStore,
         status_callback: Callable | None = None,
         user_id: str | None = None,
+        monitoring_listener: MonitoringListener | None = None,
     ) -> None:
         """Initializes a new instance of the Session class
 
         Parameters:
         - sid: The session ID
         - file_store: Instance of the FileStore
+        - monitoring_listener: Listener for the session's activity
         """
 
         self.sid = sid
@@ -77,6 +80,7 @@ class AgentSession:
         self.file_store = file_store
         self._status_callback = status_callback
         self.user_id = user_id
+        self.monitoring_listener = monitoring_listener or MonitoringListener()
         self.logger = OpenHandsLoggerAdapter(
             extra={'session_id': sid, 'user_id': user_id}
         )
@@ -198,6 +202,7 @@ class AgentSession:
             self._starting = False
             success = finished and runtime_connected
             duration = (time.time() - started_at)
+            self.monitoring_listener.on_agent_session_start(success, duration)
 
             log_metadata = {
                 'signal': 'agent_session_start',
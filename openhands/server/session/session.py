@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import os
 import time
 from copy import deepcopy
 from logging import LoggerAdapter
@@ -11,6 +13,7 @@ from openhands.core.config.condenser_config import (
     BrowserOutputCondenserConfig,
     CondenserPipelineConfig,
     LLMSummarizingCondenserConfig,
+    StoryBibleCondenserConfig,
 )
 from openhands.core.config.mcp_config import MCPConfig, OpenHandsMCPConfigImpl
 from openhands.core.exceptions import MicroagentValidationError
@@ -28,12 +31,18 @@ from openhands.events.observation.error import ErrorObservation
 from openhands.events.serialization import event_from_dict, event_to_dict
 from openhands.events.stream import EventStreamSubscriber
 from openhands.llm.llm import LLM
+from openhands.llm.streaming_llm import StreamingLLM
+from openhands.memory.condenser.impl.story_bible_condenser import StoryBibleCondenser
+from openhands.server.chat_session_store import get_chat_session_store
+from openhands.server.monitoring import MonitoringListener
 from openhands.server.session.agent_session import AgentSession
 from openhands.server.session.conversation_init_data import ConversationInitData
 from openhands.storage.data_models.settings import Settings
 from openhands.storage.files import FileStore
+from openhands.core.novel_chapter_pipeline import ChapterPipeline, is_chapter_request
 from openhands.core.novel_writing_prompts import create_novel_writing_prompt
 from openhands.core.novel_writing_config import (
+    NovelWritingConfig,
     create_novel_writing_llm_config, 
     should_use_premium_model,
     get_novel_writing_model_info
@@ -61,6 +70,7 @@ class Session:
         file_store: FileStore,
         sio: socketio.AsyncServer | None,
         user_id: str | None = None,
+        monitoring_listener: MonitoringListener | None = None,
     ):
         self.sid = sid
         self.sio = sio
@@ -72,7 +82,9 @@ class Session:
             file_store,
             status_callback=self.queue_status_message,
             user_id=user_id,
+            monitoring_listener=monitoring_listener,
         )
+        self.monitoring_listener = self.agent_session.monitoring_listener
         self.agent_session.event_stream.subscribe(
             EventStreamSubscriber.SERVER, self.on_event, self.sid
         )
@@ -246,6 +258,7 @@ class Session:
         )
 
     def on_event(self, event: Event) -> None:
+        self.monitoring_listener.on_session_event(event)
         asyncio.get_event_loop().run_until_complete(self._on_event(event))
 
     async def _on_event(self, event: Event) -> None:
@@ -290,6 +303,9 @@ class Session:
         event = event_from_dict(data.copy())
         
         # Handle Novel Writing Mode
+        if isinstance(event, MessageAction) and is_chapter_request(event):
+            await self._handle_novel_chapter(event)
+            return
         if isinstance(event, MessageAction) and event.novel_mode:
             await self._handle_novel_writing_mode(event)
             return
@@ -355,6 +371,75 @@ class Session:
             self._send_status_message(msg_type, id, message), self.loop
         )
 
+    async def _handle_novel_chapter(self, event: MessageAction) -> None:
+        """Write a whole chapter in Novel Writing Mode, streaming it to the client.
+
+        The stages of the chapter are checkpointed under an ID derived from the
+        message, so sending the same message again after a failure resumes it. Once
+        the chapter is written, its checkpoint is deleted.
+        """
+        controller = self.agent_session.controller
+        if not controller:
+            await self.send_error(
+                'Agent controller tidak tersedia untuk Novel Writing Mode'
+            )
+            return
+        base_config = controller.agent.llm.config
+        novel_llm = StreamingLLM(
+            config=create_novel_writing_llm_config(
+                base_config,
+                is_premium=should_use_premium_model(
+                    event.template_used, len(event.content)
+                ),
+                api_key=base_config.api_key.get_secret_value()
+                if base_config.api_key
+                else None,
+            ),
+            retry_listener=self._notify_on_llm_retry,
+        )
+
+        async def complete(messages: list[dict[str, str]], max_tokens: int):
+            async for chunk in novel_llm.async_streaming_completion(
+                messages=messages, max_tokens=max_tokens
+            ):
+                text = chunk['choices'][0]['delta'].get('content')
+                if text:
+                    yield text
+
+        checkpoints = get_chat_session_store('novel-chapters', self.file_store)
+        chapter_id = hashlib.sha256(
+            f'{self.sid}\n{event.content}'.encode()
+        ).hexdigest()[:32]
+        stored = await checkpoints.get(chapter_id)
+
+        async def save_checkpoint(checkpoint: dict) -> None:
+            async with checkpoints.edit(chapter_id, dict) as saved:
+                saved.update(checkpoint)
+
+        # The request is recorded like other messages, but it is answered by the
+        # pipeline instead of the agent (see is_chapter_request)
+        self.agent_session.event_stream.add_event(event, EventSource.USER)
+
+        pipeline = ChapterPipeline(complete, save_checkpoint)
+        try:
+            async for chapter_event in pipeline.run(event.content, stored):
+                await self.send(
+                    {'novel_chapter': True, 'chapter_id': chapter_id, **chapter_event}
+                )
+                if chapter_event['type'] == 'chapter':
+                    self.agent_session.event_stream.add_event(
+                        MessageAction(content=chapter_event['content']),
+                        EventSource.AGENT,
+                    )
+                    # The chapter is in the event stream now: sending the same
+                    # message again writes a new one
+                    await checkpoints.delete(chapter_id)
+        except Exception as e:
+            self.logger.error(f'Error writing novel chapter: {e}', exc_info=True)
+            await self.send_error(
+                f'Penulisan bab gagal: {e}. Kirim pesan yang sama untuk melanjutkan.'
+            )
+
     async def _handle_novel_writing_mode(self, event: MessageAction) -> None:
         """Handle Novel Writing Mode with specialized configuration and prompts."""
         original_llm_config = None
@@ -423,6 +508,25 @@ class Session:
             original_llm = controller.agent.llm
             controller.agent.llm = novel_llm
 
+            # Beyond its most recent events, the novel is remembered as a story bible
+            # kept by a cheaper model, instead of a summary of the agent's work
+            if hasattr(controller.agent, 'condenser') and not isinstance(
+                controller.agent.condenser, StoryBibleCondenser
+            ):
+                controller.agent.condenser = StoryBibleCondenser.from_config(
+                    StoryBibleCondenserConfig(
+                        llm_config=novel_llm_config.model_copy(
+                            update={
+                                'model': os.getenv(
+                                    'NOVEL_STORY_BIBLE_MODEL',
+                                    NovelWritingConfig().story_bible_model,
+                                ),
+                                'temperature': 0.0,
+                            }
+                        )
+                    )
+                )
+
             # Create a system message with the novel writing prompt
             from openhands.events.action.message import SystemMessageAction
             system_message = SystemMessageAction(content=system_prompt)
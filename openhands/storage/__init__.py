@@ -1,7 +1,9 @@
 import os
+import threading
 
 import httpx
 
+from openhands.core.logger import openhands_logger as logger
 from openhands.storage.files import FileStore
 from openhands.storage.local import LocalFileStore
 from openhands.storage.memory import InMemoryFileStore
@@ -23,11 +25,98 @@ except ImportError:
     S3FileStore = None
 
 
+# The maximum number of connections of each client of a file store
+FILE_STORE_MAX_CONNECTIONS = int(os.getenv('FILE_STORE_MAX_CONNECTIONS', '50'))
+
+# Stores of these types are shared by all the callers with the same configuration.
+# Other (in-memory) stores hold the data of a single conversation, so each caller
+# gets its own, but their web hook clients are still shared.
+_SHARED_FILE_STORE_TYPES = ('local', 's3', 'google_cloud')
+
+_file_stores: dict[tuple, FileStore] = {}
+_file_stores_lock = threading.Lock()
+_web_hook_clients: dict[tuple | None, httpx.Client] = {}
+_web_hook_clients_lock = threading.Lock()
+
+
 def get_file_store(
     file_store_type: str,
     file_store_path: str | None = None,
     file_store_web_hook_url: str | None = None,
     file_store_web_hook_headers: dict | None = None,
+) -> FileStore:
+    """Get the file store of a configuration, shared with all other callers in the process.
+
+    Each store is created once, so that the clients of the cloud stores and web hooks
+    (and their connection pools) are reused across requests. In-memory stores are
+    created for each caller.
+    """
+    if file_store_type not in _SHARED_FILE_STORE_TYPES:
+        return _create_file_store(
+            file_store_type,
+            file_store_path,
+            file_store_web_hook_url,
+            file_store_web_hook_headers,
+        )
+    key = (
+        file_store_type,
+        file_store_path,
+        file_store_web_hook_url,
+        _headers_key(file_store_web_hook_headers),
+    )
+    with _file_stores_lock:
+        store = _file_stores.get(key)
+        if store is None:
+            store = _file_stores[key] = _create_file_store(
+                file_store_type,
+                file_store_path,
+                file_store_web_hook_url,
+                file_store_web_hook_headers,
+            )
+        return store
+
+
+def close_file_stores() -> None:
+    """Close the clients of all the file stores, on shutdown."""
+    with _file_stores_lock:
+        stores = list(_file_stores.values())
+        _file_stores.clear()
+    with _web_hook_clients_lock:
+        clients = list(_web_hook_clients.values())
+        _web_hook_clients.clear()
+    for store in stores:
+        try:
+            store.close()
+        except Exception as e:
+            logger.warning(f'Error closing file store {type(store).__name__}: {e}')
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f'Error closing file store web hook client: {e}')
+
+
+def _headers_key(headers: dict | None) -> tuple | None:
+    return tuple(sorted(headers.items())) if headers is not None else None
+
+
+def _get_web_hook_client(headers: dict) -> httpx.Client:
+    key = _headers_key(headers)
+    with _web_hook_clients_lock:
+        client = _web_hook_clients.get(key)
+        if client is None or client.is_closed:
+            client = _web_hook_clients[key] = httpx.Client(
+                headers=headers,
+                limits=httpx.Limits(max_connections=FILE_STORE_MAX_CONNECTIONS),
+            )
+        return client
+
+
+def _create_file_store(
+    file_store_type: str,
+    file_store_path: str | None = None,
+    file_store_web_hook_url: str | None = None,
+    file_store_web_hook_headers: dict | None = None,
 ) -> FileStore:
     store: FileStore
     if file_store_type == 'local':
@@ -37,7 +126,7 @@ def get_file_store(
     elif file_store_type == 's3':
         if not S3_AVAILABLE or S3FileStore is None:
             raise ImportError('S3 storage not available. Install boto3 to use S3 storage.')
-        store = S3FileStore(file_store_path)
+        store = S3FileStore(file_store_path, FILE_STORE_MAX_CONNECTIONS)
     elif file_store_type == 'google_cloud':
         if not GOOGLE_CLOUD_AVAILABLE or GoogleCloudFileStore is None:
             raise ImportError('Google Cloud storage not available. Install google-cloud-storage to use Google Cloud storage.')
@@ -55,6 +144,6 @@ def get_file_store(
         store = WebHookFileStore(
             store,
             file_store_web_hook_url,
-            httpx.Client(headers=file_store_web_hook_headers or {}),
+            _get_web_hook_client(file_store_web_hook_headers),
         )
     return store
@@ -17,3 +17,6 @@ class FileStore:
     @abstractmethod
     def delete(self, path: str) -> None:
         pass
+
+    def close(self) -> None:
+        """Release the clients and connections of the store."""
@@ -78,3 +78,7 @@ class GoogleCloudFileStore(FileStore):
             return []
         blobs = self.client.list_blobs(self.bucket, prefix=path)
         return [blob.name for blob in blobs]
+
+    def close(self) -> None:
+        if GOOGLE_CLOUD_AVAILABLE:
+            self.client.close()
@@ -3,6 +3,7 @@ from typing import Any, TypedDict
 
 import boto3
 import botocore
+import botocore.config
 
 from openhands.storage.files import FileStore
 
@@ -20,7 +21,9 @@ class ListObjectsV2OutputDict(TypedDict):
 
 
 class S3FileStore(FileStore):
-    def __init__(self, bucket_name: str | None) -> None:
+    def __init__(
+        self, bucket_name: str | None, max_pool_connections: int | None = None
+    ) -> None:
         access_key = os.getenv('AWS_ACCESS_KEY_ID')
         secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
         secure = os.getenv('AWS_S3_SECURE', 'true').lower() == 'true'
@@ -34,6 +37,9 @@ class S3FileStore(FileStore):
             aws_secret_access_key=secret_key,
             endpoint_url=endpoint,
             use_ssl=secure,
+            config=botocore.config.Config(max_pool_connections=max_pool_connections)
+            if max_pool_connections
+            else None,
         )
 
     def write(self, path: str, contents: str | bytes) -> None:
@@ -153,6 +159,9 @@ class S3FileStore(FileStore):
                 f"Error: Failed to delete key '{path}' from bucket '{self.bucket}: {e}"
             )
 
+    def close(self) -> None:
+        self.client.close()
+
     def _ensure_url_scheme(self, secure: bool, url: str | None) -> str | None:
         if not url:
             return None
@@ -8,6 +8,7 @@ from openhands.storage import get_file_store
 from openhands.storage.data_models.user_secrets import UserSecrets
 from openhands.storage.files import FileStore
 from openhands.storage.secrets.secrets_store import SecretsStore
+from openhands.storage.user_data_cache import user_data_cache
 from openhands.utils.async_utils import call_sync_from_async
 
 
@@ -17,6 +18,9 @@ class FileSecretsStore(SecretsStore):
     path: str = 'secrets.json'
 
     async def load(self) -> UserSecrets | None:
+        return await user_data_cache.load(self.file_store, self.path, self._load)
+
+    async def _load(self) -> UserSecrets | None:
         try:
             json_str = await call_sync_from_async(self.file_store.read, self.path)
             kwargs = json.loads(json_str)
@@ -34,6 +38,7 @@ class FileSecretsStore(SecretsStore):
     async def store(self, secrets: UserSecrets) -> None:
         json_str = secrets.model_dump_json(context={'expose_secrets': True})
         await call_sync_from_async(self.file_store.write, self.path, json_str)
+        await user_data_cache.invalidate(self.file_store, self.path)
 
     @classmethod
     async def get_instance(
@@ -43,6 +48,6 @@ class FileSecretsStore(SecretsStore):
             config.file_store,
             config.file_store_path,
             config.file_store_web_hook_url,
-            config.file_store_web_hook_headers
+            config.file_store_web_hook_headers,
         )
         return FileSecretsStore(file_store)
@@ -8,6 +8,7 @@ from openhands.storage import get_file_store
 from openhands.storage.data_models.settings import Settings
 from openhands.storage.files import FileStore
 from openhands.storage.settings.settings_store import SettingsStore
+from openhands.storage.user_data_cache import user_data_cache
 from openhands.utils.async_utils import call_sync_from_async
 
 
@@ -17,6 +18,11 @@ class FileSettingsStore(SettingsStore):
     path: str = 'settings.json'
 
     async def load(self) -> Settings | None:
+        settings = await user_data_cache.load(self.file_store, self.path, self._load)
+        # Settings are mutable: callers get their own copy of the cached settings
+        return settings.model_copy() if settings else None
+
+    async def _load(self) -> Settings | None:
         try:
             json_str = await call_sync_from_async(self.file_store.read, self.path)
             kwargs = json.loads(json_str)
@@ -28,6 +34,7 @@ class FileSettingsStore(SettingsStore):
     async def store(self, settings: Settings) -> None:
         json_str = settings.model_dump_json(context={'expose_secrets': True})
         await call_sync_from_async(self.file_store.write, self.path, json_str)
+        await user_data_cache.invalidate(self.file_store, self.path)
 
     @classmethod
     async def get_instance(
@@ -37,6 +44,6 @@ class FileSettingsStore(SettingsStore):
             config.file_store,
             config.file_store_path,
             config.file_store_web_hook_url,
-            config.file_store_web_hook_headers
+            config.file_store_web_hook_headers,
         )
         return FileSettingsStore(file_store)
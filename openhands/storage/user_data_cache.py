@@ -0,0 +1,141 @@
+"""An in-process cache of the settings and secrets loaded from file stores.
+
+Settings and secrets are loaded on most authenticated requests, and loading them means
+reading a JSON file from the file store (a network round trip for cloud stores) and
+parsing it into pydantic models. The file settings and secrets stores keep what they
+load for USER_DATA_CACHE_TTL seconds, and invalidate it when they store a new version.
+
+Other server workers sharing the file store see a change once their entry expires. With
+USER_DATA_CACHE_VERSION_CHECK=true they see it immediately: each store also writes a
+version stamp next to the file, which is read (instead of the whole file) on each hit.
+"""
+
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, TypeVar
+
+from openhands.storage.files import FileStore
+from openhands.utils.async_utils import call_sync_from_async
+
+USER_DATA_CACHE_TTL = float(os.getenv('USER_DATA_CACHE_TTL', '30'))
+USER_DATA_CACHE_MAX_SIZE = int(os.getenv('USER_DATA_CACHE_MAX_SIZE', '1000'))
+USER_DATA_CACHE_VERSION_CHECK = (
+    os.getenv('USER_DATA_CACHE_VERSION_CHECK', 'false').lower() == 'true'
+)
+
+T = TypeVar('T')
+
+
+@dataclass
+class _Entry:
+    file_store: weakref.ReferenceType[FileStore]
+    value: Any
+    expires_at: float
+    version: str | None
+
+
+@dataclass
+class _Loads:
+    """The loads of a file in progress, and the number of times it was invalidated since."""
+
+    generation: int = 0
+    count: int = 0
+
+
+@dataclass
+class UserDataCache:
+    """A bounded, least recently used cache of the values loaded from files of stores."""
+
+    ttl: float = USER_DATA_CACHE_TTL
+    max_entries: int = USER_DATA_CACHE_MAX_SIZE
+    version_check: bool = USER_DATA_CACHE_VERSION_CHECK
+    _entries: OrderedDict[tuple[int, str], _Entry] = field(default_factory=OrderedDict)
+    # Only kept for the files being loaded, so that it doesn't grow with the cache
+    _loads: dict[tuple[int, str], _Loads] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    async def load(
+        self,
+        file_store: FileStore,
+        path: str,
+        loader: Callable[[], Awaitable[T | None]],
+    ) -> T | None:
+        """Get the value of a file, loading it with `loader` if it isn't cached."""
+        if self.ttl <= 0:
+            return await loader()
+        key = (id(file_store), path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.file_store() is not file_store
+                or entry.expires_at < time.monotonic()
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        version = None
+        if self.version_check:
+            version = await call_sync_from_async(self._read_version, file_store, path)
+        if entry is not None and (not self.version_check or entry.version == version):
+            return entry.value
+
+        # The version is read before the file: if the file changes in between, the
+        # entry holds the new value with the old version, and is loaded again next time
+        with self._lock:
+            loads = self._loads.setdefault(key, _Loads())
+            loads.count += 1
+            generation = loads.generation
+        try:
+            value = await loader()
+        finally:
+            with self._lock:
+                loads.count -= 1
+                if loads.count == 0:
+                    del self._loads[key]
+        with self._lock:
+            # The file was written while it was loaded: the value may be stale
+            if loads.generation != generation:
+                return value
+            self._entries[key] = _Entry(
+                weakref.ref(file_store), value, time.monotonic() + self.ttl, version
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    async def invalidate(self, file_store: FileStore, path: str) -> None:
+        """Forget the value of a file after it was written."""
+        key = (id(file_store), path)
+        with self._lock:
+            self._entries.pop(key, None)
+            loads = self._loads.get(key)
+            if loads is not None:
+                loads.generation += 1
+        if self.version_check:
+            await call_sync_from_async(
+                file_store.write, _version_path(path), uuid.uuid4().hex
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _read_version(self, file_store: FileStore, path: str) -> str | None:
+        try:
+            return file_store.read(_version_path(path))
+        except FileNotFoundError:
+            return None
+
+
+def _version_path(path: str) -> str:
+    return f'{path}.version'
+
+
+user_data_cache = UserDataCache()
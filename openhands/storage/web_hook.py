@@ -84,6 +84,13 @@ class WebHookFileStore(FileStore):
         self.file_store.delete(path)
         EXECUTOR.submit(self._on_delete, path)
 
+    def close(self) -> None:
+        """
+        Close the HTTP client and the underlying file store.
+        """
+        self.client.close()
+        self.file_store.close()
+
     @tenacity.retry(
         wait=tenacity.wait_fixed(1),
         stop=tenacity.stop_after_attempt(3),
@@ -49,7 +49,8 @@ async def generate_conversation_title(
             },
         ]
 
-        response = llm.completion(messages=messages)
+        # The same first message gets the same title, with the response cache enabled
+        response = llm.completion(messages=messages, cacheable=True)
         title = response.choices[0].message.content.strip()
 
         # Ensure the title isn't too long
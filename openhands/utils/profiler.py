@@ -0,0 +1,360 @@
+"""Opt-in profiling of agent steps.
+
+With PROFILE_AGENT_STEPS=true, each step of the agent controller is recorded as a tree
+of timed spans: the agent's condensation, event processing, message formatting and LLM
+call, the events it adds (serialization, persistence and delivery to each subscriber),
+and the runtime running the resulting action. Spans made in other threads, such as the
+runtime handling an action, are attached to the step which added the event that caused
+them. Profiles are kept in memory for the most recent conversations, and can be exported
+as a Chrome trace (chrome://tracing, Perfetto) or as OpenTelemetry (OTLP) JSON.
+
+When profiling is disabled nothing is recorded, and `profile_span` returns a shared
+no-op context manager.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+if TYPE_CHECKING:
+    from openhands.events.stream import EventStream
+
+PROFILE_AGENT_STEPS = os.getenv('PROFILE_AGENT_STEPS', 'false').lower() == 'true'
+PROFILE_MAX_SPANS = int(os.getenv('PROFILE_MAX_SPANS', '20000'))
+PROFILE_MAX_CONVERSATIONS = int(os.getenv('PROFILE_MAX_CONVERSATIONS', '20'))
+
+_NO_SPAN = nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    parent_id: str | None
+    step: int | None
+    start_ns: int
+    end_ns: int = 0
+    thread_id: int = 0
+    thread_name: str = ''
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+@dataclass(frozen=True)
+class _SpanContext:
+    profile: 'ConversationProfile'
+    span_id: str
+    step: int | None
+
+
+_current_span: ContextVar[_SpanContext | None] = ContextVar(
+    'profiler_current_span', default=None
+)
+
+
+def _new_span_id() -> str:
+    return f'{random.getrandbits(64):016x}'
+
+
+class ConversationProfile:
+    """The spans recorded for the steps of one conversation (at most `max_spans`)."""
+
+    def __init__(self, sid: str, max_spans: int = PROFILE_MAX_SPANS):
+        self.sid = sid
+        self.trace_id = hashlib.sha256(sid.encode()).hexdigest()[:32]
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._event_spans: OrderedDict[int, _SpanContext] = OrderedDict()
+        self._max_event_spans = max_spans
+        self._steps = 0
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: _SpanContext | None = None,
+        step: int | None = None,
+        **attributes: Any,
+    ) -> Iterator[Span]:
+        """Record a span, nested in `parent` (by default the current span)."""
+        if parent is None:
+            parent = _current_span.get()
+            if parent is not None and parent.profile is not self:
+                parent = None
+        if step is None and parent is not None:
+            step = parent.step
+        thread = threading.current_thread()
+        span = Span(
+            name=name,
+            span_id=_new_span_id(),
+            parent_id=parent.span_id if parent else None,
+            step=step,
+            start_ns=time.time_ns(),
+            thread_id=thread.ident or 0,
+            thread_name=thread.name,
+            attributes=attributes,
+        )
+        token = _current_span.set(_SpanContext(self, span.span_id, step))
+        start = time.perf_counter_ns()
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes['error'] = type(e).__name__
+            raise
+        finally:
+            span.end_ns = span.start_ns + time.perf_counter_ns() - start
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    @contextmanager
+    def step(self, **attributes: Any) -> Iterator[Span]:
+        """Record a step of the agent, as a new root span."""
+        with self._lock:
+            step = self._steps
+            self._steps += 1
+        # Steps are often started by the delivery of an observation - they are new roots
+        token = _current_span.set(None)
+        try:
+            with self.span('agent_step', step=step, **attributes) as span:
+                yield span
+        finally:
+            _current_span.reset(token)
+
+    def link_event(self, event_id: int) -> None:
+        """Remember the current span as the cause of an event, for spans which handle it."""
+        context = _current_span.get()
+        if context is None or context.profile is not self:
+            return
+        with self._lock:
+            self._event_spans[event_id] = context
+            while len(self._event_spans) > self._max_event_spans:
+                self._event_spans.popitem(last=False)
+
+    def get_event_span(self, event_id: int) -> _SpanContext | None:
+        with self._lock:
+            return self._event_spans.get(event_id)
+
+    def get_spans(self) -> list[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span.start_ns)
+
+    def summary(self) -> dict[str, Any]:
+        """The time spent in each kind of span, in total and for each step."""
+        spans = self.get_spans()
+        steps: dict[int, dict[str, Any]] = {}
+        durations: dict[str, list[float]] = {}
+        for span in spans:
+            durations.setdefault(span.name, []).append(span.duration_ms)
+            if span.step is None:
+                continue
+            step = steps.setdefault(span.step, {'step': span.step, 'spans': {}})
+            if span.name == 'agent_step':
+                step['start'] = datetime.fromtimestamp(span.start_ns / 1e9).isoformat()
+                step['duration_ms'] = span.duration_ms
+                step.update(span.attributes)
+            else:
+                step['spans'][span.name] = (
+                    step['spans'].get(span.name, 0.0) + span.duration_ms
+                )
+        return {
+            'conversation_id': self.sid,
+            'spans': {
+                name: {
+                    'count': len(values),
+                    'total_ms': sum(values),
+                    'mean_ms': statistics.fmean(values),
+                    'p50_ms': statistics.median(values),
+                    'max_ms': max(values),
+                }
+                for name, values in durations.items()
+            },
+            'steps': [steps[step] for step in sorted(steps)],
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """The spans in the Chrome trace event format."""
+        pid = os.getpid()
+        events: list[dict[str, Any]] = []
+        threads: dict[int, str] = {}
+        for span in self.get_spans():
+            threads[span.thread_id] = span.thread_name
+            events.append(
+                {
+                    'name': span.name,
+                    'cat': 'openhands',
+                    'ph': 'X',
+                    'ts': span.start_ns / 1000,
+                    'dur': (span.end_ns - span.start_ns) / 1000,
+                    'pid': pid,
+                    'tid': span.thread_id,
+                    'args': {
+                        'step': span.step,
+                        'span_id': span.span_id,
+                        'parent_id': span.parent_id,
+                        **span.attributes,
+                    },
+                }
+            )
+        for thread_id, thread_name in threads.items():
+            events.append(
+                {
+                    'name': 'thread_name',
+                    'ph': 'M',
+                    'pid': pid,
+                    'tid': thread_id,
+                    'args': {'name': thread_name},
+                }
+            )
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'conversation_id': self.sid},
+        }
+
+    def to_otlp(self) -> dict[str, Any]:
+        """The spans in the OpenTelemetry protocol (OTLP) JSON format."""
+        spans = []
+        for span in self.get_spans():
+            attributes = {'step': span.step, 'thread.name': span.thread_name}
+            attributes.update(span.attributes)
+            otlp_span: dict[str, Any] = {
+                'traceId': self.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(span.start_ns),
+                'endTimeUnixNano': str(span.end_ns),
+                'attributes': [
+                    _otlp_attribute(key, value)
+                    for key, value in attributes.items()
+                    if value is not None
+                ],
+            }
+            if span.parent_id:
+                otlp_span['parentSpanId'] = span.parent_id
+            if 'error' in span.attributes:
+                otlp_span['status'] = {'code': 2, 'message': span.attributes['error']}
+            spans.append(otlp_span)
+        return {
+            'resourceSpans': [
+                {
+                    'resource': {
+                        'attributes': [
+                            _otlp_attribute('service.name', 'openhands'),
+                            _otlp_attribute('conversation.id', self.sid),
+                        ]
+                    },
+                    'scopeSpans': [
+                        {'scope': {'name': 'openhands.profiler'}, 'spans': spans}
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+_profiles: OrderedDict[str, ConversationProfile] = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def get_profile(sid: str, create: bool = False) -> ConversationProfile | None:
+    """Get the profile of a conversation, keeping those of the most recent ones."""
+    with _profiles_lock:
+        profile = _profiles.get(sid)
+        if profile is not None:
+            _profiles.move_to_end(sid)
+        elif create:
+            profile = _profiles[sid] = ConversationProfile(sid)
+            while len(_profiles) > PROFILE_MAX_CONVERSATIONS:
+                _profiles.popitem(last=False)
+        return profile
+
+
+def profile_step(
+    event_stream: 'EventStream', **attributes: Any
+) -> AbstractContextManager:
+    """Record a step of an agent on an event stream, if profiling is enabled."""
+    if not PROFILE_AGENT_STEPS:
+        return _NO_SPAN
+    profile = get_profile(event_stream.sid, create=True)
+    assert profile is not None
+    return profile.step(**attributes)
+
+
+def profile_span(name: str, **attributes: Any) -> AbstractContextManager:
+    """Record a span in the current step, if there is one."""
+    context = _current_span.get()
+    if context is None:
+        return _NO_SPAN
+    return context.profile.span(name, **attributes)
+
+
+def profile_link_event(event_id: int) -> None:
+    """Remember the current span (if any) as the cause of an event."""
+    context = _current_span.get()
+    if context is not None:
+        context.profile.link_event(event_id)
+
+
+def profile_callback(
+    sid: str, name: str, callback: Callable[[Any], Any]
+) -> Callable[[Any], Any]:
+    """Wrap an event stream callback, to record the delivery of events caused by a step.
+
+    The callback is returned as it is if profiling is disabled.
+    """
+    if not PROFILE_AGENT_STEPS:
+        return callback
+
+    def delivery_span(event: Any) -> AbstractContextManager:
+        profile = get_profile(sid)
+        parent = profile.get_event_span(event.id) if profile else None
+        if profile is None or parent is None:
+            return _NO_SPAN
+        return profile.span(
+            'deliver_event',
+            parent=parent,
+            subscriber=name,
+            event_id=event.id,
+            event_type=type(event).__name__,
+        )
+
+    if asyncio.iscoroutinefunction(callback):
+
+        @wraps(callback)
+        async def profiled_async_callback(event: Any) -> Any:
+            with delivery_span(event):
+                return await callback(event)
+
+        return profiled_async_callback
+
+    @wraps(callback)
+    def profiled_callback(event: Any) -> Any:
+        with delivery_span(event):
+            return callback(event)
+
+    return profiled_callback
@@ -0,0 +1,258 @@
+"""In-process metrics, exposed in the Prometheus text format.
+
+Counters, gauges and histograms are aggregated without locks, so that recording stays
+cheap on hot paths (event writes, agent steps, LLM calls...). Each thread records into
+its own shard of a metric, keyed by the thread ID, so no two threads ever update the same
+value, and shards are only summed when the metrics are rendered. Metrics register
+themselves in `REGISTRY` by default, which `/metrics` renders.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+TOKEN_BUCKETS = (100, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, 200000)
+
+_get_ident = threading.get_ident
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class _CounterChild:
+    __slots__ = ('_shards',)
+
+    def __init__(self) -> None:
+        self._shards: dict[int, list[float]] = {}
+
+    def inc(self, amount: float = 1) -> None:
+        shard = self._shards.get(_get_ident())
+        if shard is None:
+            shard = self._shards.setdefault(_get_ident(), [0])
+        shard[0] += amount
+
+    def get(self) -> float:
+        return sum(shard[0] for shard in list(self._shards.values()))
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ('_value', '_function')
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._value: float = 0
+        self._function: Callable[[], float] | None = None
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        """Set the value of the gauge, for gauges with a single writer."""
+        self._value = value - super().get()
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the value of the gauge when the metrics are rendered."""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._value + super().get()
+
+
+class _HistogramChild:
+    __slots__ = ('_bounds', '_shards')
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        # Each shard holds a count per bucket (the last one is +Inf), then the sum
+        self._shards: dict[int, list[float]] = {}
+
+    def observe(self, value: float) -> None:
+        shard = self._shards.get(_get_ident())
+        if shard is None:
+            shard = self._shards.setdefault(_get_ident(), [0] * (len(self._bounds) + 2))
+        shard[bisect_left(self._bounds, value)] += 1
+        shard[-1] += value
+
+    def get(self) -> tuple[list[float], float]:
+        """The cumulative count of each bucket, and the sum of the observations."""
+        counts = [0.0] * (len(self._bounds) + 1)
+        total = 0.0
+        for shard in list(self._shards.values()):
+            for i in range(len(counts)):
+                counts[i] += shard[i]
+            total += shard[-1]
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        return counts, total
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: 'MetricsRegistry | None' = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f'{self.name} expects labels {self.labelnames}, got {values}'
+            )
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _items(self) -> list[tuple[tuple[str, ...], object]]:
+        return sorted(
+            list(self._children.items()),
+            key=lambda item: tuple(str(value) for value in item[0]),
+        )
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {_escape(self.documentation)}'
+        yield f'# TYPE {self.name} {self.type_name}'
+        for values, child in self._items():
+            labels = _format_labels(self.labelnames, values)
+            yield f'{self.name}{labels} {_format_value(child.get())}'  # type: ignore[attr-defined]
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: 'MetricsRegistry | None' = None,
+    ) -> None:
+        self.bounds = tuple(sorted(float(bucket) for bucket in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {_escape(self.documentation)}'
+        yield f'# TYPE {self.name} histogram'
+        bounds = self.bounds + (math.inf,)
+        for values, child in self._items():
+            counts, total = child.get()  # type: ignore[attr-defined]
+            for bound, count in zip(bounds, counts):
+                labels = _format_labels(
+                    self.labelnames + ('le',), values + (_format_value(bound),)
+                )
+                yield f'{self.name}_bucket{labels} {_format_value(count)}'
+            labels = _format_labels(self.labelnames, values)
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {_format_value(counts[-1])}'
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        # A metric registered again (e.g. when its module is reloaded) replaces the old one
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,60 @@
+import re
+from typing import Any, Iterable
+
+
+class SecretRedactor:
+    """Replaces every occurrence of a set of secret values with a placeholder.
+
+    All secrets are compiled into a single regular expression alternation (longest
+    first, so a secret containing another is hidden entirely), meaning each string is
+    scanned once regardless of how many secrets there are. Build a new redactor when
+    the secrets change rather than on each use.
+    """
+
+    replacement: str
+    _template: str
+    _pattern: re.Pattern[str] | None
+
+    def __init__(self, secrets: Iterable[str] = (), replacement: str = '<secret_hidden>'):
+        self.replacement = replacement
+        # Backslashes in the replacement would otherwise be treated as group references
+        self._template = replacement.replace('\\', '\\\\')
+        # Empty values would match everywhere, so they are never treated as secrets
+        values = sorted({s for s in secrets if s}, key=len, reverse=True)
+        self._pattern = (
+            re.compile('|'.join(re.escape(value) for value in values))
+            if values
+            else None
+        )
+
+    def __bool__(self) -> bool:
+        return self._pattern is not None
+
+    def redact(self, text: str) -> str:
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(self._template, text)
+
+    def redact_data(self, data: Any) -> Any:
+        """Redact all strings nested in dicts and lists. Containers are updated in place."""
+        if isinstance(data, str):
+            return self.redact(data)
+        if isinstance(data, (dict, list)):
+            self.redact_in_place(data)
+        return data
+
+    def redact_in_place(self, data: dict | list) -> bool:
+        """Redact all strings nested in `data`, returning whether any secret was found."""
+        if self._pattern is None:
+            return False
+        found = False
+        items = data.items() if isinstance(data, dict) else enumerate(data)
+        for key, value in items:
+            if isinstance(value, str):
+                redacted, count = self._pattern.subn(self._template, value)
+                if count:
+                    data[key] = redacted  # type: ignore[index]
+                    found = True
+            elif isinstance(value, (dict, list)):
+                found = self.redact_in_place(value) or found
+        return found
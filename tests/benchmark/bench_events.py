@@ -0,0 +1,509 @@
+"""Benchmarks for the event pipeline and the file store backends.
+
+Example usage:
+
+```bash
+poetry run python tests/benchmark/bench_events.py --output results.json
+# later, after a change
+poetry run python tests/benchmark/bench_events.py --output new.json --compare results.json
+```
+
+Each benchmark is run against each file store, and all results are written as JSON.
+With `--compare`, results are checked against a previous run and the command fails if
+any metric regressed by more than `--threshold`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from typing import Any, Callable, Iterator
+from unittest.mock import patch
+
+import botocore.exceptions
+
+from openhands.events import EventSource, EventStream
+from openhands.events.action import CmdRunAction, MessageAction
+from openhands.events.event import Event
+from openhands.events.event_filter import EventFilter
+from openhands.events.event_store import EventStore
+from openhands.events.observation import CmdOutputObservation
+from openhands.events.serialization.event import event_from_dict, event_to_dict
+from openhands.io.json import dumps_fast
+from openhands.storage.files import FileStore
+from openhands.storage.local import LocalFileStore
+from openhands.storage.memory import InMemoryFileStore
+from openhands.storage.s3 import S3FileStore
+
+STORES = ('memory', 'local', 's3')
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_OBSERVATION_SIZES = (10_000, 100_000, 1_000_000)
+SEARCH_TERM = 'needle'
+
+
+@dataclass
+class BenchmarkResult:
+    benchmark: str
+    store: str | None
+    params: dict[str, Any]
+    metrics: dict[str, float]
+
+    @property
+    def key(self) -> str:
+        params = ','.join(f'{k}={v}' for k, v in sorted(self.params.items()))
+        return f'{self.benchmark}[{self.store or "-"}]({params})'
+
+
+@dataclass
+class CountingFileStore(FileStore):
+    """Wraps a file store, counting the calls made to it.
+
+    Call counts do not depend on the machine, which makes them a more reliable signal
+    of regressions than timings.
+    """
+
+    store: FileStore
+    counts: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def write(self, path: str, contents: str | bytes) -> None:
+        self._count('write')
+        self.store.write(path, contents)
+
+    def read(self, path: str) -> str:
+        self._count('read')
+        return self.store.read(path)
+
+    def list(self, path: str) -> list[str]:
+        self._count('list')
+        return self.store.list(path)
+
+    def delete(self, path: str) -> None:
+        self._count('delete')
+        self.store.delete(path)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.counts = {}
+
+
+class LocalS3Client:
+    """An in-process stand-in for the parts of the boto3 S3 client used by S3FileStore.
+
+    Each request waits for `latency` seconds, to approximate a round trip to S3.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.objects: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _request(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes) -> None:
+        self._request()
+        with self._lock:
+            self.objects[Key] = Body
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        self._request()
+        with self._lock:
+            body = self.objects.get(Key)
+        if body is None:
+            raise botocore.exceptions.ClientError(
+                {'Error': {'Code': 'NoSuchKey', 'Message': Key}}, 'GetObject'
+            )
+        return {'Body': BytesIO(body)}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = '') -> dict:
+        self._request()
+        with self._lock:
+            contents = [{'Key': key} for key in self.objects if key.startswith(Prefix)]
+        return {'Contents': contents} if contents else {}
+
+    def delete_object(self, Bucket: str, Key: str) -> None:
+        self._request()
+        with self._lock:
+            self.objects.pop(Key, None)
+
+
+def create_file_store(name: str, args: argparse.Namespace, tmp_dir: str) -> FileStore:
+    if name == 'memory':
+        return InMemoryFileStore()
+    if name == 'local':
+        return LocalFileStore(os.path.join(tmp_dir, 'local_store'))
+    if name == 's3':
+        if args.s3_bucket:
+            # A real bucket, e.g. on a local MinIO set with AWS_S3_ENDPOINT
+            return S3FileStore(args.s3_bucket)
+        client = LocalS3Client(args.s3_latency_ms / 1000)
+        with patch('boto3.client', return_value=client):
+            return S3FileStore('benchmark')
+    raise ValueError(f'Unknown store: {name}')
+
+
+def generate_events(
+    count: int, content_size: int, seed: int = 0
+) -> Iterator[tuple[Event, EventSource]]:
+    """Generate a deterministic conversation of user messages, commands and outputs."""
+    rng = random.Random(seed)
+    words = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta', 'eta', 'theta']
+    for i in range(count):
+        text = ' '.join(rng.choice(words) for _ in range(content_size // 6))
+        if i % 50 == 0:
+            text += f' {SEARCH_TERM}'
+        kind = i % 3
+        if kind == 0 and i % 30 == 0:
+            yield MessageAction(content=text), EventSource.USER
+        elif kind == 0 or kind == 1:
+            yield CmdRunAction(command=f'echo {i}', thought=text), EventSource.AGENT
+        else:
+            yield (
+                CmdOutputObservation(content=text, command=f'echo {i}'),
+                EventSource.ENVIRONMENT,
+            )
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Run `fn` `repeat` times, returning the median time and the last result."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def bench_add_and_replay(
+    store_name: str, store: CountingFileStore, args: argparse.Namespace
+) -> list[BenchmarkResult]:
+    results = []
+    total = max(args.sizes)
+    sid = f'bench-{store_name}'
+    stream = EventStream(sid, store)
+    store.reset_counts()
+    start = time.perf_counter()
+    for event, source in generate_events(total, args.event_size):
+        stream.add_event(event, source)
+    elapsed = time.perf_counter() - start
+    stream.close()
+    results.append(
+        BenchmarkResult(
+            'add_event',
+            store_name,
+            {'events': total, 'event_size': args.event_size},
+            {
+                'seconds': elapsed,
+                'events_per_second': total / elapsed,
+                **{f'store_{k}s': v for k, v in store.counts.items()},
+            },
+        )
+    )
+
+    # Replay the first `size` events of the stream, as a new session would
+    event_store = EventStore(sid, store, None)
+    for size in sorted(args.sizes):
+        store.reset_counts()
+        seconds, count = _timed(
+            lambda: sum(1 for _ in event_store.search_events(end_id=size - 1)),
+            args.repeat,
+        )
+        assert count == size, f'replayed {count} events, expected {size}'
+        results.append(
+            BenchmarkResult(
+                'replay',
+                store_name,
+                {'events': size, 'event_size': args.event_size},
+                {
+                    'seconds': seconds,
+                    'events_per_second': size / seconds,
+                    **{f'store_{k}s': v / args.repeat for k, v in store.counts.items()},
+                },
+            )
+        )
+
+    searches: dict[str, Callable[[], list[Event]]] = {
+        'source_and_type': lambda: list(
+            event_store.search_events(
+                filter=EventFilter(source='agent', include_types=(CmdRunAction,))
+            )
+        ),
+        'query': lambda: list(
+            event_store.search_events(filter=EventFilter(query=SEARCH_TERM))
+        ),
+        'latest_outputs': lambda: list(
+            event_store.search_events(
+                reverse=True,
+                filter=EventFilter(include_types=(CmdOutputObservation,)),
+                limit=10,
+            )
+        ),
+    }
+    for name, search in searches.items():
+        store.reset_counts()
+        seconds, found = _timed(search, args.repeat)
+        results.append(
+            BenchmarkResult(
+                'search',
+                store_name,
+                {'events': total, 'search': name},
+                {
+                    'seconds': seconds,
+                    'results': len(found),
+                    **{f'store_{k}s': v / args.repeat for k, v in store.counts.items()},
+                },
+            )
+        )
+    return results
+
+
+def bench_add_large_events(
+    store_name: str, store: CountingFileStore, args: argparse.Namespace
+) -> list[BenchmarkResult]:
+    """Add large command outputs, the most common heavy event, to a stream with secrets."""
+    results = []
+    for size in args.observation_sizes:
+        stream = EventStream(f'bench-large-{store_name}-{size}', store)
+        stream.set_secrets({f'secret{i}': f'secret-value-{i}' for i in range(20)})
+        content = 'x' * size + '\n'
+        count = max(3, min(100, 20_000_000 // size))
+        store.reset_counts()
+        start = time.perf_counter()
+        for i in range(count):
+            stream.add_event(
+                CmdOutputObservation(content=content, command=f'cat file{i}'),
+                EventSource.ENVIRONMENT,
+            )
+        elapsed = time.perf_counter() - start
+        stream.close()
+        results.append(
+            BenchmarkResult(
+                'add_large_event',
+                store_name,
+                {'events': count, 'content_size': size},
+                {
+                    'seconds': elapsed,
+                    'events_per_second': count / elapsed,
+                    **{f'store_{k}s': v for k, v in store.counts.items()},
+                },
+            )
+        )
+    return results
+
+
+def bench_serialization(args: argparse.Namespace) -> list[BenchmarkResult]:
+    results = []
+    for size in args.observation_sizes:
+        observation = next(
+            event
+            for event, _ in generate_events(3, size)
+            if isinstance(event, CmdOutputObservation)
+        )
+        observation._id = 1  # type: ignore[attr-defined]
+        observation._source = EventSource.ENVIRONMENT  # type: ignore[attr-defined]
+        iterations = max(3, min(1_000, 20_000_000 // size))
+
+        def serialize() -> str:
+            encoded = ''
+            for _ in range(iterations):
+                encoded = dumps_fast(event_to_dict(observation))
+            return encoded
+
+        seconds, encoded = _timed(serialize, args.repeat)
+        megabytes = len(encoded) * iterations / 1_000_000
+        results.append(
+            BenchmarkResult(
+                'serialize',
+                None,
+                {'content_size': size},
+                {
+                    'seconds_per_event': seconds / iterations,
+                    'mb_per_second': megabytes / seconds,
+                },
+            )
+        )
+
+        def deserialize() -> Event:
+            event = observation
+            for _ in range(iterations):
+                event = event_from_dict(json.loads(encoded))
+            return event
+
+        seconds, _ = _timed(deserialize, args.repeat)
+        results.append(
+            BenchmarkResult(
+                'deserialize',
+                None,
+                {'content_size': size},
+                {
+                    'seconds_per_event': seconds / iterations,
+                    'mb_per_second': megabytes / seconds,
+                },
+            )
+        )
+    return results
+
+
+def run_benchmarks(args: argparse.Namespace) -> list[BenchmarkResult]:
+    results = bench_serialization(args)
+    for store_name in args.stores:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CountingFileStore(create_file_store(store_name, args, tmp_dir))
+            results.extend(bench_add_and_replay(store_name, store, args))
+            results.extend(bench_add_large_events(store_name, store, args))
+    return results
+
+
+def _is_lower_better(metric: str) -> bool | None:
+    if metric.endswith('_per_second'):
+        return False
+    if metric.startswith('seconds') or metric.startswith('store_'):
+        return True
+    # e.g. the number of search results, which is not a performance measure
+    return None
+
+
+def compare_results(
+    results: list[BenchmarkResult], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Find the metrics which got worse than the baseline by more than `threshold` (a fraction)."""
+    baseline_metrics = {
+        BenchmarkResult(**result).key: result['metrics']
+        for result in baseline['results']
+    }
+    regressions = []
+    for result in results:
+        previous = baseline_metrics.get(result.key)
+        if previous is None:
+            continue
+        for metric, value in result.metrics.items():
+            lower_is_better = _is_lower_better(metric)
+            old = previous.get(metric)
+            if lower_is_better is None or not old:
+                continue
+            change = (value - old) / old
+            if (change if lower_is_better else -change) > threshold:
+                regressions.append(
+                    f'{result.key} {metric}: {old:.6g} -> {value:.6g} ({change:+.1%})'
+                )
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return (
+            subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(',') if item]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', default=None, help='File to write results to.')
+    parser.add_argument(
+        '--compare', default=None, help='Results of a previous run to compare to.'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='Fractional change in a metric counted as a regression.',
+    )
+    parser.add_argument(
+        '--stores',
+        type=lambda v: v.split(','),
+        default=list(STORES),
+        help=f'Comma separated file stores to benchmark ({",".join(STORES)}).',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=_int_list,
+        default=list(DEFAULT_SIZES),
+        help='Comma separated numbers of events to replay.',
+    )
+    parser.add_argument(
+        '--event-size', type=int, default=500, help='Approximate bytes per event.'
+    )
+    parser.add_argument(
+        '--observation-sizes',
+        type=_int_list,
+        default=list(DEFAULT_OBSERVATION_SIZES),
+        help='Comma separated content sizes of observations to serialize.',
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='Runs of each timing (median is kept).'
+    )
+    parser.add_argument(
+        '--s3-latency-ms',
+        type=float,
+        default=0.0,
+        help='Simulated latency of each request to the local S3 stand-in.',
+    )
+    parser.add_argument(
+        '--s3-bucket',
+        default=None,
+        help='Benchmark a real S3 compatible bucket instead of the local stand-in.',
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+    results = run_benchmarks(args)
+    report = {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'git_commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+        'results': [asdict(result) for result in results],
+    }
+    for result in results:
+        metrics = ', '.join(f'{k}={v:.6g}' for k, v in result.metrics.items())
+        print(f'{result.key}: {metrics}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regressions:')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print('\nNo regressions.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
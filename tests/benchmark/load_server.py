@@ -0,0 +1,452 @@
+"""Load test of the OpenHands server, which runs entirely offline.
+
+Example usage:
+
+```bash
+poetry run python tests/benchmark/load_server.py --conversations 20 --steps 10 --output load.json
+```
+
+The server is started in a subprocess with the CLI runtime (commands run locally in a
+temporary workspace per conversation), and with its LLM pointed at a stub, which
+answers each completion after a fixed latency with a canned tool call: `--steps`
+commands, then `finish`. The load test creates `--conversations` conversations
+concurrently, follows each over socket.io until the agent finishes, and reports:
+
+- step latency: time between consecutive agent actions, as seen by the client
+- action latency: time from an agent action to its observation, as seen by the client
+- fan-out latency: time from an event being created on the server to it arriving
+- server memory per conversation, and server thread counts
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+import httpx
+import psutil
+import socketio
+from aiohttp import web
+
+END_STATES = ('finished', 'error', 'stopped', 'awaiting_user_input', 'rejected')
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class StubLLM:
+    """An OpenAI compatible chat completions server with deterministic answers.
+
+    Completions with tools (agent steps) get `steps` execute_bash tool calls, one per
+    completion, followed by a finish tool call. Other completions (e.g. conversation
+    titles) get a short text answer.
+    """
+
+    def __init__(self, steps: int, latency: float):
+        self.steps = steps
+        self.latency = latency
+        self.requests = 0
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', self.chat_completions)
+        app.router.add_post('/chat/completions', self.chat_completions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        self.port = _free_port()
+        await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+        return f'http://127.0.0.1:{self.port}/v1'
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        message: dict[str, Any]
+        if body.get('tools'):
+            step = sum(
+                1
+                for m in body.get('messages', [])
+                if m.get('role') == 'assistant' and m.get('tool_calls')
+            )
+            if step < self.steps:
+                name, arguments = 'execute_bash', {'command': f'echo step {step}'}
+            else:
+                name, arguments = (
+                    'finish',
+                    {'message': 'Load test done.', 'task_completed': 'true'},
+                )
+            message = {
+                'role': 'assistant',
+                'content': None,
+                'tool_calls': [
+                    {
+                        'id': f'call_{uuid.uuid4().hex}',
+                        'type': 'function',
+                        'function': {'name': name, 'arguments': json.dumps(arguments)},
+                    }
+                ],
+            }
+            finish_reason = 'tool_calls'
+        else:
+            message = {'role': 'assistant', 'content': 'Load test conversation'}
+            finish_reason = 'stop'
+        return web.json_response(
+            {
+                'id': f'chatcmpl-{uuid.uuid4().hex}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'stub'),
+                'choices': [
+                    {'index': 0, 'message': message, 'finish_reason': finish_reason}
+                ],
+                'usage': {
+                    'prompt_tokens': 100,
+                    'completion_tokens': 10,
+                    'total_tokens': 110,
+                },
+            }
+        )
+
+
+@dataclass
+class ConversationStats:
+    conversation_id: str = ''
+    create_seconds: float = 0.0
+    total_seconds: float = 0.0
+    final_state: str | None = None
+    steps: int = 0
+    step_latencies: list[float] = field(default_factory=list)
+    action_latencies: list[float] = field(default_factory=list)
+    fanout_latencies: list[float] = field(default_factory=list)
+    error: str | None = None
+
+
+class ServerMonitor:
+    """Samples the memory and thread count of the server process (and its children)."""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.samples: list[tuple[float, int, int]] = []
+        self._task: asyncio.Task | None = None
+
+    def sample(self) -> tuple[float, int, int]:
+        processes = [self.process] + self.process.children(recursive=True)
+        rss = threads = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+                threads += process.num_threads()
+            except psutil.NoSuchProcess:
+                continue
+        result = (time.monotonic(), rss, threads)
+        self.samples.append(result)
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+
+def start_server(
+    port: int, work_dir: str, args: argparse.Namespace
+) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        'RUNTIME': 'cli',
+        'SERVE_FRONTEND': 'false',
+        'RATE_LIMIT_ENABLED': 'false',
+        'FILE_STORE': 'local',
+        'FILE_STORE_PATH': os.path.join(work_dir, 'file_store'),
+        'MAX_CONCURRENT_CONVERSATIONS': str(args.conversations + 1),
+        'LOG_LEVEL': 'WARNING',
+        'EVENT_DISPATCH_MODE': args.dispatch_mode,
+    }
+    return subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'uvicorn',
+            'openhands.server.listen:app',
+            '--host',
+            '127.0.0.1',
+            '--port',
+            str(port),
+        ],
+        env=env,
+        stdout=open(os.path.join(work_dir, 'server.log'), 'w'),
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_for_server(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError('The server exited while starting')
+            try:
+                if (await client.get(f'{url}/health')).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise TimeoutError('The server did not start in time')
+
+
+def _parse_timestamp(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+async def run_conversation(
+    url: str, index: int, args: argparse.Namespace
+) -> ConversationStats:
+    stats = ConversationStats()
+    start = time.monotonic()
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        response = await client.post(
+            '/api/conversations',
+            json={'initial_user_msg': f'Load test conversation {index}'},
+        )
+        response.raise_for_status()
+        stats.conversation_id = response.json()['conversation_id']
+    stats.create_seconds = time.monotonic() - start
+
+    done = asyncio.Event()
+    last_action_time: float | None = None
+    pending_actions: dict[int, float] = {}
+    sio = socketio.AsyncClient(reconnection=False)
+
+    @sio.on('oh_event')
+    async def on_event(event: dict[str, Any]) -> None:
+        nonlocal last_action_time
+        received = time.monotonic()
+        created = _parse_timestamp(event.get('timestamp'))
+        if created is not None:
+            stats.fanout_latencies.append(max(0.0, time.time() - created))
+        if event.get('source') == 'agent' and event.get('action') in (
+            'run',
+            'finish',
+        ):
+            if last_action_time is not None:
+                stats.step_latencies.append(received - last_action_time)
+            last_action_time = received
+            stats.steps += 1
+            pending_actions[event['id']] = received
+        cause = event.get('cause')
+        if 'observation' in event and cause in pending_actions:
+            stats.action_latencies.append(received - pending_actions.pop(cause))
+        if event.get('observation') == 'agent_state_changed':
+            state = event.get('extras', {}).get('agent_state')
+            if state in END_STATES:
+                stats.final_state = state
+                done.set()
+
+    try:
+        await sio.connect(
+            f'{url}?conversation_id={stats.conversation_id}&latest_event_id=-1',
+            transports=['websocket'],
+        )
+        await asyncio.wait_for(done.wait(), timeout=args.timeout)
+    except Exception as e:
+        stats.error = f'{type(e).__name__}: {e}'
+    finally:
+        await sio.disconnect()
+    stats.total_seconds = time.monotonic() - start
+    return stats
+
+
+def _percentiles(values: list[float]) -> dict[str, float | None]:
+    if not values:
+        return {'p50': None, 'p99': None, 'max': None}
+    ordered = sorted(values)
+    return {
+        'p50': statistics.median(ordered),
+        'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        'max': ordered[-1],
+    }
+
+
+async def run_load_test(args: argparse.Namespace) -> dict[str, Any]:
+    stub = StubLLM(args.steps, args.llm_latency_ms / 1000)
+    llm_base_url = await stub.start()
+    port = _free_port()
+    url = f'http://127.0.0.1:{port}'
+    with tempfile.TemporaryDirectory() as work_dir:
+        server = start_server(port, work_dir, args)
+        try:
+            await wait_for_server(url, server, args.startup_timeout)
+            async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+                response = await client.post(
+                    '/api/settings',
+                    json={
+                        'llm_model': 'openai/gpt-4o',
+                        'llm_api_key': 'stub',
+                        'llm_base_url': llm_base_url,
+                        'agent': 'CodeActAgent',
+                        'max_iterations': args.steps + 10,
+                        'enable_default_condenser': False,
+                        'user_consents_to_analytics': False,
+                    },
+                )
+                response.raise_for_status()
+
+            monitor = ServerMonitor(server.pid)
+            _, idle_rss, idle_threads = monitor.sample()
+            monitor.start()
+            start = time.monotonic()
+            semaphore = asyncio.Semaphore(args.concurrency or args.conversations)
+
+            async def limited(index: int) -> ConversationStats:
+                async with semaphore:
+                    return await run_conversation(url, index, args)
+
+            conversations = await asyncio.gather(
+                *(limited(i) for i in range(args.conversations))
+            )
+            elapsed = time.monotonic() - start
+            monitor.stop()
+            _, final_rss, final_threads = monitor.sample()
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            await stub.stop()
+            if args.keep_log:
+                with open(os.path.join(work_dir, 'server.log')) as f:
+                    with open(args.keep_log, 'w') as out:
+                        out.write(f.read())
+
+    peak_rss = max(rss for _, rss, _ in monitor.samples)
+    peak_threads = max(threads for _, _, threads in monitor.samples)
+    total_steps = sum(c.steps for c in conversations)
+    return {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': sys.version.split()[0],
+            'args': vars(args),
+        },
+        'summary': {
+            'conversations': len(conversations),
+            'completed': sum(1 for c in conversations if c.final_state == 'finished'),
+            'errors': sum(1 for c in conversations if c.error),
+            'seconds': elapsed,
+            'steps': total_steps,
+            'steps_per_second': total_steps / elapsed if elapsed else None,
+            'llm_requests': stub.requests,
+            'create_seconds': _percentiles([c.create_seconds for c in conversations]),
+            'step_latency_seconds': _percentiles(
+                [x for c in conversations for x in c.step_latencies]
+            ),
+            'action_latency_seconds': _percentiles(
+                [x for c in conversations for x in c.action_latencies]
+            ),
+            'fanout_latency_seconds': _percentiles(
+                [x for c in conversations for x in c.fanout_latencies]
+            ),
+            'idle_rss_mb': idle_rss / 1e6,
+            'peak_rss_mb': peak_rss / 1e6,
+            'final_rss_mb': final_rss / 1e6,
+            'rss_mb_per_conversation': (peak_rss - idle_rss) / 1e6 / len(conversations),
+            'idle_threads': idle_threads,
+            'peak_threads': peak_threads,
+            'final_threads': final_threads,
+            'threads_per_conversation': (peak_threads - idle_threads)
+            / len(conversations),
+        },
+        'conversations': [asdict(c) for c in conversations],
+    }
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--conversations', type=int, default=10, help='Conversations to create.'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=None,
+        help='Maximum conversations running at once (defaults to all of them).',
+    )
+    parser.add_argument(
+        '--steps', type=int, default=5, help='Commands the agent runs per conversation.'
+    )
+    parser.add_argument(
+        '--llm-latency-ms',
+        type=float,
+        default=200,
+        help='Time the stub LLM takes to answer each completion.',
+    )
+    parser.add_argument(
+        '--dispatch-mode',
+        default=os.getenv('EVENT_DISPATCH_MODE', 'thread'),
+        choices=['thread', 'shared'],
+        help='EVENT_DISPATCH_MODE of the server.',
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=300,
+        help='Seconds to wait for each conversation to finish.',
+    )
+    parser.add_argument(
+        '--startup-timeout',
+        type=float,
+        default=120,
+        help='Seconds to wait for the server to start.',
+    )
+    parser.add_argument('--output', default=None, help='File to write results to.')
+    parser.add_argument(
+        '--keep-log', default=None, help='File to copy the server log to.'
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+    report = asyncio.run(run_load_test(args))
+    print(json.dumps(report['summary'], indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    summary = report['summary']
+    return 0 if summary['completed'] == summary['conversations'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
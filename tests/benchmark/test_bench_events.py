@@ -0,0 +1,81 @@
+"""Checks that the benchmarks run, using sizes small enough for CI."""
+
+import json
+
+from bench_events import BenchmarkResult, compare_results, main
+
+
+def test_benchmarks_run_and_write_results(tmp_path):
+    output = tmp_path / 'results.json'
+    assert (
+        main(
+            [
+                '--output',
+                str(output),
+                '--sizes',
+                '10,60',
+                '--observation-sizes',
+                '1000',
+                '--repeat',
+                '1',
+            ]
+        )
+        == 0
+    )
+    report = json.loads(output.read_text())
+    results = [BenchmarkResult(**result) for result in report['results']]
+    benchmarks = {(result.benchmark, result.store) for result in results}
+    for store in ('memory', 'local', 's3'):
+        assert ('add_event', store) in benchmarks
+        assert ('add_large_event', store) in benchmarks
+        assert ('replay', store) in benchmarks
+        assert ('search', store) in benchmarks
+    assert ('serialize', None) in benchmarks
+
+    # A run compared with itself has no regressions
+    assert (
+        main(
+            [
+                '--stores',
+                'memory',
+                '--sizes',
+                '10',
+                '--observation-sizes',
+                '1000',
+                '--repeat',
+                '1',
+                '--compare',
+                str(output),
+                '--threshold',
+                '100',
+            ]
+        )
+        == 0
+    )
+
+
+def test_compare_results_detects_regressions():
+    baseline = {
+        'results': [
+            {
+                'benchmark': 'replay',
+                'store': 'memory',
+                'params': {'events': 10},
+                'metrics': {
+                    'events_per_second': 1000.0,
+                    'store_reads': 4,
+                    'results': 3,
+                },
+            }
+        ]
+    }
+    result = BenchmarkResult(
+        'replay',
+        'memory',
+        {'events': 10},
+        {'events_per_second': 500.0, 'store_reads': 4, 'results': 10},
+    )
+    regressions = compare_results([result], baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert 'events_per_second' in regressions[0]
+    assert compare_results([result], baseline, threshold=0.6) == []
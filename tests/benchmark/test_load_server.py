@@ -0,0 +1,36 @@
+"""Checks the stub LLM of the load test answers like an agent would."""
+
+import json
+
+import httpx
+import pytest
+
+from load_server import StubLLM
+
+
+@pytest.mark.asyncio
+async def test_stub_llm_runs_steps_then_finishes():
+    stub = StubLLM(steps=2, latency=0)
+    base_url = await stub.start()
+    messages = [{'role': 'user', 'content': 'hi'}]
+    tools = [{'type': 'function', 'function': {'name': 'execute_bash'}}]
+    names = []
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            for _ in range(3):
+                response = await client.post(
+                    '/chat/completions', json={'messages': messages, 'tools': tools}
+                )
+                message = response.json()['choices'][0]['message']
+                tool_call = message['tool_calls'][0]['function']
+                names.append(tool_call['name'])
+                json.loads(tool_call['arguments'])
+                messages.append(message)
+
+            # Completions without tools get text
+            response = await client.post('/chat/completions', json={'messages': []})
+            assert response.json()['choices'][0]['message']['content']
+    finally:
+        await stub.stop()
+    assert names == ['execute_bash', 'execute_bash', 'finish']
+    assert stub.requests == 4
@@ -1071,7 +1071,9 @@ def test_main(
     mock_parser.assert_called_once()
     mock_getenv.assert_any_call('GITLAB_TOKEN')
     mock_path_exists.assert_called_with('/mock/output')
-    mock_load_single_resolver_output.assert_called_with('/mock/output/output.jsonl', 42)
+    mock_load_single_resolver_output.assert_called_with(
+        '/mock/output/output.jsonl', 42, include_history=False
+    )
 
     # Test for invalid issue number
     mock_args.issue_number = 'invalid'
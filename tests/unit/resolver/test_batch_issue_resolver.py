@@ -0,0 +1,187 @@
+import os
+import subprocess
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from openhands.events.action import CmdRunAction
+from openhands.events.observation import CmdOutputMetadata, CmdOutputObservation
+from openhands.events.stream import EventStream, EventStreamSubscriber
+from openhands.integrations.service_types import ProviderType
+from openhands.resolver.batch_issue_resolver import BatchIssueResolver
+from openhands.resolver.interfaces.issue import Issue
+from openhands.resolver.io_utils import load_all_resolver_outputs
+from openhands.resolver.resolver_output import ResolverOutput
+from openhands.storage.memory import InMemoryFileStore
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    repo_path = tmp_path / 'repo'
+    repo_path.mkdir()
+    (repo_path / 'README.md').write_text('hello world')
+    for command in (
+        ['git', 'init', '-q'],
+        ['git', 'add', 'README.md'],
+        [
+            'git',
+            '-c',
+            'user.name=test',
+            '-c',
+            'user.email=test@example.com',
+            'commit',
+            '-q',
+            '-m',
+            'Initial commit',
+        ],
+    ):
+        subprocess.check_call(command, cwd=repo_path)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def batch_resolver(output_dir):
+    args = MagicMock()
+    args.selected_repo = 'test-owner/test-repo'
+    args.token = 'test-token'
+    args.username = 'test-user'
+    args.max_iterations = 5
+    args.output_dir = output_dir
+    args.base_domain = None
+    args.runtime_container_image = None
+    args.base_container_image = None
+    args.is_experimental = False
+    args.issue_number = None
+    args.comment_id = None
+    args.repo_instruction_file = None
+    args.issue_type = 'issue'
+    args.prompt_file = None
+    args.issue_numbers = [1, 2, 3]
+    args.limit_issues = None
+    args.num_workers = 1
+    with patch(
+        'openhands.resolver.issue_resolver.identify_token',
+        return_value=ProviderType.GITHUB,
+    ):
+        return BatchIssueResolver(args)
+
+
+def _issue(number: int) -> Issue:
+    return Issue(
+        owner='test-owner',
+        repo='test-repo',
+        number=number,
+        title=f'Issue {number}',
+        body='',
+    )
+
+
+def _output(issue: Issue, base_commit: str) -> ResolverOutput:
+    return ResolverOutput(
+        issue=issue,
+        issue_type='issue',
+        instruction='',
+        base_commit=base_commit,
+        git_patch='',
+        history=[],
+        metrics=None,
+        success=True,
+        comment_success=None,
+        result_explanation='',
+        error=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_resolve_issues_reuses_runtime_and_skips_processed(
+    batch_resolver, output_dir
+):
+    issues = [_issue(1), _issue(2), _issue(3)]
+    batch_resolver.issue_handler = MagicMock()
+    batch_resolver.issue_handler.get_converted_issues.return_value = issues
+    with open(os.path.join(output_dir, 'output.jsonl'), 'w') as f:
+        f.write(_output(issues[0], 'old').model_dump_json() + '\n')
+
+    runtime = MagicMock()
+    create_worker_runtime = AsyncMock(return_value=runtime)
+
+    async def process_issue(issue, base_commit, issue_handler, runtime=None):
+        return _output(issue, base_commit)
+
+    with (
+        patch.object(batch_resolver, 'create_worker_runtime', create_worker_runtime),
+        patch.object(
+            batch_resolver, 'process_issue', AsyncMock(side_effect=process_issue)
+        ) as mock_process_issue,
+    ):
+        await batch_resolver.resolve_issues()
+
+    # A single worker builds one runtime and reuses it for both remaining issues
+    create_worker_runtime.assert_awaited_once_with(0)
+    assert [call.args[0].number for call in mock_process_issue.await_args_list] == [
+        2,
+        3,
+    ]
+    assert all(
+        call.kwargs['runtime'] is runtime for call in mock_process_issue.await_args_list
+    )
+    runtime.close.assert_called_once()
+
+    outputs = list(load_all_resolver_outputs(os.path.join(output_dir, 'output.jsonl')))
+    assert [output.issue.number for output in outputs] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_resolve_issues_replaces_runtime_after_failure(batch_resolver):
+    issues = [_issue(1), _issue(2)]
+    batch_resolver.issue_handler = MagicMock()
+    batch_resolver.issue_handler.get_converted_issues.return_value = issues
+
+    runtimes = [MagicMock(), MagicMock()]
+    create_worker_runtime = AsyncMock(side_effect=runtimes)
+
+    async def process_issue(issue, base_commit, issue_handler, runtime=None):
+        if issue.number == 1:
+            raise RuntimeError('runtime died')
+        return _output(issue, base_commit)
+
+    with (
+        patch.object(batch_resolver, 'create_worker_runtime', create_worker_runtime),
+        patch.object(batch_resolver, 'process_issue', side_effect=process_issue),
+    ):
+        await batch_resolver.resolve_issues()
+
+    assert create_worker_runtime.await_count == 2
+    runtimes[0].close.assert_called_once()
+    runtimes[1].close.assert_called_once()
+    outputs = list(
+        load_all_resolver_outputs(
+            os.path.join(batch_resolver.output_dir, 'output.jsonl')
+        )
+    )
+    assert [output.issue.number for output in outputs] == [2]
+
+
+def test_reset_runtime(batch_resolver):
+    previous_stream = EventStream('sid', InMemoryFileStore({}))
+    previous_stream.set_secrets({'token': 'secret-value'})
+    runtime = MagicMock()
+    runtime.sid = 'sid'
+    runtime.event_stream = previous_stream
+    previous_stream.subscribe(EventStreamSubscriber.RUNTIME, runtime.on_event, 'sid')
+    runtime.run_action.return_value = CmdOutputObservation(
+        content='', command='', metadata=CmdOutputMetadata(exit_code=0)
+    )
+
+    batch_resolver.reset_runtime(runtime, _issue(7), 'abc123')
+
+    assert runtime.event_stream is not previous_stream
+    assert runtime.event_stream.sid == 'sid-7'
+    assert runtime.event_stream.secrets == {'token': 'secret-value'}
+    assert 'sid' in runtime.event_stream._subscribers[EventStreamSubscriber.RUNTIME]
+    assert [call.args[0] for call in runtime.run_action.call_args_list] == [
+        CmdRunAction(command='cd /workspace'),
+        CmdRunAction(command='git checkout --force abc123'),
+        CmdRunAction(command='git clean -fd'),
+    ]
+    runtime.event_stream.close()
@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+from unittest.mock import patch
+
+from openhands.resolver.io_utils import (
+    ResolverOutputWriter,
+    get_index_path,
+    load_all_resolver_outputs,
+    load_resolver_output_index,
+    load_single_resolver_output,
+)
+
+MOCK_OUTPUT_JSONL = 'tests/unit/resolver/mock_output/output.jsonl'
+
+
+def test_writer_indexes_existing_and_new_outputs(tmp_path):
+    output_jsonl = str(tmp_path / 'output.jsonl')
+    # Outputs written before the index existed
+    shutil.copy(MOCK_OUTPUT_JSONL, output_jsonl)
+    existing = list(load_all_resolver_outputs(output_jsonl))
+
+    new_output = existing[0].model_copy(deep=True)
+    new_output.issue.number = 1234
+    with ResolverOutputWriter(output_jsonl) as writer:
+        writer.write(new_output)
+
+    with open(get_index_path(output_jsonl)) as f:
+        indexed_numbers = [int(line.split()[0]) for line in f]
+    assert indexed_numbers == [output.issue.number for output in existing] + [1234]
+
+    loaded = load_single_resolver_output(output_jsonl, 1234)
+    assert loaded == new_output
+    for output in existing:
+        assert load_single_resolver_output(output_jsonl, output.issue.number) == output
+
+
+def test_lookup_scans_outputs_missing_from_index(tmp_path):
+    output_jsonl = str(tmp_path / 'output.jsonl')
+    shutil.copy(MOCK_OUTPUT_JSONL, output_jsonl)
+    with ResolverOutputWriter(output_jsonl):
+        pass
+    # An output appended without updating the index
+    with open(MOCK_OUTPUT_JSONL) as src, open(output_jsonl, 'a') as dst:
+        line = src.readline().replace('"number":5', '"number":77', 1)
+        dst.write(line)
+
+    assert 77 in load_resolver_output_index(output_jsonl)
+    assert load_single_resolver_output(output_jsonl, 77).issue.number == 77
+
+
+def test_stale_index_is_ignored(tmp_path):
+    output_jsonl = str(tmp_path / 'output.jsonl')
+    shutil.copy(MOCK_OUTPUT_JSONL, output_jsonl)
+    with open(get_index_path(output_jsonl), 'w') as f:
+        f.write('5 0 100000000\n')
+
+    assert load_single_resolver_output(output_jsonl, 5).issue.number == 5
+
+
+def test_load_without_history():
+    outputs = list(load_all_resolver_outputs(MOCK_OUTPUT_JSONL, include_history=False))
+    assert outputs
+    assert all(output.history == [] for output in outputs)
+
+    output = load_single_resolver_output(MOCK_OUTPUT_JSONL, 5, include_history=False)
+    full_output = load_single_resolver_output(MOCK_OUTPUT_JSONL, 5)
+    assert full_output.history
+    assert output.history == []
+    assert output.git_patch == full_output.git_patch
+
+
+def test_lookup_with_index_of_a_rewritten_file(tmp_path):
+    output_jsonl = str(tmp_path / 'output.jsonl')
+    shutil.copy(MOCK_OUTPUT_JSONL, output_jsonl)
+    with ResolverOutputWriter(output_jsonl):
+        pass
+    outputs = list(load_all_resolver_outputs(output_jsonl))
+    # Rewritten (with a shorter first line) by a run which didn't update the index
+    with open(MOCK_OUTPUT_JSONL) as src, open(output_jsonl, 'w') as dst:
+        lines = src.readlines()
+        dst.write('{"issue": {"number": -1}}\n')
+        dst.writelines(reversed(lines))
+
+    for output in outputs:
+        assert load_single_resolver_output(output_jsonl, output.issue.number) == output
+
+    # An index whose entries fall on line starts, but point to other outputs
+    with open(output_jsonl, 'rb') as f:
+        first_line = f.readline()
+    with open(get_index_path(output_jsonl), 'w') as f:
+        f.write(f'{outputs[0].issue.number} 0 {len(first_line)}\n')
+    assert (
+        load_single_resolver_output(output_jsonl, outputs[0].issue.number)
+        == (outputs[0])
+    )
+
+
+def test_lookup_indexes_outputs_written_before_the_index(tmp_path):
+    output_jsonl = str(tmp_path / 'output.jsonl')
+    shutil.copy(MOCK_OUTPUT_JSONL, output_jsonl)
+    outputs = list(load_all_resolver_outputs(output_jsonl))
+
+    assert load_single_resolver_output(output_jsonl, 5).issue.number == 5
+    assert os.path.exists(get_index_path(output_jsonl))
+
+    # The outputs aren't scanned again
+    with patch('openhands.resolver.io_utils.json.loads', wraps=json.loads) as loads:
+        for output in outputs:
+            loaded = load_single_resolver_output(output_jsonl, output.issue.number)
+            assert loaded == output
+        loads.assert_not_called()
+
+
+def test_output_being_written_is_not_indexed(tmp_path):
+    output_jsonl = str(tmp_path / 'output.jsonl')
+    shutil.copy(MOCK_OUTPUT_JSONL, output_jsonl)
+    with open(MOCK_OUTPUT_JSONL) as src, open(output_jsonl, 'a') as dst:
+        line = src.readline().replace('"number":5', '"number":77', 1)
+        dst.write(line[: len(line) // 2])
+
+    index = load_resolver_output_index(output_jsonl, update_index=True)
+    assert 77 not in index
+    assert 5 in index
+
+    # Once it is written, it is added to the index
+    with open(output_jsonl, 'a') as dst:
+        dst.write(line[len(line) // 2 :])
+    assert load_single_resolver_output(output_jsonl, 77).issue.number == 77
+    with open(get_index_path(output_jsonl)) as f:
+        assert [line.split()[0] for line in f][-1] == '77'
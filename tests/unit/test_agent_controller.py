@@ -15,6 +15,7 @@ from openhands.controller.state.state import State, TrafficControlState
 from openhands.core.config import OpenHandsConfig
 from openhands.core.config.agent_config import AgentConfig
 from openhands.core.main import run_controller
+from openhands.core.novel_chapter_pipeline import CHAPTER_TEMPLATE
 from openhands.core.schema import AgentState
 from openhands.events import Event, EventSource, EventStream, EventStreamSubscriber
 from openhands.events.action import ChangeAgentStateAction, CmdRunAction, MessageAction
@@ -60,6 +61,7 @@ def mock_agent():
     # Add config with enable_mcp attribute
     agent.config = MagicMock(spec=AgentConfig)
     agent.config.enable_mcp = True
+    agent.config.enable_budgeted_history_truncation = False
 
     # Add a proper system message mock
     system_message = SystemMessageAction(
@@ -141,6 +143,34 @@ async def test_set_agent_state(mock_agent, mock_event_stream):
     await controller.close()
 
 
+@pytest.mark.asyncio
+async def test_wait_for_agent_state_wakes_on_state_change(
+    mock_agent, mock_event_stream
+):
+    controller = AgentController(
+        agent=mock_agent,
+        event_stream=mock_event_stream,
+        max_iterations=10,
+        sid='test',
+        confirmation_mode=False,
+        headless_mode=True,
+    )
+    await controller.set_agent_state_to(AgentState.RUNNING)
+    # The long poll interval means only the notification can wake the waiter in time
+    waiter = asyncio.create_task(
+        controller.wait_for_agent_state(
+            [AgentState.FINISHED, AgentState.ERROR], poll_interval=60
+        )
+    )
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await controller.set_agent_state_to(AgentState.FINISHED)
+    assert await asyncio.wait_for(waiter, timeout=1) == AgentState.FINISHED
+    assert controller._agent_state_waiters == []
+    await controller.close()
+
+
 @pytest.mark.asyncio
 async def test_on_event_message_action(mock_agent, mock_event_stream):
     controller = AgentController(
@@ -158,6 +188,28 @@ async def test_on_event_message_action(mock_agent, mock_event_stream):
     await controller.close()
 
 
+@pytest.mark.asyncio
+async def test_on_event_chapter_request(mock_agent, mock_event_stream):
+    controller = AgentController(
+        agent=mock_agent,
+        event_stream=mock_event_stream,
+        max_iterations=10,
+        sid='test',
+        confirmation_mode=False,
+        headless_mode=True,
+    )
+    controller.state.agent_state = AgentState.AWAITING_USER_INPUT
+    chapter_request = MessageAction(
+        content='Bab 1', novel_mode=True, template_used=CHAPTER_TEMPLATE
+    )
+    chapter_request._source = EventSource.USER
+    await send_event_to_controller(controller, chapter_request)
+    # The chapter pipeline answers it: the agent is not woken up
+    assert controller.get_agent_state() == AgentState.AWAITING_USER_INPUT
+    assert controller.state.history[-1] is chapter_request
+    await controller.close()
+
+
 @pytest.mark.asyncio
 async def test_on_event_change_agent_state_action(mock_agent, mock_event_stream):
     controller = AgentController(
@@ -8,6 +8,7 @@ from openhands.controller.state.state import State
 from openhands.core.config import OpenHandsConfig
 from openhands.events import EventSource
 from openhands.events.action import CmdRunAction, MessageAction, RecallAction
+from openhands.events.action.agent import CondensationAction
 from openhands.events.action.message import SystemMessageAction
 from openhands.events.event import RecallType
 from openhands.events.observation import (
@@ -559,3 +560,96 @@ def test_multiple_user_messages(controller_fixture):
     assert not any(event.id == 7 for event in truncated_events)
     # Verify the first user message (ID 2) is present
     assert any(event.id == 2 for event in truncated_events)
+
+
+# =============================================
+# Test Cases for _apply_token_budget_window
+# =============================================
+
+
+def _budget_history():
+    return create_events(
+        [
+            {'type': SystemMessageAction, 'content': 'System Prompt'},  # 1
+            {
+                'type': MessageAction,
+                'content': 'User Task 1',
+                'source': EventSource.USER,
+            },  # 2
+            {'type': RecallAction, 'query': 'User Task 1'},  # 3
+            {'type': RecallObservation, 'content': 'Recall result', 'cause_id': 3},  # 4
+            {'type': CmdRunAction, 'command': 'ls'},  # 5
+            {
+                'type': CmdOutputObservation,
+                'content': 'x' * 1000,
+                'command': 'ls',
+                'cause_id': 5,
+            },  # 6
+            {'type': CmdRunAction, 'command': 'pwd'},  # 7
+            {
+                'type': CmdOutputObservation,
+                'content': 'x' * 100,
+                'command': 'pwd',
+                'cause_id': 7,
+            },  # 8
+            {'type': CmdRunAction, 'command': 'cat file1'},  # 9
+            {
+                'type': CmdOutputObservation,
+                'content': 'x' * 100,
+                'command': 'cat file1',
+                'cause_id': 9,
+            },  # 10
+        ]
+    )
+
+
+def _count_characters(controller):
+    # One token per character of the message
+    controller.agent.llm.get_token_counts.side_effect = lambda messages: [
+        len(message['content']) for message in messages
+    ]
+
+
+def test_token_budget_window_keeps_history_that_fits(controller_fixture):
+    controller = controller_fixture
+    _count_characters(controller)
+    history = _budget_history()
+
+    assert controller._apply_token_budget_window(history, 100_000) == history
+
+
+def test_token_budget_window_keeps_newest_events_that_fit(controller_fixture):
+    controller = controller_fixture
+    _count_characters(controller)
+    history = _budget_history()
+    token_counts = controller._estimate_event_tokens(history)
+    essential_tokens = sum(token_counts[:4])
+
+    # Everything after the large observation (6) fits
+    budget = essential_tokens + sum(token_counts[6:]) + 10
+    kept = controller._apply_token_budget_window(history, budget)
+    assert [e.id for e in kept] == [1, 2, 3, 4, 7, 8, 9, 10]
+
+    # The observation 8 fits, but not its action, so it is dropped as well
+    budget = essential_tokens + sum(token_counts[7:]) + 1
+    kept = controller._apply_token_budget_window(history, budget)
+    assert [e.id for e in kept] == [1, 2, 3, 4, 9, 10]
+
+
+def test_trim_history_to_token_budget_adds_condensation(controller_fixture):
+    controller = controller_fixture
+    _count_characters(controller)
+    controller.state.history = _budget_history()
+    token_counts = controller._estimate_event_tokens(controller.state.history)
+    controller.agent.config.history_truncation_reserve_tokens = 0
+    controller.agent.llm.config.max_input_tokens = sum(token_counts) - 1
+
+    assert controller._trim_history_to_token_budget()
+    condensation = controller.event_stream.add_event.call_args[0][0]
+    assert isinstance(condensation, CondensationAction)
+    assert condensation.forgotten == [5, 6]
+
+    controller.event_stream.add_event.reset_mock()
+    controller.agent.llm.config.max_input_tokens = sum(token_counts)
+    assert not controller._trim_history_to_token_budget()
+    controller.event_stream.add_event.assert_not_called()
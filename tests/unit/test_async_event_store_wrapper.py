@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from openhands.events.action import MessageAction
+from openhands.events.async_event_store_wrapper import AsyncEventStoreWrapper
+from openhands.events.event import Event
+
+
+class SlowEventStore:
+    """An event store taking `delay` seconds of blocking I/O to read each event."""
+
+    def __init__(self, num_events: int, delay: float) -> None:
+        self.num_events = num_events
+        self.delay = delay
+        self.read = 0
+        # The time spent reading events on the thread of the event loop
+        self.loop_thread = threading.get_ident()
+        self.loop_blocking = 0.0
+
+    def get_events(self, start_id: int = 0) -> Iterator[Event]:
+        for i in range(start_id, self.num_events):
+            start = time.perf_counter()
+            time.sleep(self.delay)
+            if threading.get_ident() == self.loop_thread:
+                self.loop_blocking += time.perf_counter() - start
+            self.read += 1
+            event = MessageAction(content=f'message {i}')
+            event._id = i  # type: ignore[attr-defined]
+            yield event
+
+
+@pytest.mark.asyncio
+async def test_events_are_read_without_blocking_the_event_loop():
+    store = SlowEventStore(num_events=30, delay=0.001)
+    events = [e.id async for e in AsyncEventStoreWrapper(store, page_size=7)]
+    assert events == list(range(30))
+    events = [e.id async for e in AsyncEventStoreWrapper(store, 25, page_size=5)]
+    assert events == list(range(25, 30))
+    assert store.read == 35
+    assert store.loop_blocking == 0
+
+
+@pytest.mark.asyncio
+async def test_next_page_is_read_ahead_while_the_current_one_is_consumed():
+    store = SlowEventStore(num_events=20, delay=0.001)
+    events = AsyncEventStoreWrapper(store, page_size=5).__aiter__()
+    await events.__anext__()
+    for _ in range(500):
+        if store.read == 10:
+            break
+        await asyncio.sleep(0.01)
+    assert store.read == 10
+    await events.aclose()
+
+    store = SlowEventStore(num_events=20, delay=0.001)
+    events = AsyncEventStoreWrapper(store, page_size=5, read_ahead=False).__aiter__()
+    await events.__anext__()
+    await asyncio.sleep(0.1)
+    assert store.read == 5
+    await events.aclose()
@@ -0,0 +1,124 @@
+import asyncio
+import gc
+
+import pytest
+
+from openhands.server import chat_session_store
+from openhands.server.chat_session_store import (
+    ChatSessionStore,
+    get_chat_session_store,
+)
+from openhands.storage.memory import InMemoryFileStore
+
+
+def _new_session(session_id):
+    return lambda: {'id': session_id, 'messages': []}
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_evicted_and_loaded_back_from_the_file_store():
+    file_store = InMemoryFileStore()
+    store = ChatSessionStore('test', file_store, max_sessions=2)
+    for session_id in ('a', 'b', 'c'):
+        async with store.edit(session_id, _new_session(session_id)) as session:
+            session['messages'].append({'role': 'user', 'content': session_id})
+
+    assert len(store) == 2
+    assert sorted(await store.list_ids()) == ['a', 'b', 'c']
+    session = await store.get('a')
+    assert session['messages'] == [{'role': 'user', 'content': 'a'}]
+    # Loading 'a' back evicted the least recently used session
+    assert len(store) == 2 and 'b' not in store._entries
+
+    # A new store (as after a restart) finds all the sessions
+    restarted = ChatSessionStore('test', file_store)
+    assert len(await restarted.list_sessions()) == 3
+    assert await restarted.delete('b')
+    assert not await restarted.delete('b')
+    assert await restarted.clear() == 2
+    assert await restarted.list_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_memory_is_bounded_by_bytes_and_idle_time():
+    store = ChatSessionStore('test', max_bytes=10_000)
+    for i in range(10):
+        async with store.edit(str(i), _new_session(str(i))) as session:
+            # Large sessions are compressed, so use content which doesn't compress
+            session['messages'].append(
+                {
+                    'content': ''.join(
+                        chr(0x4E00 + (i * 7919 + j) % 20000) for j in range(1000)
+                    )
+                }
+            )
+    assert store.memory_bytes <= 10_000
+    assert 0 < len(store) < 10
+    assert await store.get('9') is not None
+
+    store.ttl = 0
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_edits_of_a_session_are_serialized():
+    store = ChatSessionStore('test', InMemoryFileStore())
+
+    async def add_message(i):
+        async with store.edit('shared', _new_session('shared')) as session:
+            await asyncio.sleep(0.001)
+            session['messages'].append(i)
+
+    await asyncio.gather(*(add_message(i) for i in range(20)))
+    assert sorted((await store.get('shared'))['messages']) == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_invalid_session_ids_are_rejected():
+    store = ChatSessionStore('test', InMemoryFileStore())
+    assert await store.get('../secrets') is None
+    assert not await store.delete('../secrets')
+    with pytest.raises(ValueError):
+        async with store.edit('../secrets', dict):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_stores_of_a_namespace_share_their_locks():
+    file_store = InMemoryFileStore()
+    store = get_chat_session_store('test', file_store)
+    assert get_chat_session_store('test', file_store) is store
+    assert get_chat_session_store('other', file_store) is not store
+    assert get_chat_session_store('test', InMemoryFileStore()) is not store
+
+    async def add_message(i):
+        # Each edit gets the store anew, like each resumed request does
+        shared = get_chat_session_store('test', file_store)
+        async with shared.edit('shared', _new_session('shared')) as session:
+            await asyncio.sleep(0.001)
+            session['messages'].append(i)
+
+    await asyncio.gather(*(add_message(i) for i in range(20)))
+    assert sorted((await store.get('shared'))['messages']) == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_shared_stores_are_dropped_once_unused():
+    for i in range(10):
+        # e.g. the in-memory file store of each conversation
+        store = get_chat_session_store('unused-test', InMemoryFileStore())
+        async with store.edit(str(i), _new_session(str(i))):
+            pass
+    del store
+    gc.collect()
+    assert not [
+        key for key in list(chat_session_store._stores) if key[0] == 'unused-test'
+    ]
+
+    # Without a file store, the store holds the only copy of its sessions
+    store = get_chat_session_store('unused-test')
+    async with store.edit('a', _new_session('a')):
+        pass
+    del store
+    gc.collect()
+    assert await get_chat_session_store('unused-test').get('a') is not None
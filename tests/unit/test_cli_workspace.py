@@ -80,3 +80,23 @@ def test_sanitize_filename_nested_path(cli_runtime):
     test_path = os.path.join(nested_dir, 'test.txt')
     sanitized_path = cli_runtime._sanitize_filename(test_path)
     assert sanitized_path == os.path.realpath(test_path)
+
+
+def test_list_files_leaves_out_ignored_files(cli_runtime):
+    """Test that list_files applies the .gitignore of the workspace."""
+    workspace = cli_runtime._workspace_path
+    os.makedirs(os.path.join(workspace, 'node_modules', 'lib'))
+    os.makedirs(os.path.join(workspace, 'src'))
+    for name in ('.env', 'main.py', os.path.join('src', 'app.py')):
+        with open(os.path.join(workspace, name), 'w') as f:
+            f.write('x\n')
+    with open(os.path.join(workspace, '.gitignore'), 'w') as f:
+        f.write('node_modules/\n.env\n')
+
+    assert cli_runtime.list_files_respects_gitignore
+    files = cli_runtime.list_files()
+    assert sorted(os.path.relpath(f, workspace) for f in files) == [
+        '.gitignore',
+        'main.py',
+        'src',
+    ]
@@ -14,6 +14,7 @@ from openhands.core.config.condenser_config import (
     NoOpCondenserConfig,
     ObservationMaskingCondenserConfig,
     RecentEventsCondenserConfig,
+    StoryBibleCondenserConfig,
     StructuredSummaryCondenserConfig,
 )
 from openhands.core.config.llm_config import LLMConfig
@@ -35,9 +36,12 @@ from openhands.memory.condenser.impl import (
     NoOpCondenser,
     ObservationMaskingCondenser,
     RecentEventsCondenser,
+    StoryBible,
+    StoryBibleCondenser,
     StructuredSummaryCondenser,
 )
 from openhands.memory.condenser.impl.pipeline import CondenserPipeline
+from openhands.memory.condenser.impl.story_bible_condenser import parse_story_bible
 
 
 def create_test_event(
@@ -715,6 +719,107 @@ def test_structured_summary_condenser_keeps_first_and_summary_events(mock_llm):
             assert isinstance(view[keep_first], AgentCondensationObservation)
 
 
+def test_story_bible_condenser_from_config():
+    """Test that StoryBibleCondenser objects can be made from config."""
+    config = StoryBibleCondenserConfig(
+        max_size=30,
+        keep_first=2,
+        llm_config=LLMConfig(model='gpt-4o-mini', api_key='test_key'),
+    )
+    condenser = Condenser.from_config(config)
+
+    assert isinstance(condenser, StoryBibleCondenser)
+    assert condenser.llm.config.model == 'gpt-4o-mini'
+    assert condenser.max_size == 30
+    assert condenser.keep_first == 2
+    assert not condenser.llm.config.caching_prompt
+
+
+def test_story_bible_condenser_updates_the_story_bible(mock_llm):
+    """Test that the StoryBibleCondenser keeps the view size, and updates its story bible incrementally."""
+    max_size = 10
+    condenser = StoryBibleCondenser(max_size=max_size, llm=mock_llm)
+    events = [create_test_event(f'Event {i}', id=i) for i in range(max_size * 3)]
+    harness = RollingCondenserTestHarness(condenser)
+
+    def set_response(history):
+        mock_llm.set_mock_response_content(
+            f'{{"characters": "Sari", "plot_state": "After {len(history)} events"}}'
+        )
+
+    harness.add_callback(set_response)
+
+    for i, view in enumerate(harness.views(events)):
+        assert len(view) == harness.expected_size(i, max_size)
+        if i > max_size:
+            assert isinstance(view[1], AgentCondensationObservation)
+            assert '## Characters\nSari' in view[1].message
+
+    # The previous story bible is given to the LLM to update
+    prompt = str(mock_llm.completion.call_args.kwargs['messages'][0])
+    assert 'Sari' in prompt
+    assert condenser.story_bible.characters == 'Sari'
+
+
+def test_story_bible_condenser_updates_a_restored_story_bible(mock_llm):
+    """Test that a new StoryBibleCondenser updates the story bible of the history it is given."""
+    max_size = 10
+    condenser = StoryBibleCondenser(max_size=max_size, llm=mock_llm)
+    restored = StoryBible(characters='Sari', locations='Jakarta')
+    summary = AgentCondensationObservation(str(restored))
+    summary._id = 1  # type: ignore[attr-defined]
+    events = [create_test_event('Event 0', id=0), summary] + [
+        create_test_event(f'Event {i}', id=i) for i in range(2, max_size + 2)
+    ]
+    mock_llm.set_mock_response_content('{"plot_state": "Sari pulang."}')
+
+    condensation = condenser.get_condensation(View(events=events))
+
+    # The fields the LLM didn't write are kept from the restored story bible
+    assert condenser.story_bible == StoryBible(
+        characters='Sari', locations='Jakarta', plot_state='Sari pulang.'
+    )
+    assert '## Locations\nJakarta' in condensation.action.summary
+    prompt = str(mock_llm.completion.call_args.kwargs['messages'][0])
+    assert 'Jakarta' in prompt
+
+    # Without a parsable answer, the restored story bible is kept
+    condenser = StoryBibleCondenser(max_size=max_size, llm=mock_llm)
+    mock_llm.set_mock_response_content('Maaf, saya tidak bisa.')
+    condenser.get_condensation(View(events=events))
+    assert condenser.story_bible == restored
+
+
+def test_story_bible_from_summary():
+    story_bible = StoryBible(
+        characters='Sari\n## Catatan\nBudi', plot_state='Bab 1', open_threads='Surat'
+    )
+    assert StoryBible.from_summary(str(story_bible)) == story_bible
+    assert StoryBible.from_summary('Sari pergi ke pasar.') == StoryBible(
+        plot_state='Sari pergi ke pasar.'
+    )
+    assert StoryBible.from_summary('').is_empty()
+
+
+def test_parse_story_bible():
+    previous = StoryBible(characters='Sari', locations='Jakarta')
+
+    story_bible = parse_story_bible(
+        '```json\n{"characters": "Sari, Budi", "open_threads": ["Surat itu"]}\n```',
+        previous,
+    )
+    assert story_bible.characters == 'Sari, Budi'
+    # Fields which weren't written are kept
+    assert story_bible.locations == 'Jakarta'
+    assert story_bible.open_threads == '["Surat itu"]'
+
+    assert parse_story_bible('Maaf, saya tidak bisa.', previous) is previous
+    assert StoryBible().is_empty()
+    assert (
+        str(previous) == '# Story Bible\n\n## Characters\nSari\n\n## Locations\nJakarta'
+    )
+
+
 def test_condenser_pipeline_from_config():
     """Test that CondenserPipeline condensers can be created from configuration objects."""
     config = CondenserPipelineConfig(
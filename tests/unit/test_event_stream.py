@@ -1,7 +1,10 @@
+import asyncio
 import gc
 import json
 import os
+import threading
 import time
+from unittest.mock import patch
 
 import psutil
 import pytest
@@ -18,9 +21,10 @@ from openhands.events.action.files import (
     FileWriteAction,
 )
 from openhands.events.action.message import MessageAction
+from openhands.events.dispatcher import EventDispatcher
 from openhands.events.event import FileEditSource, FileReadSource
 from openhands.events.event_filter import EventFilter
-from openhands.events.observation import NullObservation
+from openhands.events.observation import CmdOutputObservation, NullObservation
 from openhands.events.observation.files import (
     FileEditObservation,
     FileReadObservation,
@@ -735,3 +739,124 @@ def test_cache_page_with_missing_events(temp_dir: str):
         # If the delete operation fails, we'll just verify that the basic functionality works
         print(f'Note: Could not delete file {missing_filename}: {e}')
         assert len(initial_events) > 0, 'Should retrieve events successfully'
+
+
+def test_secrets_replaced_in_nested_lists(temp_dir: str):
+    file_store = get_file_store('local', temp_dir)
+    event_stream = EventStream('abc', file_store)
+    event_stream.set_secrets({'token': 'ghp_secret_value'})
+    event_stream.update_secrets({'other': 'other-secret'})
+    action = MessageAction(
+        content='use ghp_secret_value', image_urls=['http://x?k=other-secret']
+    )
+    event_stream.add_event(action, EventSource.USER)
+
+    content = file_store.read(get_conversation_event_filename('abc', 0))
+    assert 'ghp_secret_value' not in content
+    assert 'other-secret' not in content
+    event = event_stream.get_event(0)
+    assert event.content == 'use <secret_hidden>'
+    assert event.image_urls == ['http://x?k=<secret_hidden>']
+
+
+def test_add_event_does_not_rebuild_events_without_secrets(temp_dir: str):
+    file_store = get_file_store('local', temp_dir)
+    event_stream = EventStream('abc', file_store)
+    event_stream.set_secrets({'token': 'ghp_secret_value'})
+    observation = NullObservation('no secrets here')
+    with patch('openhands.events.stream.event_from_dict') as mock_event_from_dict:
+        event_stream.add_event(observation, EventSource.AGENT)
+        mock_event_from_dict.assert_not_called()
+    assert event_stream.get_event(0).content == 'no secrets here'
+
+
+def test_add_event_large_cmd_output(temp_dir: str):
+    file_store = get_file_store('local', temp_dir)
+    event_stream = EventStream('abc', file_store)
+    event_stream.set_secrets({f'secret{i}': f'secret-value-{i}' for i in range(20)})
+    content = 'x' * 100_000 + '\n'
+    num_events = 30
+
+    for i in range(num_events):
+        event_stream.add_event(
+            CmdOutputObservation(content=content, command=f'cat file{i}'),
+            EventSource.ENVIRONMENT,
+        )
+
+    events = collect_events(event_stream)
+    assert len(events) == num_events
+    assert events[-1].command == f'cat file{num_events - 1}'
+    assert events[-1].content == content
+    # Cache pages are written from the already encoded events
+    cache_content = file_store.read(event_stream._get_filename_for_cache(0, 25))
+    assert [e['id'] for e in json.loads(cache_content)] == list(range(25))
+
+
+def test_shared_dispatcher_preserves_order_per_subscriber(temp_dir: str):
+    file_store = get_file_store('local', temp_dir)
+    dispatcher = EventDispatcher(max_workers=2)
+    streams = [
+        EventStream(f'stream{i}', file_store, dispatcher=dispatcher) for i in range(5)
+    ]
+    received: dict[str, list[int]] = {}
+    done = threading.Event()
+
+    def make_callback(name: str):
+        def callback(event):
+            # Callbacks may run coroutines on the current event loop
+            asyncio.get_event_loop().run_until_complete(asyncio.sleep(0))
+            received.setdefault(name, []).append(event.id)
+            if sum(len(ids) for ids in received.values()) == 5 * 2 * 20:
+                done.set()
+
+        return callback
+
+    for i, stream in enumerate(streams):
+        stream.subscribe(EventStreamSubscriber.TEST, make_callback(f'{i}/a'), 'a')
+        stream.subscribe(EventStreamSubscriber.MAIN, make_callback(f'{i}/b'), 'b')
+    for _ in range(20):
+        for stream in streams:
+            stream.add_event(NullObservation(''), EventSource.AGENT)
+
+    assert done.wait(5)
+    for ids in received.values():
+        assert ids == list(range(20))
+    # The streams do not start any threads of their own
+    assert all(stream._queue_thread is None for stream in streams)
+    for stream in streams:
+        stream.close()
+    dispatcher.shutdown()
+
+
+def test_shared_dispatcher_async_callback_and_unsubscribe(temp_dir: str):
+    file_store = get_file_store('local', temp_dir)
+    dispatcher = EventDispatcher(max_workers=1)
+    event_stream = EventStream('abc', file_store, dispatcher=dispatcher)
+    received = []
+    errors = []
+
+    async def on_event(event):
+        received.append(event.id)
+
+    def failing_callback(event):
+        errors.append(event.id)
+        raise RuntimeError('callback error')
+
+    event_stream.subscribe(EventStreamSubscriber.TEST, on_event, 'async')
+    event_stream.subscribe(EventStreamSubscriber.MAIN, failing_callback, 'failing')
+    event_stream.add_event(NullObservation(''), EventSource.AGENT)
+    event_stream.add_event(NullObservation(''), EventSource.AGENT)
+    for _ in range(50):
+        if len(received) == 2 and len(errors) == 2:
+            break
+        time.sleep(0.05)
+    assert received == [0, 1]
+    # Errors in one callback do not stop delivery of later events
+    assert errors == [0, 1]
+
+    event_stream.unsubscribe(EventStreamSubscriber.TEST, 'async')
+    event_stream.add_event(NullObservation(''), EventSource.AGENT)
+    time.sleep(0.2)
+    assert received == [0, 1]
+    event_stream.close()
+    dispatcher.shutdown()
@@ -1,11 +1,14 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from openhands.core.config.openhands_config import OpenHandsConfig
 from openhands.storage.data_models.settings import Settings
 from openhands.storage.files import FileStore
+from openhands.storage.memory import InMemoryFileStore
 from openhands.storage.settings.file_settings_store import FileSettingsStore
+from openhands.storage.user_data_cache import UserDataCache
 
 
 @pytest.fixture
@@ -87,3 +90,85 @@ async def test_get_instance():
         assert isinstance(store, FileSettingsStore)
         assert store.file_store == mock_store
         mock_get_store.assert_called_once_with('local', '/test/path', None, None)
+
+
+@pytest.mark.asyncio
+async def test_loaded_settings_are_cached_until_stored():
+    file_store = InMemoryFileStore()
+    read = MagicMock(wraps=file_store.read)
+    file_store.read = read
+    settings_store = FileSettingsStore(file_store)
+    await settings_store.store(Settings(language='python', llm_model='model-a'))
+
+    first = await settings_store.load()
+    first.language = 'changed by the caller'
+    second = await settings_store.load()
+    assert read.call_count == 1
+    assert second.language == 'python'
+
+    await settings_store.store(Settings(language='python', llm_model='model-b'))
+    assert (await settings_store.load()).llm_model == 'model-b'
+    assert read.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_version_check_sees_writes_of_other_workers():
+    file_store = InMemoryFileStore()
+    cache = UserDataCache(version_check=True)
+    with patch('openhands.storage.settings.file_settings_store.user_data_cache', cache):
+        settings_store = FileSettingsStore(file_store)
+        await settings_store.store(Settings(llm_model='model-a'))
+        assert (await settings_store.load()).llm_model == 'model-a'
+
+        # Another worker, with its own cache, stores new settings
+        other_cache = UserDataCache(version_check=True)
+        with patch(
+            'openhands.storage.settings.file_settings_store.user_data_cache',
+            other_cache,
+        ):
+            await FileSettingsStore(file_store).store(Settings(llm_model='model-b'))
+
+        assert (await settings_store.load()).llm_model == 'model-b'
+
+
+@pytest.mark.asyncio
+async def test_cache_entries_expire():
+    cache = UserDataCache(ttl=0.01)
+    file_store = InMemoryFileStore()
+    loader = AsyncMock(return_value='value')
+
+    assert await cache.load(file_store, 'path', loader) == 'value'
+    assert await cache.load(file_store, 'path', loader) == 'value'
+    assert loader.call_count == 1
+    await asyncio.sleep(0.02)
+    await cache.load(file_store, 'path', loader)
+    assert loader.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_ignores_values_loaded_while_invalidated():
+    cache = UserDataCache()
+    file_store = InMemoryFileStore()
+    file_store.write('path', 'old')
+    loading = asyncio.Event()
+    resume = asyncio.Event()
+
+    async def slow_loader():
+        value = file_store.read('path')
+        loading.set()
+        await resume.wait()
+        return value
+
+    load = asyncio.create_task(cache.load(file_store, 'path', slow_loader))
+    await loading.wait()
+    # A save happens while the old value is being loaded
+    file_store.write('path', 'new')
+    await cache.invalidate(file_store, 'path')
+    resume.set()
+    assert await load == 'old'
+
+    async def loader():
+        return file_store.read('path')
+
+    assert await cache.load(file_store, 'path', loader) == 'new'
+    assert cache._loads == {}
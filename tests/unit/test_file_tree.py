@@ -0,0 +1,88 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from openhands.events.observation import FileReadObservation
+from openhands.runtime.utils.file_tree import FileTree
+from openhands.server.routes.files import list_files
+
+
+def _write(path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_list_directory_sorts_and_applies_gitignore(tmp_path):
+    _write(tmp_path / 'src' / 'App.py', 'x\n')
+    _write(tmp_path / 'src' / 'debug.log', 'x\n')
+    _write(tmp_path / 'build' / 'out.txt', 'x\n')
+    _write(tmp_path / 'Docs' / 'index.md', 'x\n')
+    _write(tmp_path / 'b.txt', 'x\n')
+    _write(tmp_path / 'A.txt', 'x\n')
+    _write(tmp_path / '.gitignore', 'build/\n*.log\n')
+
+    file_tree = FileTree(str(tmp_path))
+    _, entries = file_tree.list_directory(str(tmp_path))
+    assert entries == ['Docs/', 'src/', '.gitignore', 'A.txt', 'b.txt']
+    _, entries = file_tree.list_directory(str(tmp_path / 'src'))
+    assert entries == ['App.py']
+    assert file_tree.list_directory(str(tmp_path / 'missing')) is None
+    assert file_tree.list_directory(str(tmp_path / 'b.txt')) is None
+
+
+def test_list_directory_is_cached_until_the_directory_changes(tmp_path):
+    _write(tmp_path / 'a.txt', 'x\n')
+    file_tree = FileTree(str(tmp_path))
+    version, entries = file_tree.list_directory(str(tmp_path))
+    assert entries == ['a.txt']
+
+    with patch.object(FileTree, '_scan', side_effect=AssertionError('not cached')):
+        assert file_tree.list_directory(str(tmp_path)) == (version, ['a.txt'])
+
+    _write(tmp_path / 'b.txt', 'x\n')
+    # Modification times may be coarse: make sure this one is seen as a change
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    new_version, entries = file_tree.list_directory(str(tmp_path))
+    assert new_version != version
+    assert entries == ['a.txt', 'b.txt']
+
+    _write(tmp_path / '.gitignore', 'b.txt\n')
+    stat = os.stat(tmp_path / '.gitignore')
+    os.utime(tmp_path / '.gitignore', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    _, entries = file_tree.list_directory(str(tmp_path))
+    assert entries == ['.gitignore', 'a.txt']
+
+
+def _list_files_conversation(respects_gitignore: bool) -> MagicMock:
+    conversation = MagicMock()
+    conversation.sid = f'list-files-{respects_gitignore}'
+    runtime = conversation.runtime
+    runtime.list_files_respects_gitignore = respects_gitignore
+    runtime.list_files.return_value = ['node_modules/', 'src/', '.env', 'main.py']
+    runtime.run_action.return_value = FileReadObservation(
+        'node_modules/\n.env\n', path='.gitignore'
+    )
+    return conversation
+
+
+@pytest.mark.asyncio
+async def test_list_files_route_filters_for_runtimes_which_dont():
+    request = MagicMock()
+    request.headers = {}
+
+    # The runtime already left out the ignored files: .gitignore isn't read again
+    conversation = _list_files_conversation(respects_gitignore=True)
+    conversation.runtime.list_files.return_value = ['src/', 'main.py']
+    response = await list_files(request, conversation, path=None)
+    assert json.loads(response.body) == ['src/', 'main.py']
+    conversation.runtime.run_action.assert_not_called()
+
+    # Older runtime images (and other runtimes) list everything
+    conversation = _list_files_conversation(respects_gitignore=False)
+    for _ in range(2):
+        response = await list_files(request, conversation, path=None)
+        assert json.loads(response.body) == ['src/', 'main.py']
+    assert conversation.runtime.run_action.call_count == 2
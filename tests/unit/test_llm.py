@@ -12,7 +12,7 @@ from litellm.exceptions import (
 from openhands.core.config import LLMConfig
 from openhands.core.exceptions import LLMNoResponseError, OperationCancelled
 from openhands.core.message import Message, TextContent
-from openhands.llm.llm import LLM
+from openhands.llm.llm import LLM, _load_tokenizer
 from openhands.llm.metrics import Metrics, TokenUsage
 
 
@@ -760,7 +760,7 @@ def test_get_token_count_with_dict_messages(mock_token_counter, default_config):
     token_count = llm.get_token_count(messages)
 
     assert token_count == 42
-    mock_token_counter.assert_called_once_with(
+    mock_token_counter.assert_any_call(
         model=default_config.model, messages=messages, custom_tokenizer=None
     )
 
@@ -775,8 +775,8 @@ def test_get_token_count_with_message_objects(
     message_obj = Message(role='user', content=[TextContent(text='Hello!')])
     message_dict = {'role': 'user', 'content': 'Hello!'}
 
-    # Mock token counter to return different values for each call
-    mock_token_counter.side_effect = [42, 42]  # Same value for both cases
+    # Mock token counter to return the same value for every call
+    mock_token_counter.return_value = 42
 
     # Get token counts for both formats
     token_count_obj = llm.get_token_count([message_obj])
@@ -784,7 +784,8 @@ def test_get_token_count_with_message_objects(
 
     # Verify both formats get the same token count
     assert token_count_obj == token_count_dict
-    assert mock_token_counter.call_count == 2
+    # each message, and the reply priming once
+    assert mock_token_counter.call_count == 3
 
 
 @patch('openhands.llm.llm.litellm.token_counter')
@@ -795,6 +796,7 @@ def test_get_token_count_with_custom_tokenizer(
     mock_tokenizer = MagicMock()
     mock_create_tokenizer.return_value = mock_tokenizer
     mock_token_counter.return_value = 42
+    _load_tokenizer.cache_clear()
 
     config = copy.deepcopy(default_config)
     config.custom_tokenizer = 'custom/tokenizer'
@@ -805,9 +807,10 @@ def test_get_token_count_with_custom_tokenizer(
 
     assert token_count == 42
     mock_create_tokenizer.assert_called_once_with('custom/tokenizer')
-    mock_token_counter.assert_called_once_with(
+    mock_token_counter.assert_any_call(
         model=config.model, messages=messages, custom_tokenizer=mock_tokenizer
     )
+    _load_tokenizer.cache_clear()
 
 
 @patch('openhands.llm.llm.litellm.token_counter')
@@ -827,6 +830,32 @@ def test_get_token_count_error_handling(
     )
 
 
+def test_get_token_counts_are_cached_per_message(default_config):
+    import litellm
+
+    llm = LLM(default_config)
+    messages = [
+        {'role': 'system', 'content': 'You are a helpful assistant.'},
+        {'role': 'user', 'content': 'Hello!'},
+        {'role': 'assistant', 'content': 'Hi, how can I help you today?'},
+    ]
+    expected = litellm.token_counter(model=default_config.model, messages=messages)
+
+    with patch(
+        'openhands.llm.llm.litellm.token_counter', wraps=litellm.token_counter
+    ) as token_counter:
+        counts = llm.get_token_counts(messages)
+        assert len(counts) == 3 and all(count > 0 for count in counts)
+        assert llm.get_token_count(messages) == expected
+        # the reply priming, then each message
+        assert token_counter.call_count == 4
+
+        # only the new message is tokenized
+        messages.append({'role': 'user', 'content': 'Count my tokens.'})
+        assert llm.get_token_counts(messages)[:3] == counts
+        assert token_counter.call_count == 5
+
+
 @patch('openhands.llm.llm.litellm_completion')
 def test_llm_token_usage(mock_litellm_completion, default_config):
     # This mock response includes usage details with prompt_tokens,
@@ -1003,3 +1032,64 @@ def test_llm_base_url_auto_protocol_patch(mock_get):
 
     called_url = mock_get.call_args[0][0]
     assert called_url.startswith('http://') or called_url.startswith('https://')
+
+
+@patch('openhands.llm.llm.litellm_completion')
+def test_deterministic_completions_are_cached(mock_litellm_completion, tmp_path):
+    from litellm.types.utils import ModelResponse
+
+    from openhands.llm.response_cache import LLM_RESPONSE_CACHE_LOOKUPS
+
+    mock_litellm_completion.return_value = ModelResponse(
+        choices=[{'message': {'role': 'assistant', 'content': 'A title'}}],
+        usage={'prompt_tokens': 10, 'completion_tokens': 2, 'total_tokens': 12},
+    )
+    config = LLMConfig(
+        model='gpt-4o',
+        api_key='test_key',
+        temperature=0,
+        cache_responses=True,
+        response_cache_dir=str(tmp_path),
+    )
+    llm = LLM(config=config)
+    messages = [{'role': 'user', 'content': 'Name this conversation'}]
+    disk_hits = LLM_RESPONSE_CACHE_LOOKUPS.labels('gpt-4o', 'disk_hit').get()
+
+    llm.completion(messages=messages)
+    response = llm.completion(messages=messages)
+    assert response.choices[0].message.content == 'A title'
+    assert mock_litellm_completion.call_count == 1
+    # The cached response didn't cost tokens again
+    assert llm.metrics.accumulated_token_usage.prompt_tokens == 10
+
+    # Sampling parameters are part of the key
+    llm.completion(messages=messages, max_tokens=5)
+    assert mock_litellm_completion.call_count == 2
+
+    # Completions which aren't deterministic are only cached when marked cacheable
+    llm.completion(messages=messages, temperature=0.7)
+    llm.completion(messages=messages, temperature=0.7)
+    assert mock_litellm_completion.call_count == 4
+    llm.completion(messages=messages, temperature=0.7, cacheable=True)
+    llm.completion(messages=messages, temperature=0.7, cacheable=True)
+    assert mock_litellm_completion.call_count == 5
+
+    # Responses are also on disk, for other processes
+    llm._response_cache.clear()
+    response = LLM(config=config).completion(messages=messages)
+    assert response.choices[0].message.content == 'A title'
+    assert mock_litellm_completion.call_count == 5
+    assert (
+        LLM_RESPONSE_CACHE_LOOKUPS.labels('gpt-4o', 'disk_hit').get() == disk_hits + 1
+    )
+
+
+@patch('openhands.llm.llm.litellm_completion')
+def test_completions_are_not_cached_by_default(mock_litellm_completion, default_config):
+    mock_litellm_completion.return_value = {
+        'choices': [{'message': {'content': 'Test response'}}]
+    }
+    llm = LLM(config=default_config)
+    for _ in range(2):
+        llm.completion(messages=[{'role': 'user', 'content': 'Hello!'}])
+    assert mock_litellm_completion.call_count == 2
@@ -1,4 +1,5 @@
 import os
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
@@ -6,7 +7,15 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from starlette.middleware.cors import CORSMiddleware
 
-from openhands.server.middleware import LocalhostCORSMiddleware
+from openhands.server.middleware import (
+    DEFAULT_ROUTE_LIMITS,
+    InMemoryRateLimiter,
+    InMemoryRateLimiterBackend,
+    LocalhostCORSMiddleware,
+    RateLimit,
+    RateLimitMiddleware,
+    RouteRateLimit,
+)
 
 
 @pytest.fixture
@@ -118,3 +127,104 @@ def test_localhost_cors_middleware_cors_parameters():
         assert kwargs['allow_credentials'] is True
         assert kwargs['allow_methods'] == ['*']
         assert kwargs['allow_headers'] == ['*']
+
+
+@pytest.mark.asyncio
+async def test_in_memory_rate_limiter_backend_allows_burst_then_limits():
+    """Test that the GCRA backend allows a burst and then enforces the rate."""
+    backend = InMemoryRateLimiterBackend()
+    limit = RateLimit(requests=2, seconds=1, burst=4)
+    now = 1000.0
+    with patch('openhands.server.middleware.time.monotonic', lambda: now):
+        for _ in range(4):
+            assert await backend.hit('client', limit) == 0
+        retry_after = await backend.hit('client', limit)
+        assert retry_after == pytest.approx(0.5)
+
+        # Once the emission interval passes, one more request is allowed
+        now += 0.5
+        assert await backend.hit('client', limit) == 0
+        assert await backend.hit('client', limit) > 0
+
+        # Other clients are unaffected
+        assert await backend.hit('other', limit) == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_rate_limiter_backend_evicts_idle_keys():
+    """Test that state is bounded by evicting least recently seen keys."""
+    backend = InMemoryRateLimiterBackend(max_keys=3)
+    limit = RateLimit(requests=1, seconds=1)
+    for key in ('a', 'b', 'c', 'a', 'd'):
+        await backend.hit(key, limit)
+    assert list(backend._tats) == ['c', 'a', 'd']
+
+
+def test_rate_limit_middleware_route_limits(app):
+    """Test that per-route limits apply separately from the default limit."""
+
+    @app.post('/novel/write')
+    def write():
+        return {'message': 'written'}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        rate_limiter=InMemoryRateLimiter(
+            requests=100,
+            seconds=1,
+            route_limits=[
+                RouteRateLimit(
+                    '/novel/write', RateLimit(requests=1, seconds=60, burst=2)
+                )
+            ],
+        ),
+    )
+    client = TestClient(app)
+
+    assert client.post('/novel/write').status_code == 200
+    assert client.post('/novel/write').status_code == 200
+    response = client.post('/novel/write')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == 60
+
+    # The default limit for other routes is unaffected
+    assert client.get('/test').status_code == 200
+
+
+def test_route_rate_limit_methods():
+    """Test that route limits can be restricted to some HTTP methods."""
+    route_limit = RouteRateLimit(
+        '/api/conversations',
+        RateLimit(requests=1, seconds=1),
+        methods=frozenset({'POST'}),
+    )
+    url = SimpleNamespace(path='/api/conversations')
+    assert route_limit.matches(SimpleNamespace(method='POST', url=url))
+    assert not route_limit.matches(SimpleNamespace(method='GET', url=url))
+
+
+def test_conversation_creation_limit_is_exact(app):
+    """Test that the conversation creation limit doesn't apply to nested routes."""
+
+    @app.post('/api/conversations')
+    def create_conversation():
+        return {'message': 'created'}
+
+    @app.post('/api/conversations/{conversation_id}/events')
+    def add_event(conversation_id: str):
+        return {'message': 'added'}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        rate_limiter=InMemoryRateLimiter(
+            requests=100, seconds=1, route_limits=DEFAULT_ROUTE_LIMITS
+        ),
+    )
+    client = TestClient(app)
+
+    # Many more events than the conversations which can be created in a minute
+    for _ in range(20):
+        assert client.post('/api/conversations/abc/events').status_code == 200
+
+    statuses = [client.post('/api/conversations').status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
@@ -41,10 +41,18 @@ def create_mock_response(
 ) -> MagicMock:
     """Helper function to create a mock HTTP response."""
     mock_response = MagicMock()
+    mock_response.status_code = 200
     mock_response.json.return_value = {'events': events, 'has_more': has_more}
     return mock_response
 
 
+@pytest.fixture
+def mock_get():
+    """Mock the GET requests of the client shared by the nested event stores."""
+    with patch('openhands.events.nested_event_store._get_client') as mock_client:
+        yield mock_client.return_value.get
+
+
 class TestNestedEventStore:
     """Tests for the NestedEventStore class."""
 
@@ -58,7 +66,6 @@ class TestNestedEventStore:
             session_api_key='test-api-key',
         )
 
-    @patch('httpx.get')
     def test_search_events_basic(self, mock_get, event_store):
         """Test basic event retrieval without filters."""
         # Setup mock response with two events
@@ -78,11 +85,10 @@ class TestNestedEventStore:
 
         # Verify the API call
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=False',
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_with_limit(self, mock_get, event_store):
         """Test event retrieval with a limit."""
         # Setup mock response
@@ -105,7 +111,6 @@ class TestNestedEventStore:
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_with_start_id(self, mock_get, event_store):
         """Test event retrieval with a specific start_id."""
         # Setup mock response
@@ -125,11 +130,10 @@ class TestNestedEventStore:
 
         # Verify the API call includes the correct start_id
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=5&reverse=False',
+            'http://test-api.example.com/events?start_id=5&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_reverse_order(self, mock_get, event_store):
         """Test event retrieval in reverse order."""
         # Setup mock response
@@ -149,11 +153,10 @@ class TestNestedEventStore:
 
         # Verify the API call includes reverse=True
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=True',
+            'http://test-api.example.com/events?start_id=0&reverse=True&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_with_end_id(self, mock_get, event_store):
         """Test event retrieval with a specific end_id."""
         # Setup mock response
@@ -175,11 +178,10 @@ class TestNestedEventStore:
 
         # Verify the API call
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=False',
+            'http://test-api.example.com/events?start_id=0&end_id=3&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     @patch('openhands.events.event_filter.EventFilter.exclude')
     def test_search_events_with_filter(self, mock_exclude, mock_get, event_store):
         """Test event retrieval with an EventFilter."""
@@ -208,11 +210,10 @@ class TestNestedEventStore:
 
         # Verify the API call
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=False',
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_with_source_filter(self, mock_get, event_store):
         """Test event retrieval with a source filter."""
         # Setup mock response with mixed sources
@@ -238,11 +239,10 @@ class TestNestedEventStore:
 
         # Verify the API call
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=False',
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_with_type_filter(self, mock_get, event_store):
         """Test event retrieval with a type filter."""
         # Setup mock response with different event types
@@ -274,11 +274,10 @@ class TestNestedEventStore:
 
         # Verify the API call
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=False',
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_pagination(self, mock_get, event_store):
         """Test event retrieval with pagination (has_more=True)."""
         # Setup first page response
@@ -312,16 +311,15 @@ class TestNestedEventStore:
         assert mock_get.call_count == 2
         # First call with start_id=0
         mock_get.assert_any_call(
-            'http://test-api.example.com/events?start_id=0&reverse=False',
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
         # Second call with start_id=3 (after processing events with IDs 1 and 2)
         mock_get.assert_any_call(
-            'http://test-api.example.com/events?start_id=3&reverse=False',
+            'http://test-api.example.com/events?start_id=3&reverse=False&limit=1000',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
 
-    @patch('httpx.get')
     def test_search_events_no_session_api_key(self, mock_get):
         """Test event retrieval without a session API key."""
         # Create event store without session_api_key
@@ -343,10 +341,10 @@ class TestNestedEventStore:
 
         # Verify the API call has no headers
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=False', headers={}
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=1000',
+            headers={},
         )
 
-    @patch('httpx.get')
     def test_search_events_with_query_filter(self, mock_get, event_store):
         """Test event retrieval with a text query filter."""
         # Setup mock response with different content
@@ -370,6 +368,75 @@ class TestNestedEventStore:
 
         # Verify the API call
         mock_get.assert_called_once_with(
-            'http://test-api.example.com/events?start_id=0&reverse=False',
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=1000',
+            headers={'X-Session-API-Key': 'test-api-key'},
+        )
+
+    def test_search_events_reverse_pagination(self, mock_get, event_store):
+        """Test that pages in reverse order continue before the last event read."""
+        first_response = create_mock_response(
+            [create_mock_event(4, 'Data'), create_mock_event(3, 'More')],
+            has_more=True,
+        )
+        second_response = create_mock_response(
+            [create_mock_event(2, 'World'), create_mock_event(1, 'Hello')]
+        )
+        mock_get.side_effect = [first_response, second_response]
+
+        events = list(event_store.search_events(reverse=True))
+
+        assert [event.id for event in events] == [4, 3, 2, 1]
+        mock_get.assert_called_with(
+            'http://test-api.example.com/events?start_id=0&end_id=2&reverse=True&limit=1000',
+            headers={'X-Session-API-Key': 'test-api-key'},
+        )
+
+    def test_search_events_legacy_page_size(self, mock_get, event_store):
+        """Test that pages are made smaller for servers which reject larger ones."""
+        rejected = MagicMock()
+        rejected.status_code = 400
+        mock_get.side_effect = [
+            rejected,
+            create_mock_response([create_mock_event(1, 'Hello')]),
+        ]
+
+        events = list(event_store.search_events())
+
+        assert len(events) == 1
+        assert event_store.page_size == 100
+        mock_get.assert_called_with(
+            'http://test-api.example.com/events?start_id=0&reverse=False&limit=100',
+            headers={'X-Session-API-Key': 'test-api-key'},
+        )
+
+    def test_get_event_and_latest_event_id(self, mock_get, event_store):
+        """Test the endpoints for single events, and the fallback for older servers."""
+        event_response = MagicMock()
+        event_response.status_code = 200
+        event_response.json.return_value = create_mock_event(5, 'Hello')
+        latest_id_response = MagicMock()
+        latest_id_response.status_code = 200
+        latest_id_response.json.return_value = {'id': 7}
+        no_event = MagicMock()
+        no_event.status_code = 404
+        no_event.json.return_value = {'error': 'no_event'}
+        unknown_route = MagicMock()
+        unknown_route.status_code = 404
+        unknown_route.json.return_value = {'detail': 'Not Found'}
+        mock_get.side_effect = [
+            event_response,
+            latest_id_response,
+            no_event,
+            unknown_route,
+            create_mock_response([create_mock_event(9, 'Latest')]),
+        ]
+
+        assert event_store.get_event(5).id == 5
+        assert event_store.get_latest_event_id() == 7
+        with pytest.raises(FileNotFoundError):
+            event_store.get_event(6)
+        assert event_store.get_latest_event_id() == 9
+        mock_get.assert_called_with(
+            'http://test-api.example.com/events?start_id=0&reverse=True&limit=1',
             headers={'X-Session-API-Key': 'test-api-key'},
         )
@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pytest
+
+from openhands.core.novel_chapter_pipeline import (
+    CHAPTER_TEMPLATE,
+    ChapterPipeline,
+    is_chapter_request,
+    parse_chapter_outline,
+)
+from openhands.core.novel_writing_config import NovelWritingConfig
+from openhands.events.action import MessageAction
+
+OUTLINE = {
+    'title': 'Hujan',
+    'scenes': [
+        {'title': 'Pagi', 'summary': 'Sari bangun.'},
+        {'title': 'Siang', 'summary': 'Sari pergi.'},
+        {'title': 'Malam', 'summary': 'Sari pulang.'},
+    ],
+}
+
+
+class FakeLLM:
+    def __init__(self, fail_scene: int | None = None):
+        self.fail_scene = fail_scene
+        self.calls: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def complete(self, messages, max_tokens):
+        prompt = messages[0]['content']
+        if 'JSON' in prompt:
+            self.calls.append('outline')
+            yield json.dumps(OUTLINE)[:10]
+            yield json.dumps(OUTLINE)[10:]
+            return
+        scene = next(
+            i for i, s in enumerate(OUTLINE['scenes']) if f'"{s["title"]}"' in prompt
+        )
+        self.calls.append(f'scene {scene}')
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            for word in ('Adegan ', str(scene)):
+                await asyncio.sleep(0.01)
+                if scene == self.fail_scene:
+                    raise RuntimeError('rate limited')
+                yield word
+        finally:
+            self.running -= 1
+
+
+async def _run(pipeline, checkpoint=None):
+    events = []
+    async for event in pipeline.run('Tulis bab tentang hujan.', checkpoint):
+        events.append(event)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_scenes_are_drafted_concurrently_and_merged():
+    llm = FakeLLM()
+    saved = []
+
+    async def save(checkpoint):
+        saved.append(json.loads(json.dumps(checkpoint)))
+
+    events = await _run(ChapterPipeline(llm.complete, save))
+
+    assert llm.max_running == 3
+    assert events[-1] == {
+        'type': 'chapter',
+        'title': 'Hujan',
+        'content': 'Adegan 0\n\n* * *\n\nAdegan 1\n\n* * *\n\nAdegan 2',
+    }
+    deltas = [e for e in events if e['type'] == 'delta' and e['stage'] == 'scene']
+    assert len(deltas) == 6
+    # The outline, each scene, and the merge were checkpointed
+    assert len(saved) == 5
+    assert saved[-1]['content'] == events[-1]['content']
+
+
+@pytest.mark.asyncio
+async def test_failed_chapter_is_resumed_from_its_checkpoint():
+    checkpoints = []
+
+    async def save(checkpoint):
+        checkpoints.append(json.loads(json.dumps(checkpoint)))
+
+    config = NovelWritingConfig(chapter_scene_concurrency=1)
+    failing = FakeLLM(fail_scene=1)
+    with pytest.raises(RuntimeError):
+        await _run(ChapterPipeline(failing.complete, save, config))
+    # The scene after the failed one was still drafted
+    assert failing.calls == ['outline', 'scene 0', 'scene 1', 'scene 2']
+    assert sorted(checkpoints[-1]['scenes']) == ['0', '2']
+
+    llm = FakeLLM()
+    events = await _run(ChapterPipeline(llm.complete, save, config), checkpoints[-1])
+    assert llm.calls == ['scene 1']
+    assert events[-1]['content'].count('Adegan') == 3
+    assert events[0] == {'type': 'stage', 'stage': 'outline', 'resumed': True}
+
+
+def test_parse_chapter_outline():
+    text = 'Berikut rencananya:\n```json\n' + json.dumps(OUTLINE) + '\n```'
+    assert parse_chapter_outline(text, 2) == {
+        'title': 'Hujan',
+        'scenes': OUTLINE['scenes'][:2],
+    }
+    outline = parse_chapter_outline('1. Sari bangun.\n\n2. Sari pergi.', 8)
+    assert [scene['summary'] for scene in outline['scenes']] == [
+        'Sari bangun.',
+        'Sari pergi.',
+    ]
+    with pytest.raises(ValueError):
+        parse_chapter_outline('  \n', 8)
+
+
+def test_is_chapter_request():
+    assert is_chapter_request(
+        MessageAction('Bab 1', novel_mode=True, template_used=CHAPTER_TEMPLATE)
+    )
+    assert not is_chapter_request(MessageAction('Bab 1', novel_mode=True))
+    assert not is_chapter_request(
+        MessageAction('Bab 1', template_used=CHAPTER_TEMPLATE)
+    )
+    assert not is_chapter_request(object())
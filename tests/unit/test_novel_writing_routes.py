@@ -0,0 +1,173 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from openhands.memory.condenser.impl.story_bible_condenser import StoryBible
+from openhands.server.chat_session_store import ChatSessionStore
+from openhands.server.routes import novel_writing
+from openhands.server.routes.novel_writing import (
+    NovelChapterRequest,
+    _novel_context_messages,
+    _update_story_bible,
+    novel_chapter,
+)
+from openhands.storage.memory import InMemoryFileStore
+
+
+def _messages(count):
+    roles = ('user', 'assistant')
+    return [{'role': roles[i % 2], 'content': f'Pesan {i}'} for i in range(count)]
+
+
+@pytest.fixture
+def novel_sessions(monkeypatch):
+    sessions = ChatSessionStore('novel-test', InMemoryFileStore())
+    monkeypatch.setattr(novel_writing, 'NOVEL_SESSIONS', sessions)
+    return sessions
+
+
+def test_novel_context_messages_without_story_bible():
+    # The last message is the one being answered, which the caller adds
+    session = {'messages': _messages(11)}
+    messages = _novel_context_messages(session, 'Sistem')
+
+    assert messages[0] == {'role': 'system', 'content': 'Sistem'}
+    # Capped at the most recent messages
+    assert [msg['content'] for msg in messages[1:]] == [
+        'Pesan 6',
+        'Pesan 7',
+        'Pesan 8',
+        'Pesan 9',
+    ]
+
+
+def test_novel_context_messages_with_story_bible():
+    story_bible = StoryBible(characters='Sari', plot_state='Sari pergi.')
+    session = {
+        'messages': _messages(7),
+        'story_bible': story_bible.model_dump(),
+        'story_bible_through': 5,
+    }
+    messages = _novel_context_messages(session, 'Sistem')
+
+    assert messages[0]['content'] == f'Sistem\n\n{story_bible}'
+    # The last exchange is sent even though the story bible covers it
+    assert [msg['content'] for msg in messages[1:]] == ['Pesan 4', 'Pesan 5']
+
+
+def test_novel_context_messages_keep_the_end_of_long_messages():
+    session = {
+        'messages': [
+            {'role': 'assistant', 'content': 'a' * 9000 + 'b'},
+            {'role': 'user', 'content': 'Lanjut'},
+        ]
+    }
+    messages = _novel_context_messages(session, 'Sistem')
+    assert len(messages[1]['content']) == 8000
+    assert messages[1]['content'].endswith('b')
+
+
+@pytest.mark.asyncio
+async def test_update_story_bible(novel_sessions):
+    previous = StoryBible(characters='Sari', locations='Jakarta')
+    async with novel_sessions.edit('s1', dict) as session:
+        session.update(
+            {
+                'messages': _messages(4),
+                'story_bible': previous.model_dump(),
+                'story_bible_through': 2,
+            }
+        )
+    completion = AsyncMock(return_value=json.dumps({'plot_state': 'Sari pulang.'}))
+
+    with patch.object(novel_writing, '_openrouter_completion', completion):
+        await _update_story_bible('s1', 'key')
+
+    # Only the messages the story bible doesn't cover are sent, with the story bible
+    prompt = completion.call_args.args[1]['messages'][0]['content']
+    assert 'Jakarta' in prompt
+    assert 'Pesan 2' in prompt and 'Pesan 3' in prompt
+    assert 'Pesan 1' not in prompt
+
+    session = await novel_sessions.get('s1')
+    assert session['story_bible_through'] == 4
+    assert StoryBible(**session['story_bible']) == StoryBible(
+        characters='Sari', locations='Jakarta', plot_state='Sari pulang.'
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_story_bible_of_a_session_changed_meanwhile(novel_sessions):
+    async with novel_sessions.edit('s1', dict) as session:
+        session.update({'messages': _messages(4)})
+
+    async def completion(api_key, payload):
+        # The session is started over while the story bible is being updated
+        async with novel_sessions.edit('s1', dict) as session:
+            session['messages'] = _messages(1)
+        return json.dumps({'characters': 'Sari'})
+
+    with patch.object(novel_writing, '_openrouter_completion', completion):
+        await _update_story_bible('s1', 'key')
+
+    session = await novel_sessions.get('s1')
+    assert 'story_bible' not in session
+    assert session.get('story_bible_through', 0) == 0
+
+
+async def _write_chapter(request, calls):
+    async def complete(messages, max_tokens):
+        calls.append(messages)
+        if 'JSON' in messages[0]['content']:
+            yield json.dumps(
+                {'title': 'Hujan', 'scenes': [{'title': 'Pagi', 'summary': 'Sari.'}]}
+            )
+        else:
+            yield 'Adegan pagi.'
+
+    with (
+        patch.object(
+            novel_writing,
+            '_openrouter_completion_stream',
+            lambda client, api_key, model: complete,
+        ),
+        patch.object(novel_writing, '_schedule_story_bible_update'),
+    ):
+        response = await novel_chapter(request)
+        return [
+            json.loads(chunk[len('data: ') :]) async for chunk in response.body_iterator
+        ]
+
+
+@pytest.mark.asyncio
+async def test_written_chapters_are_only_kept_in_the_history(novel_sessions):
+    request = NovelChapterRequest(
+        message='Bab 1', session_id='s1', chapter_id='c1', api_key='key'
+    )
+    calls = []
+    events = await _write_chapter(request, calls)
+    assert events[-1]['type'] == 'chapter'
+    assert events[-1]['content'] == 'Adegan pagi.'
+    assert len(calls) == 2
+
+    session = await novel_sessions.get('s1')
+    assert [msg['content'] for msg in session['messages']] == ['Bab 1', 'Adegan pagi.']
+    # The checkpoint doesn't hold the chapter a second time
+    assert set(session['chapters']['c1']) == {'request', 'title', 'content_sha256'}
+
+    # The same request sends the chapter again, without writing or recording it again
+    events = await _write_chapter(request, calls)
+    assert [event['type'] for event in events] == ['start', 'chapter']
+    assert events[-1]['title'] == 'Hujan'
+    assert events[-1]['content'] == 'Adegan pagi.'
+    assert len(calls) == 2
+    assert len((await novel_sessions.get('s1'))['messages']) == 2
+
+    # A chapter which is no longer in the history is written again
+    async with novel_sessions.edit('s1', dict) as session:
+        session['messages'] = []
+    events = await _write_chapter(request, calls)
+    assert events[-1]['content'] == 'Adegan pagi.'
+    assert len(calls) == 4
+    assert len((await novel_sessions.get('s1'))['messages']) == 2
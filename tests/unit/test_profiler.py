@@ -0,0 +1,120 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from openhands.events import EventSource, EventStream, EventStreamSubscriber
+from openhands.events.action import CmdRunAction
+from openhands.events.observation import CmdOutputObservation
+from openhands.storage import get_file_store
+from openhands.utils import profiler
+from openhands.utils.profiler import (
+    get_profile,
+    profile_callback,
+    profile_span,
+    profile_step,
+)
+
+
+@pytest.fixture
+def profiling_enabled(monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILE_AGENT_STEPS', True)
+    monkeypatch.setattr(profiler, '_profiles', profiler.OrderedDict())
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'Timed out'
+        time.sleep(0.01)
+
+
+def test_disabled_profiling_records_nothing():
+    callback = print
+    assert profile_callback('sid', 'test', callback) is callback
+    event_stream = MagicMock()
+    event_stream.sid = 'sid'
+    assert profile_step(event_stream) is profile_span('span')
+    with profile_step(event_stream):
+        with profile_span('span'):
+            pass
+    assert get_profile('sid') is None
+
+
+def test_step_spans_follow_events_across_threads(profiling_enabled, tmp_path):
+    file_store = get_file_store('local', str(tmp_path))
+    event_stream = EventStream('profiled', file_store)
+    delivered = []
+
+    def on_event(event):
+        if isinstance(event, CmdRunAction):
+            with profile_span('run_action'):
+                obs = CmdOutputObservation('', command='ls', command_id=event.id)
+                event_stream.add_event(obs, EventSource.ENVIRONMENT)
+        delivered.append(event)
+
+    event_stream.subscribe(EventStreamSubscriber.RUNTIME, on_event, 'test')
+    try:
+        with profile_step(event_stream, iteration=0):
+            with profile_span('llm_completion'):
+                pass
+            event_stream.add_event(CmdRunAction('ls'), EventSource.AGENT)
+        _wait_for(lambda: len(delivered) == 2)
+        profile = get_profile('profiled')
+        _wait_for(
+            lambda: sum(s.name == 'deliver_event' for s in profile.get_spans()) == 2
+        )
+    finally:
+        event_stream.close()
+
+    spans = profile.get_spans()
+    by_id = {span.span_id: span for span in spans}
+    (step,) = [span for span in spans if span.name == 'agent_step']
+    assert step.parent_id is None and step.step == 0
+    assert all(span.step == 0 for span in spans)
+
+    def path(span):
+        names = []
+        while span.parent_id:
+            span = by_id[span.parent_id]
+            names.append(span.name)
+        return names
+
+    (run_action,) = [span for span in spans if span.name == 'run_action']
+    assert path(run_action) == ['deliver_event', 'add_event', 'agent_step']
+    persist = [span for span in spans if span.name == 'persist_event']
+    assert len(persist) == 2
+    assert path(persist[1]) == [
+        'add_event',
+        'run_action',
+        'deliver_event',
+        'add_event',
+        'agent_step',
+    ]
+
+    summary = profile.summary()
+    assert summary['spans']['add_event']['count'] == 2
+    assert summary['steps'][0]['iteration'] == 0
+    assert 'llm_completion' in summary['steps'][0]['spans']
+
+    chrome = profile.to_chrome_trace()
+    complete_events = [e for e in chrome['traceEvents'] if e['ph'] == 'X']
+    assert len(complete_events) == len(spans)
+    assert all(e['dur'] >= 0 for e in complete_events)
+
+    otlp_spans = profile.to_otlp()['resourceSpans'][0]['scopeSpans'][0]['spans']
+    assert len(otlp_spans) == len(spans)
+    assert {span['traceId'] for span in otlp_spans} == {profile.trace_id}
+    assert sum('parentSpanId' not in span for span in otlp_spans) == 1
+
+
+def test_profiles_are_kept_for_recent_conversations(profiling_enabled, monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILE_MAX_CONVERSATIONS', 2)
+    for sid in ('a', 'b', 'c'):
+        event_stream = MagicMock()
+        event_stream.sid = sid
+        with profile_step(event_stream):
+            pass
+    assert get_profile('a') is None
+    assert get_profile('b') is not None
+    assert get_profile('c') is not None
@@ -0,0 +1,83 @@
+import threading
+
+from openhands.core.schema import AgentState
+from openhands.events import EventSource
+from openhands.events.observation import AgentStateChangedObservation
+from openhands.server.monitoring import PrometheusMonitoringListener
+from openhands.utils.prometheus import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+def test_histogram_aggregates_observations_from_all_threads():
+    registry = MetricsRegistry()
+    histogram = Histogram(
+        'test_seconds', 'Test latency', ['kind'], buckets=(0.1, 1), registry=registry
+    )
+
+    def observe():
+        for _ in range(1000):
+            histogram.labels('a').observe(0.05)
+            histogram.labels('a').observe(0.5)
+            histogram.labels('b').observe(5)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == [
+        '# HELP test_seconds Test latency',
+        '# TYPE test_seconds histogram',
+    ]
+    assert 'test_seconds_bucket{kind="a",le="0.1"} 4000' in lines
+    assert 'test_seconds_bucket{kind="a",le="1"} 8000' in lines
+    assert 'test_seconds_bucket{kind="a",le="+Inf"} 8000' in lines
+    assert 'test_seconds_count{kind="a"} 8000' in lines
+    assert 'test_seconds_bucket{kind="b",le="1"} 0' in lines
+    assert 'test_seconds_sum{kind="b"} 20000' in lines
+
+
+def test_counters_and_gauges():
+    registry = MetricsRegistry()
+    counter = Counter('test_total', 'Test counter', ['name'], registry=registry)
+    gauge = Gauge('test_gauge', 'Test gauge', registry=registry)
+    function_gauge = Gauge('test_function', 'Test function gauge', registry=registry)
+
+    counter.labels('quote"d').inc()
+    counter.labels('quote"d').inc(2)
+    gauge.inc(5)
+    gauge.dec(2)
+    function_gauge.set_function(lambda: 7)
+    lines = registry.render().splitlines()
+    assert 'test_total{name="quote\\"d"} 3' in lines
+    assert 'test_gauge 3' in lines
+    assert 'test_function 7' in lines
+
+    gauge.set(10)
+    gauge.inc()
+    assert 'test_gauge 11' in registry.render().splitlines()
+
+
+def test_prometheus_monitoring_listener():
+    listener = PrometheusMonitoringListener()
+    event = AgentStateChangedObservation('', AgentState.RUNNING)
+    event._source = EventSource.ENVIRONMENT
+    listener.on_session_event(event)
+    listener.on_agent_session_start(True, 0.2)
+    listener.on_create_conversation()
+
+    lines = REGISTRY.render().splitlines()
+    assert (
+        'openhands_session_events_total{source="environment",type="AgentStateChangedObservation"} 1'
+        in lines
+    )
+    assert 'openhands_agent_session_start_seconds_count{success="true"} 1' in lines
+    assert 'openhands_conversations_created_total 1' in lines
+    assert any(line.startswith('openhands_threads ') for line in lines)
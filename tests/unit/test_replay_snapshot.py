@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+from openhands.core.schema import AgentState
+from openhands.events import EventSource, EventStream
+from openhands.events.action import MessageAction, NullAction
+from openhands.events.async_event_store_wrapper import AsyncEventStoreWrapper
+from openhands.events.observation import NullObservation
+from openhands.events.observation.agent import AgentStateChangedObservation
+from openhands.server.replay_snapshot import ReplaySnapshotCache, chunk_events
+from openhands.storage.memory import InMemoryFileStore
+
+
+def _create_stream(num_messages: int) -> EventStream:
+    event_stream = EventStream('abc', InMemoryFileStore({}))
+    for i in range(num_messages):
+        event_stream.add_event(MessageAction(f'message {i}'), EventSource.USER)
+        event_stream.add_event(NullObservation(''), EventSource.AGENT)
+    return event_stream
+
+
+@pytest.mark.asyncio
+async def test_async_event_store_wrapper_reads_in_pages():
+    event_stream = _create_stream(30)
+    events = [e async for e in AsyncEventStoreWrapper(event_stream, page_size=7)]
+    assert [e.id for e in events] == list(range(60))
+    events = [e async for e in AsyncEventStoreWrapper(event_stream, 55, page_size=5)]
+    assert [e.id for e in events] == list(range(55, 60))
+
+
+@pytest.mark.asyncio
+async def test_snapshot_filters_events():
+    event_stream = _create_stream(3)
+    event_stream.add_event(NullAction(), EventSource.AGENT)
+    event_stream.add_event(
+        AgentStateChangedObservation('', AgentState.RUNNING), EventSource.ENVIRONMENT
+    )
+    event_stream.add_event(
+        AgentStateChangedObservation('', AgentState.AWAITING_USER_INPUT),
+        EventSource.ENVIRONMENT,
+    )
+
+    snapshot = await ReplaySnapshotCache().get_snapshot(event_stream)
+    events, agent_state_changed = snapshot.since(-1)
+
+    assert [e['id'] for e in events] == [0, 2, 4]
+    assert agent_state_changed['id'] == 8
+    assert agent_state_changed['extras']['agent_state'] == 'awaiting_user_input'
+    assert snapshot.last_event_id == 8
+
+
+@pytest.mark.asyncio
+async def test_snapshot_since_latest_event_id():
+    event_stream = _create_stream(5)
+    event_stream.add_event(
+        AgentStateChangedObservation('', AgentState.RUNNING), EventSource.ENVIRONMENT
+    )
+    snapshot = await ReplaySnapshotCache().get_snapshot(event_stream)
+
+    events, agent_state_changed = snapshot.since(5)
+    assert [e['id'] for e in events] == [6, 8]
+    assert agent_state_changed['id'] == 10
+
+    events, agent_state_changed = snapshot.since(10)
+    assert events == []
+    assert agent_state_changed is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_reads_only_the_tail():
+    event_stream = _create_stream(5)
+    cache = ReplaySnapshotCache()
+    snapshot = await cache.get_snapshot(event_stream)
+    assert snapshot.last_event_id == 9
+
+    event_stream.add_event(MessageAction('new message'), EventSource.USER)
+    searched_from = []
+    search_events = event_stream.search_events
+
+    def spy(start_id=0, *args, **kwargs):
+        searched_from.append(start_id)
+        return search_events(start_id, *args, **kwargs)
+
+    event_stream.search_events = spy
+    snapshot = await cache.get_snapshot(event_stream)
+
+    assert searched_from == [10]
+    events, _ = snapshot.since(-1)
+    assert [e['id'] for e in events] == [0, 2, 4, 6, 8, 10]
+    assert events[-1]['message'] == 'new message'
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_is_bounded():
+    cache = ReplaySnapshotCache(max_entries=2)
+    for sid in ('a', 'b', 'c'):
+        event_stream = EventStream(sid, InMemoryFileStore({}))
+        event_stream.add_event(MessageAction('hi'), EventSource.USER)
+        await cache.get_snapshot(event_stream)
+    assert [key[1] for key in cache._snapshots] == ['b', 'c']
+
+    cache.invalidate('b')
+    assert [key[1] for key in cache._snapshots] == ['c']
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_is_bounded_in_bytes():
+    cache = ReplaySnapshotCache()
+    snapshots = {}
+    for sid in ('a', 'b', 'c'):
+        event_stream = EventStream(sid, InMemoryFileStore({}))
+        event_stream.add_event(MessageAction('x' * 1000), EventSource.USER)
+        snapshots[sid] = await cache.get_snapshot(event_stream)
+    size = snapshots['a'].size
+    assert size > 1000
+    assert cache.memory_bytes == 3 * size
+
+    # The least recently used snapshots are evicted to fit in the budget
+    cache.max_bytes = 2 * size
+    event_stream = EventStream('d', InMemoryFileStore({}))
+    event_stream.add_event(MessageAction('x' * 1000), EventSource.USER)
+    await cache.get_snapshot(event_stream)
+    assert [key[1] for key in cache._snapshots] == ['c', 'd']
+    assert cache.memory_bytes == 2 * size
+
+    # A snapshot larger than the budget is not kept
+    event_stream.add_event(MessageAction('x' * 3000), EventSource.USER)
+    snapshot = await cache.get_snapshot(event_stream)
+    assert [e['id'] for e in snapshot.since(-1)[0]] == [0, 1]
+    assert [key[1] for key in cache._snapshots] == ['c']
+    assert cache.memory_bytes == size
+
+    cache.invalidate('c')
+    assert cache.memory_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_reads_the_latest_event_id_off_the_event_loop():
+    event_stream = _create_stream(1)
+    threads = []
+    get_latest_event_id = event_stream.get_latest_event_id
+
+    def spy():
+        threads.append(threading.get_ident())
+        return get_latest_event_id()
+
+    event_stream.get_latest_event_id = spy
+    await ReplaySnapshotCache().get_snapshot(event_stream)
+    assert threads and threading.get_ident() not in threads
+
+
+def test_chunk_events():
+    events = [{'id': i} for i in range(250)]
+    chunks = chunk_events(events, 100)
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    assert chunk_events([], 100) == []
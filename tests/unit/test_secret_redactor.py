@@ -0,0 +1,49 @@
+from openhands.utils.secret_redactor import SecretRedactor
+
+
+def test_redact_replaces_all_secrets():
+    redactor = SecretRedactor(['token-1', 'token-2'])
+    assert (
+        redactor.redact('a token-1 b token-2 c token-1')
+        == 'a <secret_hidden> b <secret_hidden> c <secret_hidden>'
+    )
+
+
+def test_redact_prefers_longest_secret():
+    redactor = SecretRedactor(['abc', 'abcdef'])
+    assert redactor.redact('xabcdefx abc') == 'x<secret_hidden>x <secret_hidden>'
+
+
+def test_redact_escapes_special_characters():
+    redactor = SecretRedactor(['a.b*c', r'\d+'], replacement=r'\1')
+    assert redactor.redact('a.b*c axbbc \\d+ 123') == r'\1 axbbc \1 123'
+
+
+def test_empty_redactor_is_a_no_op():
+    redactor = SecretRedactor(['', ''])
+    assert not redactor
+    data = {'key': 'value'}
+    assert redactor.redact_data(data) is data
+    assert redactor.redact('value') == 'value'
+
+
+def test_redact_data_descends_into_dicts_and_lists():
+    redactor = SecretRedactor(['s3cret'])
+    data = {
+        'content': 'the s3cret',
+        'id': 5,
+        'extras': {
+            'items': ['s3cret', {'nested': 'x s3cret'}, 3, None],
+            'flag': True,
+        },
+    }
+    result = redactor.redact_data(data)
+    assert result is data
+    assert data == {
+        'content': 'the <secret_hidden>',
+        'id': 5,
+        'extras': {
+            'items': ['<secret_hidden>', {'nested': 'x <secret_hidden>'}, 3, None],
+            'flag': True,
+        },
+    }
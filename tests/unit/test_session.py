@@ -1,4 +1,5 @@
-from unittest.mock import ANY, AsyncMock, patch
+import json
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
 from litellm.exceptions import (
@@ -7,6 +8,10 @@ from litellm.exceptions import (
 
 from openhands.core.config.llm_config import LLMConfig
 from openhands.core.config.openhands_config import OpenHandsConfig
+from openhands.core.novel_chapter_pipeline import CHAPTER_TEMPLATE
+from openhands.events import EventSource
+from openhands.events.action import MessageAction
+from openhands.server.chat_session_store import get_chat_session_store
 from openhands.server.session.session import Session
 from openhands.storage.memory import InMemoryFileStore
 
@@ -67,3 +72,58 @@ async def test_notify_on_llm_retry(
         'info', 'STATUS$LLM_RETRY', ANY
     )
     await session.close()
+
+
+class FakeStreamingLLM:
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def async_streaming_completion(self, messages, max_tokens):
+        FakeStreamingLLM.calls += 1
+        if 'JSON' in messages[0]['content']:
+            text = json.dumps(
+                {'title': 'Hujan', 'scenes': [{'title': 'Pagi', 'summary': 'Sari.'}]}
+            )
+        else:
+            text = 'Adegan pagi.'
+        yield {'choices': [{'delta': {'content': text}}]}
+
+
+@pytest.mark.asyncio
+@patch('openhands.server.session.session.StreamingLLM', FakeStreamingLLM)
+async def test_novel_chapter_is_recorded_and_its_checkpoint_deleted(
+    mock_sio, default_llm_config
+):
+    config = OpenHandsConfig()
+    config.set_llm_config(default_llm_config)
+    file_store = InMemoryFileStore({})
+    session = Session(
+        sid='..sid..',
+        file_store=file_store,
+        config=config,
+        sio=mock_sio,
+        user_id='..uid..',
+    )
+    session.send = AsyncMock()
+    session.agent_session = MagicMock()
+    session.agent_session.controller.agent.llm.config = default_llm_config
+    session.agent_session.close = AsyncMock()
+    request = MessageAction('Bab 1', novel_mode=True, template_used=CHAPTER_TEMPLATE)
+
+    await session._handle_novel_chapter(request)
+
+    added = session.agent_session.event_stream.add_event.call_args_list
+    assert added[0].args == (request, EventSource.USER)
+    assert added[1].args[0].content == 'Adegan pagi.'
+    assert added[1].args[1] == EventSource.AGENT
+    chapter_id = session.send.call_args.args[0]['chapter_id']
+    checkpoints = get_chat_session_store('novel-chapters', file_store)
+    assert await checkpoints.get(chapter_id) is None
+
+    # The same message again writes a new chapter
+    calls = FakeStreamingLLM.calls
+    await session._handle_novel_chapter(request)
+    assert FakeStreamingLLM.calls == calls + 2
+    await session.close()
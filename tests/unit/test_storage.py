@@ -12,11 +12,13 @@ from unittest.mock import patch
 import botocore.exceptions
 from google.api_core.exceptions import NotFound
 
+from openhands.storage import close_file_stores, get_file_store
 from openhands.storage.files import FileStore
 from openhands.storage.google_cloud import GoogleCloudFileStore
 from openhands.storage.local import LocalFileStore
 from openhands.storage.memory import InMemoryFileStore
 from openhands.storage.s3 import S3FileStore
+from openhands.storage.web_hook import WebHookFileStore
 
 
 class _StorageTest(ABC):
@@ -140,6 +142,66 @@ class TestS3FileStore(TestCase, _StorageTest):
             self.store = S3FileStore('dear-liza')
 
 
+class TestGetFileStore(TestCase):
+    def tearDown(self):
+        close_file_stores()
+
+    def test_stores_are_shared_per_configuration(self):
+        temp_dir = tempfile.mkdtemp(prefix='openhands_test_')
+        store = get_file_store('local', temp_dir)
+        self.assertIs(get_file_store('local', temp_dir), store)
+        self.assertIsNot(get_file_store('local', temp_dir + '/other'), store)
+        # In-memory stores hold the events of a single conversation
+        self.assertIsNot(get_file_store('memory'), get_file_store('memory'))
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_web_hook_clients_are_reused_and_closed(self):
+        temp_dir = tempfile.mkdtemp(prefix='openhands_test_')
+        headers = {'X-Test': 'a'}
+        store = get_file_store(
+            'local',
+            temp_dir,
+            'http://localhost:1234/files',
+            file_store_web_hook_headers=headers,
+        )
+        self.assertIsInstance(store, WebHookFileStore)
+        self.assertIs(
+            get_file_store(
+                'local', temp_dir, 'http://localhost:1234/files', dict(headers)
+            ),
+            store,
+        )
+        self.assertIsNot(
+            get_file_store(
+                'local', temp_dir, 'http://localhost:1234/files', {'X-Test': 'b'}
+            ),
+            store,
+        )
+        # In-memory stores are not shared, but their web hook clients are
+        memory_store = get_file_store(
+            'memory', None, 'http://localhost:1234/files', headers
+        )
+        self.assertIsNot(
+            get_file_store('memory', None, 'http://localhost:1234/files', headers),
+            memory_store,
+        )
+        self.assertIs(
+            get_file_store(
+                'memory', None, 'http://localhost:1234/files', headers
+            ).client,
+            memory_store.client,
+        )
+
+        close_file_stores()
+        self.assertTrue(store.client.is_closed)
+        self.assertTrue(memory_store.client.is_closed)
+        self.assertIsNot(
+            get_file_store('local', temp_dir, 'http://localhost:1234/files', headers),
+            store,
+        )
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
 # I would have liked to use cloud-storage-mocker here but the python versions were incompatible :(
 # If we write tests for the S3 storage class I would definitely recommend we use moto.
 class _MockGoogleCloudClient:
@@ -0,0 +1,131 @@
+import gzip
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from openhands.events import EventSource, EventStream
+from openhands.events.action import MessageAction
+from openhands.events.observation import BrowserOutputObservation
+from openhands.server.routes.trajectory import get_trajectory
+from openhands.storage.memory import InMemoryFileStore
+from openhands.utils import shutdown_listener
+
+
+@pytest.fixture
+def conversation(monkeypatch):
+    # Event streams stop reading once a shutdown was requested (e.g. by another test)
+    monkeypatch.setattr(shutdown_listener, '_should_exit', False)
+    event_stream = EventStream('trajectory-test', InMemoryFileStore())
+    for i in range(5):
+        event_stream.add_event(MessageAction(content=f'message {i}'), EventSource.USER)
+    event_stream.add_event(
+        BrowserOutputObservation(
+            content='page',
+            url='https://example.com',
+            trigger_by_action='browse',
+            screenshot='base64 screenshot',
+            axtree_object={'nodes': []},
+        ),
+        EventSource.ENVIRONMENT,
+    )
+    conversation = MagicMock()
+    conversation.event_stream = event_stream
+    return conversation
+
+
+def _request(accept_encoding: str = '') -> MagicMock:
+    request = MagicMock()
+    request.headers = {'accept-encoding': accept_encoding}
+    return request
+
+
+async def _body(response) -> bytes:
+    return b''.join(
+        [
+            chunk if isinstance(chunk, bytes) else chunk.encode()
+            async for chunk in response.body_iterator
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_trajectory_is_streamed_as_json(conversation):
+    response = await get_trajectory(
+        _request(),
+        conversation,
+        format='json',
+        start_id=0,
+        end_id=None,
+        limit=None,
+        include_screenshots=False,
+        fields=None,
+        exclude=None,
+    )
+    trajectory = json.loads(await _body(response))['trajectory']
+    assert [event['id'] for event in trajectory] == list(range(6))
+    assert 'screenshot' not in trajectory[5]['extras']
+    assert 'axtree_object' not in trajectory[5]['extras']
+
+
+@pytest.mark.asyncio
+async def test_trajectory_range_projection_and_gzip(conversation):
+    response = await get_trajectory(
+        _request('gzip, deflate'),
+        conversation,
+        format='ndjson',
+        start_id=1,
+        end_id=None,
+        limit=3,
+        include_screenshots=True,
+        fields='id,message',
+        exclude=None,
+    )
+    assert response.headers['content-encoding'] == 'gzip'
+    lines = gzip.decompress(await _body(response)).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'id': i, 'message': f'message {i}'} for i in (1, 2, 3)
+    ]
+
+    response = await get_trajectory(
+        _request(),
+        conversation,
+        format='ndjson',
+        start_id=5,
+        end_id=None,
+        limit=None,
+        include_screenshots=True,
+        fields=None,
+        exclude='url,axtree_object',
+    )
+    (event,) = [json.loads(line) for line in (await _body(response)).splitlines()]
+    assert event['extras']['screenshot'] == 'base64 screenshot'
+    assert 'url' not in event['extras']
+    assert 'axtree_object' not in event['extras']
+
+
+@pytest.mark.asyncio
+async def test_trajectory_reports_errors_after_the_events_sent(
+    conversation, monkeypatch
+):
+    monkeypatch.setattr('openhands.server.routes.trajectory.TRAJECTORY_PAGE_SIZE', 2)
+
+    def failing_events(*args, **kwargs):
+        yield from conversation.event_stream.search_events()
+        raise RuntimeError('storage failed')
+
+    conversation.event_stream.get_events = failing_events
+    response = await get_trajectory(
+        _request(),
+        conversation,
+        format='json',
+        start_id=0,
+        end_id=None,
+        limit=None,
+        include_screenshots=False,
+        fields=None,
+        exclude=None,
+    )
+    body = json.loads(await _body(response))
+    assert len(body['trajectory']) == 6
+    assert 'storage failed' in body['error']
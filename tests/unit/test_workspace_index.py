@@ -0,0 +1,145 @@
+import os
+
+from openhands.runtime.utils.workspace_index import WorkspaceIndex, get_workspace_index
+
+
+def _write(path, content: str | bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content)
+
+
+def test_files_exclude_ignored_and_vendored_dirs(tmp_path):
+    _write(tmp_path / 'src' / 'app.py', 'print(1)\n')
+    _write(tmp_path / 'node_modules' / 'lib' / 'index.js', 'x\n')
+    _write(tmp_path / '.git' / 'HEAD', 'ref\n')
+    _write(tmp_path / 'build' / 'out.txt', 'x\n')
+    _write(tmp_path / 'debug.log', 'x\n')
+    _write(tmp_path / '.gitignore', 'build/\n*.log\n')
+
+    index = WorkspaceIndex(str(tmp_path))
+    assert index.files() == ['.gitignore', 'src/app.py']
+    assert index.files('src/') == ['src/app.py']
+
+
+def test_search_skips_binary_files_and_matches_lines(tmp_path):
+    _write(tmp_path / 'a.txt', 'first\nneedle here\r\nlast needle\n')
+    _write(tmp_path / 'b.bin', b'needle\0\x01\x02')
+    _write(tmp_path / 'c.txt', 'nothing\n')
+
+    index = WorkspaceIndex(str(tmp_path))
+    assert list(index.search('needle')) == [
+        ('a.txt', 2, 'needle here'),
+        ('a.txt', 3, 'last needle'),
+    ]
+    assert list(index.search('NEEDLE')) == []
+    assert [m[1] for m in index.search('NEEDLE', ignore_case=True)] == [2, 3]
+    # Short terms cannot use trigrams but still work
+    assert [m[0] for m in index.search('no')] == ['c.txt']
+
+
+def test_search_only_reads_candidate_files(tmp_path):
+    for i in range(20):
+        _write(tmp_path / f'f{i}.txt', f'content {i}\n')
+    _write(tmp_path / 'target.txt', 'a unique_token\n')
+
+    index = WorkspaceIndex(str(tmp_path))
+    assert index._candidates('unique_token', '') == ['target.txt']
+    assert list(index.search('unique_token')) == [('target.txt', 1, 'a unique_token')]
+
+
+def test_refresh_picks_up_changes(tmp_path):
+    _write(tmp_path / 'a.txt', 'old value\n')
+    _write(tmp_path / 'b.txt', 'old value\n')
+    index = WorkspaceIndex(str(tmp_path))
+    assert [m[0] for m in index.search('old value')] == ['a.txt', 'b.txt']
+
+    _write(tmp_path / 'a.txt', 'new value, longer\n')
+    os.remove(tmp_path / 'b.txt')
+    _write(tmp_path / 'c.txt', 'old value\n')
+    assert [m[0] for m in index.search('old value')] == ['c.txt']
+    assert [m[0] for m in index.search('new value')] == ['a.txt']
+
+    _write(tmp_path / '.gitignore', 'c.txt\n')
+    assert list(index.search('old value')) == []
+
+
+def test_find_symbols(tmp_path):
+    _write(
+        tmp_path / 'pkg' / 'mod.py',
+        'class Foo:\n    def bar(self):\n        return 1\n\n\ndef baz():\n    pass\n',
+    )
+    _write(tmp_path / 'web' / 'app.js', 'export function bar() {}\n')
+
+    index = WorkspaceIndex(str(tmp_path))
+    foo = index.find_symbols('Foo')
+    assert [(s.path, s.kind, s.line, s.end_line) for s in foo] == [
+        ('pkg/mod.py', 'class', 1, 3)
+    ]
+    assert [(s.path, s.line) for s in index.find_symbols('bar')] == [
+        ('pkg/mod.py', 2),
+        ('web/app.js', 1),
+    ]
+    assert index.find_symbols('missing') == []
+
+
+def test_get_workspace_index_reuses_parent_index(tmp_path):
+    (tmp_path / '.git').mkdir()
+    _write(tmp_path / 'sub' / 'a.txt', 'x\n')
+    index, prefix = get_workspace_index(str(tmp_path))
+    assert prefix == ''
+    sub_index, sub_prefix = get_workspace_index(str(tmp_path / 'sub'))
+    assert sub_index is index
+    assert sub_prefix == 'sub/'
+    assert index.files(sub_prefix) == ['sub/a.txt']
+
+
+def test_search_an_explicitly_requested_ignored_dir(tmp_path):
+    _write(tmp_path / 'build' / 'out.txt', 'needle\n')
+    _write(tmp_path / 'build' / 'lib' / 'mod.py', 'def needle():\n    pass\n')
+    _write(tmp_path / 'node_modules' / 'pkg' / 'index.js', 'needle\n')
+    _write(tmp_path / 'src' / 'app.py', 'needle\n')
+    _write(tmp_path / '.gitignore', 'build/\n')
+
+    index = WorkspaceIndex(str(tmp_path))
+    assert [m[0] for m in index.search('needle')] == ['src/app.py']
+    # The ignore rules don't apply to the directory which was asked for
+    assert index.files('build/') == ['build/lib/mod.py', 'build/out.txt']
+    assert [m[0] for m in index.search('needle', 'build/')] == [
+        'build/lib/mod.py',
+        'build/out.txt',
+    ]
+    assert [m[0] for m in index.search('needle', 'build/lib/')] == ['build/lib/mod.py']
+    assert [s.path for s in index.find_symbols('needle', 'build/')] == [
+        'build/lib/mod.py'
+    ]
+    assert index.files('node_modules/') == ['node_modules/pkg/index.js']
+    # The skipped directories are still left out of the index
+    assert index.files() == ['.gitignore', 'src/app.py']
+
+
+def test_get_workspace_index_does_not_depend_on_call_order(tmp_path):
+    (tmp_path / '.git').mkdir()
+    _write(tmp_path / '.gitignore', '*.log\n')
+    _write(tmp_path / 'sub' / 'a.txt', 'x\n')
+    _write(tmp_path / 'sub' / 'debug.log', 'x\n')
+
+    # A subdirectory of a repository is indexed with the .gitignore of the repository
+    sub_index, sub_prefix = get_workspace_index(str(tmp_path / 'sub'))
+    assert sub_index.root == str(tmp_path.resolve())
+    assert sub_index.files(sub_prefix) == ['sub/a.txt']
+    index, prefix = get_workspace_index(str(tmp_path))
+    assert index is sub_index
+    assert prefix == ''
+
+    # Outside of a repository, each directory has its own index
+    other = tmp_path / 'other'
+    _write(other / 'nested' / 'b.txt', 'x\n')
+    (tmp_path / '.git').rmdir()
+    nested_index, nested_prefix = get_workspace_index(str(other / 'nested'))
+    other_index, _ = get_workspace_index(str(other))
+    assert nested_prefix == ''
+    assert nested_index is not other_index
+    assert other_index.files('nested/') == ['nested/b.txt']